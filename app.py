@@ -1,10 +1,15 @@
 # app.py
-from flask import Flask, render_template, request, jsonify, flash
-from scraper import WebScraper
-from database import Database
+from flask import Flask, Response, render_template, request, jsonify, flash
+import export
+import metrics
+import profiler
+from database import MAX_SEARCH_LIMIT, SEARCH_LIMIT, Database, InvalidCursor
+from jobs import batch_progress, get_job_queue
+from scheduler import get_scheduler
 import validators
 from datetime import datetime
 import logging
+import os
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -13,67 +18,52 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.secret_key = 'your-secret-key'  # Change this in production
 
+# Rows per listing page on the index and the JSON listing endpoints
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# /debug/profile samples the live process, so it is only served when enabled
+PROFILER_ENABLED = os.environ.get('SCRAPER_PROFILER') == '1'
+MAX_PROFILE_SECONDS = 60
+
+def parse_urls(text):
+    """Split a submission holding one or more URLs (newline/space separated)."""
+    return [url for url in text.split() if url]
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     db = Database()
     data = []
     product_data = []
+    next_cursors = {'pages': None, 'products': None}
+    counts = {'general_count': 0, 'product_count': 0}
     
     try:
         if request.method == 'POST':
-            url = request.form.get('url')
+            urls = parse_urls(request.form.get('url', ''))
             scrape_type = request.form.get('scrape_type', 'general')
             
-            logger.debug(f"Received request - URL: {url}, Type: {scrape_type}")
+            logger.debug(f"Received request - URLs: {urls}, Type: {scrape_type}")
             
-            if not validators.url(url):
+            valid_urls = [url for url in urls if validators.url(url)]
+            if not valid_urls or len(valid_urls) != len(urls):
                 flash('Please enter a valid URL', 'danger')
                 return render_template('index.html', data=[], product_data=[])
 
-            try:
-                scraper = WebScraper(url, scrape_type)
-                
-                if scrape_type == "products":
-                    logger.debug("Extracting product data...")
-                    scraped_data = scraper.extract_product_data()
-                    
-                    if scraped_data and scraped_data.get("products"):
-                        if db.fetch_product_data(url):
-                            db.update_product_data(url, scraped_data)
-                            flash(f'Product data updated for {url}', 'success')
-                        else:
-                            db.insert_product_data(scraped_data)
-                            flash(f'Product data inserted for {url}', 'success')
-                    else:
-                        flash('No product data found on the page', 'warning')
-                
-                else:
-                    logger.debug("Extracting general data...")
-                    scraped_data = scraper.extract_all_data()
-                    
-                    if scraped_data:
-                        if db.fetch_data(url):
-                            db.update_data(url, scraped_data)
-                            flash(f'Data updated for {url}', 'success')
-                        else:
-                            db.insert_data(scraped_data)
-                            flash(f'Data inserted for {url}', 'success')
-                    else:
-                        flash('No data found on the page', 'warning')
-                
-                db.log_scrape_attempt(url, 'success')
-                
-            except Exception as e:
-                logger.error(f"Scraping error: {str(e)}", exc_info=True)
-                db.log_scrape_attempt(url, 'error', str(e))
-                flash(f'Error scraping {url}: {str(e)}', 'danger')
-
-        # Fetch all data
-        logger.debug("Fetching all data from database...")
-        data = db.fetch_all_data() or []
-        product_data = db.fetch_all_product_data() or []
-        
-        logger.debug(f"Found {len(data)} general records and {len(product_data)} product records")
+            # Scraping runs on the job queue so this request returns immediately
+            batch_id, job_ids = get_job_queue().submit(valid_urls, scrape_type)
+            flash(f'Queued {len(job_ids)} scrape job(s) (batch {batch_id}); '
+                  f'refresh to see results', 'info')
+
+        # Fetch one page of each listing; full rows are loaded when opened
+        logger.debug("Fetching listing pages from database...")
+        pages = db.list_pages(PAGE_SIZE, request.args.get('pages_cursor'))
+        products = db.list_products(PAGE_SIZE, request.args.get('products_cursor'))
+        data = pages['rows']
+        product_data = products['rows']
+        next_cursors = {'pages': pages['next_cursor'], 'products': products['next_cursor']}
+        counts = {'general_count': db.count_pages(), 'product_count': db.count_products()}
+
+        logger.debug(f"Found {counts['general_count']} general records and {counts['product_count']} product records")
         
     except Exception as e:
         logger.error(f"Application error: {str(e)}", exc_info=True)
@@ -84,26 +74,245 @@ def index():
     return render_template('index.html', 
                          data=data, 
                          product_data=product_data,
-                         debug_info={
-                             'general_count': len(data),
-                             'product_count': len(product_data)
-                         })
+                         next_cursors=next_cursors,
+                         debug_info=counts)
 
 @app.route('/debug-info')
 def debug_info():
     """Endpoint for checking database content"""
     db = Database()
     try:
-        general_data = db.fetch_all_data()
-        product_data = db.fetch_all_product_data()
+        general_rows = db.list_pages(1)['rows']
+        product_rows = db.list_products(1)['rows']
         return jsonify({
-            'general_data_count': len(general_data) if general_data else 0,
-            'product_data_count': len(product_data) if product_data else 0,
-            'general_data_sample': general_data[0] if general_data else None,
-            'product_data_sample': product_data[0] if product_data else None
+            'general_data_count': db.count_pages(),
+            'product_data_count': db.count_products(),
+            'general_data_sample': db.fetch_data_by_id(general_rows[0]['id']) if general_rows else None,
+            'product_data_sample': db.fetch_product_by_id(product_rows[0]['id']) if product_rows else None
         })
     finally:
         db.close()
 
+def _page_limit():
+    """Listing page size from ?limit=, clamped to MAX_PAGE_SIZE."""
+    try:
+        return max(1, min(MAX_PAGE_SIZE, int(request.args.get('limit', PAGE_SIZE))))
+    except ValueError:
+        return PAGE_SIZE
+
+@app.route('/api/pages')
+def api_pages():
+    """Keyset-paginated listing of general scraped data (no blob columns)."""
+    db = Database()
+    try:
+        return jsonify(db.list_pages(_page_limit(), request.args.get('cursor')))
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    finally:
+        db.close()
+
+@app.route('/api/pages/<int:row_id>')
+def api_page(row_id):
+    """One general scraped data row with every column."""
+    db = Database()
+    try:
+        row = db.fetch_data_by_id(row_id)
+        return jsonify(row) if row else (jsonify({'error': 'not found'}), 404)
+    finally:
+        db.close()
+
+@app.route('/api/products')
+def api_products():
+    """Keyset-paginated listing of product data (no specifications)."""
+    db = Database()
+    try:
+        return jsonify(db.list_products(_page_limit(), request.args.get('cursor')))
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    finally:
+        db.close()
+
+@app.route('/api/products/<int:row_id>')
+def api_product(row_id):
+    """One product data row with specifications."""
+    db = Database()
+    try:
+        row = db.fetch_product_by_id(row_id)
+        return jsonify(row) if row else (jsonify({'error': 'not found'}), 404)
+    finally:
+        db.close()
+
+@app.route('/api/products/<int:row_id>/matches')
+def api_product_matches(row_id):
+    """Listings of the same product on every site, cheapest first (see matching.py)."""
+    db = Database()
+    try:
+        return jsonify({'product_id': row_id, 'matches': db.fetch_matched_products(row_id)})
+    finally:
+        db.close()
+
+@app.route('/api/matches')
+def api_match_groups():
+    """Products listed on several sites, largest price spread first."""
+    db = Database()
+    try:
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        return jsonify({'groups': db.list_match_groups(_page_limit(), offset)})
+    finally:
+        db.close()
+
+@app.route('/search')
+def search():
+    """Ranked full-text search. Query: q, type=products|pages, limit, offset.
+
+    truncated: true means the query matched more than RANK_CANDIDATES rows and
+    only the most recently written of them were ranked.
+    """
+    text = request.args.get('q', '').strip()
+    kind = request.args.get('type', 'products')
+    if not text:
+        return jsonify({'error': 'missing query parameter q'}), 400
+    if kind not in ('products', 'pages'):
+        return jsonify({'error': f'unknown type: {kind}'}), 400
+    limit = min(request.args.get('limit', SEARCH_LIMIT, type=int), MAX_SEARCH_LIMIT)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+
+    db = Database()
+    try:
+        search_fn = db.search_products if kind == 'products' else db.search_pages
+        return jsonify({'query': text, 'type': kind, **search_fn(text, max(limit, 1), offset)})
+    finally:
+        db.close()
+
+@app.route('/jobs', methods=['POST'])
+def submit_jobs():
+    """Queue scrape jobs. Body: {"urls": [...], "scrape_type": "general"|"products"}."""
+    payload = request.get_json(silent=True) or request.form
+    urls = payload.get('urls') or parse_urls(payload.get('url', ''))
+    if isinstance(urls, str):
+        urls = parse_urls(urls)
+    scrape_type = payload.get('scrape_type', 'general')
+    invalid = [url for url in urls if not validators.url(url)]
+    if not urls or invalid:
+        return jsonify({'error': 'invalid or missing URLs', 'invalid': invalid}), 400
+    if scrape_type not in ('general', 'products'):
+        return jsonify({'error': f'unknown scrape_type: {scrape_type}'}), 400
+
+    batch_id, job_ids = get_job_queue().submit(urls, scrape_type)
+    return jsonify({'batch_id': batch_id, 'job_ids': job_ids}), 202
+
+@app.route('/jobs/<int:job_id>')
+def job_status(job_id):
+    """Status and result message of one job."""
+    db = Database()
+    try:
+        job = db.fetch_job(job_id)
+        return jsonify(job) if job else (jsonify({'error': 'not found'}), 404)
+    finally:
+        db.close()
+
+@app.route('/jobs/batch/<batch_id>')
+def batch_status(batch_id):
+    """Progress of a bulk submission plus the state of each of its jobs."""
+    db = Database()
+    try:
+        jobs = db.fetch_batch_jobs(batch_id)
+        if not jobs:
+            return jsonify({'error': 'not found'}), 404
+        return jsonify({'batch_id': batch_id, 'progress': batch_progress(jobs), 'jobs': jobs})
+    finally:
+        db.close()
+
+@app.route('/tracked', methods=['GET', 'POST'])
+def tracked_urls():
+    """GET: tracked URLs and scheduler stats. POST {"url", "scrape_type", "interval"}: track a URL."""
+    scheduler = get_scheduler()
+    if request.method == 'POST':
+        payload = request.get_json(silent=True) or request.form
+        url = payload.get('url')
+        if not validators.url(url):
+            return jsonify({'error': 'invalid URL'}), 400
+        try:
+            interval = float(payload.get('interval', 3600))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'interval must be a number of seconds'}), 400
+        try:
+            scheduler.track(url, payload.get('scrape_type', 'products'), interval)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'tracked': url}), 201
+
+    db = Database()
+    try:
+        return jsonify({'stats': scheduler.stats(), 'urls': db.fetch_tracked_urls()})
+    finally:
+        db.close()
+
+@app.route('/export/<table>')
+def export_table(table):
+    """Stream a table as a chunked download. Query: format, site, since, until, updated_since."""
+    fmt = request.args.get('format', 'ndjson')
+    filters = {'site': request.args.get('site') or None}
+    try:
+        for name in ('since', 'until', 'updated_since'):
+            value = request.args.get(name)
+            filters[name] = export.iso_datetime(value) if value else None
+    except ValueError:
+        return jsonify({'error': f'{name} must be an ISO date/time'}), 400
+
+    db = Database()
+    try:
+        chunks = export.export_chunks(db, table, fmt, **filters)
+    except (ValueError, ImportError) as e:
+        db.close()
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        # The connection lives as long as the download, not the request handler
+        try:
+            yield from chunks
+        finally:
+            db.close()
+
+    extension = {'ndjson': 'ndjson', 'csv': 'csv', 'parquet': 'parquet', 'arrow': 'arrows'}[fmt]
+    return Response(generate(), mimetype=export.FORMATS[fmt], headers={
+        'Content-Disposition': f'attachment; filename={table}.{extension}'
+    })
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Per-stage latency histograms and fetch/error counters in Prometheus text format (?format=json)."""
+    if request.args.get('format') == 'json':
+        return jsonify(metrics.snapshot())
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/profile')
+def debug_profile():
+    """Sample every thread for ?seconds= (default 10) and return collapsed stacks (flamegraph input)."""
+    if not PROFILER_ENABLED:
+        return jsonify({'error': 'profiler disabled; set SCRAPER_PROFILER=1'}), 404
+    seconds = min(max(request.args.get('seconds', 10, type=float), 0.1), MAX_PROFILE_SECONDS)
+    interval = max(request.args.get('interval', 0.005, type=float), 0.001)
+    sampled = profiler.profile_for(seconds, interval)
+    if request.args.get('format') == 'json':
+        return jsonify({'samples': sampled.samples, 'top_functions': sampled.top_functions(),
+                        'stacks': dict(sampled.stacks.most_common(200))})
+    return Response(sampled.report(), mimetype='text/plain')
+
+def start_background_workers():
+    """Start this process's scrape job queue and re-scrape scheduler.
+
+    Building the queue requeues jobs an earlier process left unfinished, and the
+    scheduler starts checking tracked URLs as they come due; neither waits for a
+    request. WSGI servers should call this once in each worker process (e.g.
+    gunicorn's post_fork hook).
+    """
+    get_job_queue()
+    get_scheduler()
+
 if __name__ == '__main__':
+    # The debug reloader runs this file in a watcher process and again in the
+    # serving child, which it marks with WERKZEUG_RUN_MAIN; only the child serves
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_workers()
     app.run(debug=True)
\ No newline at end of file
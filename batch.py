@@ -0,0 +1,84 @@
+# batch.py
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+import metrics
+from http_client import get_client
+from scraper import WebScraper
+
+
+class BatchScraper:
+    """Fetch many URLs concurrently and run each page through WebScraper extraction."""
+
+    def __init__(self, scrape_type="general", max_concurrency=20, per_host_limit=4, timeout=10,
+                 client=None, fields=None):
+        self.scrape_type = scrape_type
+        # Product fields or page sections to extract (WebScraper.extract_all_data); None is all
+        self.fields = fields
+        self.client = client or get_client()
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+
+    def _fetch(self, url):
+        """Blocking fetch, run on a worker thread."""
+        response = self.client.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def _extract(self, url, html):
+        """Send a downloaded page through the normal extraction paths."""
+        scraper = WebScraper(url, self.scrape_type, html=html)
+        if self.scrape_type == "products":
+            return scraper.extract_product_data(self.fields)
+        return scraper.extract_all_data(self.fields)
+
+    async def _scrape_one(self, loop, executor, url, global_limit, host_limits):
+        host = urlparse(url).netloc
+        # Take the host slot first so a busy host does not hold global slots while waiting
+        async with host_limits[host], global_limit:
+            try:
+                html = await loop.run_in_executor(executor, self._fetch, url)
+            except requests.exceptions.RequestException as e:
+                metrics.inc("scraper_errors_total", site=metrics.site_label(url), error=type(e).__name__)
+                return {"url": url, "data": None, "error": str(e)}
+        # Extraction runs outside the limits so the next fetch can start right away
+        try:
+            data = await loop.run_in_executor(executor, self._extract, url, html)
+            return {"url": url, "data": data, "error": None}
+        except Exception as e:
+            metrics.inc("scraper_errors_total", site=metrics.site_label(url), error=type(e).__name__)
+            return {"url": url, "data": None, "error": str(e)}
+
+    async def run(self, urls):
+        """Scrape every URL and return results in input order."""
+        loop = asyncio.get_running_loop()
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host_limit))
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            tasks = [
+                self._scrape_one(loop, executor, url, global_limit, host_limits)
+                for url in urls
+            ]
+            return await asyncio.gather(*tasks)
+
+
+def scrape_batch(urls, scrape_type="general", max_concurrency=20, per_host_limit=4, timeout=10, fields=None):
+    """Synchronous entry point; results are in input order.
+
+    Async code should await ``BatchScraper.run`` instead. When called from a
+    thread that already runs an event loop, the batch runs on a fresh loop in a
+    worker thread (blocking the caller until it finishes) rather than failing.
+    """
+    batch = BatchScraper(scrape_type, max_concurrency, per_host_limit, timeout, fields=fields)
+    urls = list(urls)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(batch.run(urls))
+    with ThreadPoolExecutor(max_workers=1) as runner:
+        return runner.submit(asyncio.run, batch.run(urls)).result()
@@ -0,0 +1,56 @@
+# benchmarks/bench_batch.py
+"""Pages/sec of the batch engine against the sequential one-fetch-at-a-time loop.
+
+Run from the repository root:  python -m benchmarks.bench_batch --pages 200
+"""
+import argparse
+import time
+
+from batch import scrape_batch
+from http_client import get_client
+from scraper import WebScraper
+from benchmarks.standin import StandinServer
+
+
+def sequential(urls):
+    """Today's behaviour: one WebScraper (one blocking fetch) per URL."""
+    results = []
+    for url in urls:
+        results.append(WebScraper(url, "products").extract_product_data())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--hosts", type=int, default=4, help="distinct 127.0.0.x hosts")
+    parser.add_argument("--delay", type=float, default=0.05, help="simulated RTT in seconds")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--per-host", type=int, default=8)
+    args = parser.parse_args()
+
+    with StandinServer(delay=args.delay) as server:
+        urls = [
+            server.url(f"/item/{i}", host=f"127.0.0.{i % args.hosts + 1}")
+            for i in range(args.pages)
+        ]
+
+        start = time.perf_counter()
+        seq = sequential(urls)
+        seq_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = scrape_batch(urls, "products", args.concurrency, args.per_host)
+        batch_time = time.perf_counter() - start
+
+    errors = sum(1 for r in results if r["error"])
+    same = [r["data"]["products"] for r in results if r["data"]] == [s["products"] for s in seq]
+    print(f"pages={args.pages} hosts={args.hosts} rtt={args.delay * 1000:.0f}ms")
+    print(f"sequential: {seq_time:.2f}s  {args.pages / seq_time:.1f} pages/sec")
+    print(f"batch:      {batch_time:.2f}s  {args.pages / batch_time:.1f} pages/sec  errors={errors}")
+    print(f"speedup:    {seq_time / batch_time:.1f}x  identical_products={same}")
+    print(f"transport:  {get_client().stats()}")
+
+
+if __name__ == "__main__":
+    main()
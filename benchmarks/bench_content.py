@@ -0,0 +1,90 @@
+# benchmarks/bench_content.py
+"""Database size and read latency with inline JSON vs the compressed content store.
+
+The corpus imitates a crawl of a few sites: each page has a few KB of body
+text drawn from a shared vocabulary plus the site's navigation text, pages of
+one category share their link list, and most pages of a site carry the same
+image strip. Run from the repository root:
+    python -m benchmarks.bench_content --pages 5000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from database import Database
+
+WORDS = [f"word{i}" for i in range(3000)]
+
+
+def corpus(pages, sites=5, categories=20, seed=7):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+    for i in range(pages):
+        site = i % sites
+        category = rng.randrange(categories)
+        host = f"https://shop{site}.example.com"
+        nav = [f"{host}/c/{c}" for c in range(categories)]
+        nav_text = " ".join(f"Category {c}" for c in range(categories))
+        body = " ".join(rng.choices(WORDS, weights, k=1200))
+        images = [f"{host}/static/logo.png", f"{host}/static/banner{site}.jpg"]
+        if rng.random() < 0.3:
+            images.append(f"{host}/img/{i}.jpg")
+        yield {
+            "url": f"{host}/p/{i}",
+            "meta_info": {"title": f"Page {i}"},
+            "headers": {"h1": [f"Page {i}"]},
+            "main_content": f"{nav_text} {body} Copyright shop{site}",
+            "contact_info": {"emails": [f"info@shop{site}.example.com"]},
+            "social_links": {},
+            "images": images,
+            "links": nav + [f"{host}/c/{category}/p/{n}" for n in range(60)]
+        }
+
+
+def file_size(path):
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def measure(directory, label, pages, compress):
+    path = os.path.join(directory, f"{label}.db")
+    db = Database(path, compress_content=compress)
+    start = time.perf_counter()
+    db.upsert_pages(corpus(pages), 500)
+    write = time.perf_counter() - start
+    db.cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    ids = [row[0] for row in db.cursor.execute("SELECT id FROM scraped_data")]
+    sample = random.Random(1).sample(ids, min(500, len(ids)))
+    reader = Database(path, compress_content=compress)
+    start = time.perf_counter()
+    for row_id in sample:
+        reader.fetch_data_by_id(row_id)
+    by_id = (time.perf_counter() - start) / len(sample)
+    start = time.perf_counter()
+    reader.fetch_all_data()
+    fetch_all = time.perf_counter() - start
+
+    print(f"{label:<11} size {file_size(path) / 2 ** 20:8.1f} MB  write {write:6.2f}s  "
+          f"fetch_data_by_id {by_id * 1000:6.3f} ms  fetch_all_data {fetch_all:6.2f}s")
+    if compress:
+        print(f"{'':<11} {db.content_stats()}")
+    reader.close()
+    db.close()
+    return file_size(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        inline = measure(directory, "inline", args.pages, compress=False)
+        stored = measure(directory, "compressed", args.pages, compress=True)
+        print(f"size reduction {inline / stored:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/bench_db.py
+"""Rows/sec of bulk upserts against the per-row insert path (commit per call),
+and price-history query latency at large observation counts.
+
+Run from the repository root:
+    python -m benchmarks.bench_db --rows 10000 1000000
+    python -m benchmarks.bench_db --rows --history-rows 20000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from database import Database
+
+
+def product_pages(count, offset=0):
+    for i in range(offset, offset + count):
+        yield {
+            "url": f"https://shop.example.com/item/{i}",
+            "products": [{
+                "title": f"Item {i}",
+                "price": i + 0.99,
+                "currency": "$",
+                "rating": 4.5,
+                "reviews_count": i % 500,
+                "availability": "In stock",
+                "image_url": f"https://shop.example.com/img/{i}.jpg",
+                "seller": "Stand-in Store",
+                "specifications": {"Color": "Black", "Weight": f"{i % 900}g"}
+            }]
+        }
+
+
+def pages(count):
+    for i in range(count):
+        yield {
+            "url": f"https://site.example.com/page/{i}",
+            "meta_info": {"description": f"page {i}"},
+            "headers": {"h1": [f"Page {i}"]},
+            "main_content": f"Body text for page {i}. " * 20,
+            "contact_info": {"emails": [f"info{i}@example.com"]},
+            "social_links": {},
+            "images": [f"https://site.example.com/img/{i}.png"],
+            "links": [f"https://site.example.com/page/{i + 1}"]
+        }
+
+
+def timed(label, rows, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {rows:>9} rows  {elapsed:8.2f}s  {rows / elapsed:>10.0f} rows/sec")
+
+
+def history_queries(directory, observations, products=10000):
+    """Fill price_history, then time per-product range and daily-aggregate queries."""
+    db = Database(os.path.join(directory, "history.db"))
+    start_at = int(time.time()) - 365 * 86400
+    per_product = max(1, observations // products)
+    step = 365 * 86400 // per_product
+
+    def rows():
+        for product_id in range(1, products + 1):
+            for i in range(per_product):
+                yield product_id, start_at + i * step, 1000 + (i * 7 + product_id) % 500, "USD"
+
+    timed("record_price_observations", per_product * products,
+          lambda: db.record_price_observations(rows(), 50000))
+
+    queries = 200
+    month = (start_at + 200 * 86400, start_at + 230 * 86400)
+    for label, query in (
+        ("fetch_price_history (30 days)", lambda pid: db.fetch_price_history(pid, *month)),
+        ("fetch_daily_prices (full year)", lambda pid: db.fetch_daily_prices(pid)),
+    ):
+        start = time.perf_counter()
+        for n in range(queries):
+            query(n * 37 % products + 1)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<34} {queries:>9} queries {elapsed / queries * 1000:8.2f} ms/query")
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="*", default=[10000, 1000000])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--per-row-limit", type=int, default=10000,
+                        help="skip the per-row baseline above this many rows")
+    parser.add_argument("--history-rows", type=int, default=0,
+                        help="also benchmark price_history queries at this many observations")
+    args = parser.parse_args()
+
+    if args.history_rows:
+        with tempfile.TemporaryDirectory() as directory:
+            history_queries(directory, args.history_rows)
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as directory:
+            if rows <= args.per_row_limit:
+                db = Database(os.path.join(directory, "per_row.db"))
+                timed("insert_product_data (per row)", rows,
+                      lambda: [db.insert_product_data(p) for p in product_pages(rows)])
+                db.close()
+
+            db = Database(os.path.join(directory, "bulk.db"))
+            timed("upsert_products (insert)", rows,
+                  lambda: db.upsert_products(product_pages(rows), args.batch_size))
+            timed("upsert_products (update)", rows,
+                  lambda: db.upsert_products(product_pages(rows), args.batch_size))
+            timed("upsert_pages (insert)", rows,
+                  lambda: db.upsert_pages(pages(rows), args.batch_size))
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
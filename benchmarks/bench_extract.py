@@ -0,0 +1,77 @@
+# benchmarks/bench_extract.py
+"""Single-pass extract_all_data against the per-section extract_* methods on large pages.
+
+Run from the repository root:  python -m benchmarks.bench_extract --sizes 1 2 5
+"""
+import argparse
+import time
+
+from scraper import WebScraper
+
+BLOCK = """<div class="section"><h{h}>Section {n}</h{h}>
+<p>Paragraph {n} with some text and a contact: team{n}@example.com, call +44 20 7946 {n4}.</p>
+<!-- comment {n} --><script>var x{n} = "{n}";</script>
+<ul><li><a href="/docs/{n}">Doc {n}</a></li><li><a href="https://twitter.com/acct{n}">tw</a></li>
+<li><a href="https://www.youtube.com/watch?v={n}">yt</a></li><li><a href="#top">top</a></li></ul>
+<img src="/static/img{n}.png" alt="img {n}"><img alt="no src">
+<meta name="section-{n}" content="meta {n}"></div>
+"""
+
+
+def large_page(megabytes):
+    """Generate roughly ``megabytes`` MB of varied general-page HTML."""
+    parts = ['<html><head><title>Large</title><meta property="og:title" content="Large page">'
+             '</head><body>']
+    size = 0
+    n = 0
+    while size < megabytes * 1024 * 1024:
+        block = BLOCK.format(h=n % 6 + 1, n=n, n4=f"{n % 10000:04d}")
+        parts.append(block)
+        size += len(block)
+        n += 1
+    parts.append('<a href="https://facebook.com/page">fb</a></body></html>')
+    return "".join(parts)
+
+
+def per_section(scraper):
+    """The previous extract_all_data: one full-tree pass per section."""
+    return {
+        "url": scraper.url,
+        "meta_info": scraper.extract_meta_info(),
+        "headers": scraper.extract_headers(),
+        "main_content": scraper.extract_main_content(),
+        "contact_info": scraper.extract_contact_info(),
+        "social_links": scraper.extract_social_links(),
+        "images": scraper.extract_images(),
+        "links": scraper.extract_links()
+    }
+
+
+def best_of(repeat, func):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 2, 5], help="page sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for megabytes in args.sizes:
+        scraper = WebScraper("https://example.com/large", html=large_page(megabytes))
+        old_time, old = best_of(args.repeat, lambda: per_section(scraper))
+        new_time, new = best_of(args.repeat, scraper.extract_all_data)
+        print(f"{megabytes:>4} MB  per-section {old_time * 1000:8.1f} ms  "
+              f"single-pass {new_time * 1000:8.1f} ms  "
+              f"speedup {old_time / new_time:4.1f}x  identical={old == new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_matching.py
+"""Speed and pairwise precision/recall of matching.py on synthetic cross-site listings.
+
+Each canonical product (brand, line, model number, storage) is listed on one to
+three sites with that site's title style, specification keys and image CDN.
+Storage variants of one model are distinct products and make hard negatives;
+colours are listing details of the same product. Run from the repository root:
+    python -m benchmarks.bench_matching --products 100000
+"""
+import argparse
+import random
+import time
+from collections import defaultdict
+from itertools import combinations
+
+from matching import ProductRecord, match_products
+
+BRANDS = ["Samsung", "Xiaomi", "Infinix", "Tecno", "Oppo", "Vivo", "Realme", "Nokia", "Motorola", "Honor"]
+LINES = ["Galaxy", "Redmi Note", "Hot", "Spark", "Reno", "Y", "Narzo", "G", "Moto", "X"]
+STORAGE = ["64GB", "128GB", "256GB", "512GB"]
+COLOURS = ["Black", "Blue", "Green", "Silver", "Gold"]
+
+
+def listings(products, seed=11):
+    """Yields (canonical id, product_id, url, title, specifications, image_url)."""
+    rng = random.Random(seed)
+    product_id = 0
+    for canonical in range(products):
+        brand = BRANDS[canonical % len(BRANDS)]
+        line = rng.choice(LINES)
+        number = canonical // len(STORAGE)
+        model = f"{brand[:2].upper()}-{number:05d}{rng.choice('ABCE')}"
+        name = f"{brand} {line} {number}{rng.choice(['', ' Pro', ' Plus'])}"
+        storage = STORAGE[canonical % len(STORAGE)]
+        ram = rng.choice(["4GB", "6GB", "8GB"])
+        image = f"{rng.getrandbits(48):012x}"
+        for site in rng.sample(["amazon", "ebay", "daraz"], rng.randint(1, 3)):
+            colour = rng.choice(COLOURS)
+            product_id += 1
+            if site == "amazon":
+                title = f"{name} ({ram} RAM, {storage[:-2]} GB Storage) - {colour}"
+                specs = {"Brand": brand, "Item model number": model}
+                image_url = f"https://m.media-amazon.com/images/I/{image}._AC_SX679_.jpg"
+            elif site == "ebay":
+                title = f"NEW {name} {model} {storage} {colour} Unlocked"
+                specs = {"Brand": brand, "MPN": model}
+                image_url = f"https://i.ebayimg.com/images/g/{rng.getrandbits(40):010x}/s-l1600.jpg"
+            else:
+                title = f"{name} {ram} {storage} {colour} PTA Approved - 1 Year Warranty"
+                specs = {"brand": brand}
+                image_url = f"https://static-01.daraz.pk/p/{image}.jpg_720x720q80.jpg_.webp"
+            yield canonical, product_id, f"https://www.{site}.example/{product_id}", title, specs, image_url
+
+
+def pairs_by_group(assignments):
+    groups = defaultdict(list)
+    for item, group in assignments:
+        groups[group].append(item)
+    return {pair for members in groups.values() for pair in combinations(sorted(members), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--threshold", type=float, default=0.75)
+    args = parser.parse_args()
+
+    rows = list(listings(args.products))
+    start = time.perf_counter()
+    records = [ProductRecord(pid, url, title, specs, image) for _, pid, url, title, specs, image in rows]
+    matches = match_products(records, args.threshold)
+    elapsed = time.perf_counter() - start
+
+    truth = pairs_by_group((pid, canonical) for canonical, pid, *_ in rows)
+    found = pairs_by_group((pid, group) for pid, group, _, _ in matches)
+    true_positives = len(truth & found)
+    precision = true_positives / len(found) if found else 1.0
+    recall = true_positives / len(truth) if truth else 1.0
+    print(f"{len(rows)} listings of {args.products} products matched in {elapsed:.1f}s "
+          f"({len(rows) / elapsed:.0f} listings/sec)")
+    print(f"pairwise precision {precision:.3f}  recall {recall:.3f}  "
+          f"({len(found)} matched pairs, {len(truth)} true pairs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_normalize.py
+"""Strings/sec of the batch price, review-count and rating parsers in normalize.py.
+
+Prices mix the formats seen on the supported sites ("Rs. 56,999",
+"US $248.00", "₹1,00,000", "1.299,50 €") with --distinct different values
+among --count strings, as a scraped catalogue repeats prices. The old
+scraper expressions are timed on the same prices for comparison; they
+misread most of them. Run from the repository root:
+    python -m benchmarks.bench_normalize --count 1000000
+"""
+import argparse
+import re
+import time
+
+import numpy as np
+
+from normalize import parse_counts, parse_prices, parse_ratings
+
+TEMPLATES = ("Rs. {:,}", "$ {:,}.99", "US ${:,}.00", "{:,}.00 PKR", "₹{:,}", "{:,}.50 €")
+
+
+def old_price(text):
+    """scraper._parse_price and _parse_currency before normalize.py."""
+    price = re.sub(r'[^\d.,]', '', text)
+    try:
+        value = float(price.replace(',', '.'))
+    except ValueError:
+        value = None
+    currency = re.search(r'[\$\€\£\¥]|USD|EUR|GBP|JPY', text)
+    return value, currency.group() if currency else None
+
+
+def timed(label, func, texts):
+    start = time.perf_counter()
+    result = func(texts)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {len(texts):>9} strings  {elapsed:6.2f} s  {len(texts) / elapsed:>11,.0f} strings/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1000000)
+    parser.add_argument("--distinct", type=int, default=50000, help="different prices among --count")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    values = rng.integers(1, 500000, args.distinct)
+    distinct = [TEMPLATES[i % len(TEMPLATES)].format(int(v)) for i, v in enumerate(values)]
+    # "1.299,50 €" in the euro template's own convention
+    distinct = [t.replace(",", ".").replace(".50 €", ",50 €") if t.endswith("€") else t for t in distinct]
+    prices = [distinct[i] for i in rng.integers(0, len(distinct), args.count)]
+    counts = [f"{int(v):,} ratings" for v in rng.integers(0, 100000, args.count)]
+    ratings = [f"{r:.1f} out of 5 stars" for r in rng.uniform(1, 5, args.count)]
+
+    minor, currency, valid = timed("parse_prices", lambda t: parse_prices(t, "en-PK"), prices)
+    timed("parse_counts", parse_counts, counts)
+    timed("parse_ratings", parse_ratings, ratings)
+    old = timed("old regex (prices)", lambda t: [old_price(text) for text in t], prices)
+
+    expected = {text: int(value) * 100 + (99 if "$ " in text else 50 if "€" in text else 0)
+                for text, value in zip(distinct, values)}
+    correct = sum(expected[text] == m for text, m in zip(prices[:10000], minor[:10000]))
+    old_correct = sum(v is not None and round(v * 100) == expected[text]
+                      for text, (v, _) in zip(prices[:10000], old[:10000]))
+    print(f"\ncorrect minor units (first 10000): normalize {correct}, old regex {old_correct}")
+    print(f"currencies: {dict(zip(*np.unique(currency[valid].astype(str), return_counts=True)))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/bench_pipeline.py
+"""Extraction throughput of the process pipeline at increasing worker counts.
+
+Writes a directory of saved pages, then runs ScrapePipeline.run_files with 1, 2,
+4, ... workers up to the CPU count. Run from the repository root:
+    python -m benchmarks.bench_pipeline --pages 400
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from pipeline import ScrapePipeline, iter_html_files
+from benchmarks.bench_stream import listing_page
+
+
+def worker_counts(limit):
+    count = 1
+    while count < limit:
+        yield count
+        count *= 2
+    yield limit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--products-per-page", type=int, default=40)
+    parser.add_argument("--scrape-type", choices=["general", "products"], default="products")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        page = listing_page(args.products_per_page)
+        for i in range(args.pages):
+            Path(directory, f"page{i:05d}.html").write_text(page)
+        paths = list(iter_html_files(directory))
+
+        baseline = None
+        for workers in worker_counts(os.cpu_count() or 1):
+            pipeline = ScrapePipeline(args.scrape_type, workers=workers)
+            start = time.perf_counter()
+            results = list(pipeline.run_files(paths))
+            elapsed = time.perf_counter() - start
+            rate = len(results) / elapsed
+            baseline = baseline or rate
+            print(f"workers={workers:<3} {rate:8.1f} pages/sec  scaling {rate / baseline:4.2f}x  "
+                  f"errors={sum(r['error'] is not None for r in results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_search.py
+"""Full-text search latency over product_search and page_search.
+
+Product titles combine a brand, a product line, a model number and a few
+attribute words, so queries range from very selective (model numbers) to very
+common (a brand). Run from the repository root:
+    python -m benchmarks.bench_search --products 1000000 --pages 20000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from database import Database
+from benchmarks.bench_content import corpus
+
+BRANDS = ["Samsung", "Apple", "Xiaomi", "Infinix", "Tecno", "Oppo", "Vivo", "Realme", "Nokia", "Haier",
+          "Dawlance", "Orient", "Philips", "Anker", "Baseus", "Lenovo", "HP", "Dell", "Asus", "Acer"]
+LINES = ["Galaxy", "Note", "Pro", "Max", "Lite", "Air", "Book", "Buds", "Watch", "Power Bank",
+         "Charger", "Cable", "Blender", "Iron", "Refrigerator", "Inverter AC", "Monitor", "Laptop"]
+ATTRIBUTES = ["black", "white", "blue", "128GB", "256GB", "8GB RAM", "fast charging", "wireless",
+              "waterproof", "1.5 ton", "inverter", "stainless steel", "USB-C", "bluetooth", "OLED"]
+
+
+def products(count, seed=3):
+    rng = random.Random(seed)
+    for i in range(count):
+        title = (f"{rng.choice(BRANDS)} {rng.choice(LINES)} X{i} "
+                 f"{' '.join(rng.sample(ATTRIBUTES, 3))}")
+        yield {
+            "url": f"https://shop.example.com/item/{i}",
+            "products": [{
+                "title": title,
+                "price": rng.randrange(500, 500000),
+                "currency": "Rs.",
+                "specifications": {"Brand": title.split()[0], "Warranty": f"{rng.randrange(1, 3)} year"}
+            }]
+        }
+
+
+def time_queries(label, search, queries, repeat=20):
+    for query in queries:
+        search(query)  # warm the page cache
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = search(query)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"{label:<16} {query!r:<28} {elapsed * 1000:8.2f} ms  "
+              f"({len(result['results'])} shown, more: {result['next_offset'] is not None}, "
+              f"truncated: {result['truncated']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=1000000)
+    parser.add_argument("--pages", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, "search.db"))
+        start = time.perf_counter()
+        db.upsert_products(products(args.products))
+        print(f"indexed {args.products} products in {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        db.upsert_pages(corpus(args.pages), 1000)
+        print(f"indexed {args.pages} pages in {time.perf_counter() - start:.1f}s")
+
+        time_queries("search_products", db.search_products,
+                     [f"X{args.products // 2}", "samsung galaxy 256GB", "anker power bank wireless",
+                      "samsung", "black"])
+        time_queries("search_products", lambda q: db.search_products(q, offset=200),
+                     ["dell monitor"])
+        time_queries("search_pages", db.search_pages, ["word2500", "word2500 word2900", "word1"])
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
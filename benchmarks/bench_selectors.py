@@ -0,0 +1,61 @@
+# benchmarks/bench_selectors.py
+"""Per-page product extraction latency: soupsieve (soup backend) against the lxml backend.
+
+Times parse + extract_product_data for a product page of each known site and a
+generic listing page. Run from the repository root:  python -m benchmarks.bench_selectors
+"""
+import argparse
+import time
+
+from scraper import WebScraper
+from benchmarks.bench_stream import listing_page
+
+FILLER = '<div class="nav"><a href="/x">link</a><span>menu entry</span></div>' * 400
+
+SITE_PAGES = {
+    "https://www.amazon.com/dp/B000TEST": f"""<html><body>{FILLER}
+<span id="productTitle">Stand-in Widget</span><span class="a-price-whole">$129.00</span>
+<a id="acrPopover">4.5 out of 5 stars</a><span id="acrCustomerReviewText">1234 ratings</span>
+<div id="availability"><span>In Stock</span></div><div id="imgTagWrapperId"><img src="/w.jpg"></div>
+<a id="bylineInfo">Visit the Widget Store</a><table id="productDetails_detailBullets_sections1">
+<tr><td>Weight: 2 kg</td></tr><tr><td>Colour: Red</td></tr></table>{FILLER}</body></html>""",
+    "https://www.ebay.com/itm/123": f"""<html><body>{FILLER}
+<h1 class="x-item-title">Stand-in Camera</h1><div class="x-price-primary">US $89.99</div>
+<div class="stars-ratings">4.8</div><span class="review-ratings-count">56 product ratings</span>
+<span class="quantity-available">3 available</span><div class="ux-image-carousel-item"><img src="/c.jpg"></div>
+<div class="ux-seller-section__item--seller"><a>camera_shop</a></div>
+<div class="ux-layout-section--features"><div class="ux-layout-section__item">Brand: Canon</div></div>
+{FILLER}</body></html>""",
+    "https://www.daraz.pk/products/stand-in.html": f"""<html><body>{FILLER}
+<h1 class="pdp-mod-product-badge-title">Stand-in Earbuds</h1><span class="pdp-price">Rs 2499</span>
+<span class="score">4.2</span><a class="count">87 Ratings</a><span class="stock">In stock</span>
+<img class="gallery-preview-panel__image" src="/e.jpg"><div class="pdp-product-brand"><a>Audio Co</a></div>
+<ul class="specification-keys"><li>Battery: 20h</li></ul>{FILLER}</body></html>""",
+    "https://shop.example.com/category": listing_page(300),
+}
+
+
+def page_latency(url, html, backend, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = WebScraper(url, "products", html=html, backend=backend).extract_product_data()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result["products"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for url, html in SITE_PAGES.items():
+        soup_time, soup_products = page_latency(url, html, "soup", args.repeat)
+        lxml_time, lxml_products = page_latency(url, html, "lxml", args.repeat)
+        print(f"{url[:44]:<44}  soup {soup_time * 1000:8.2f} ms  lxml {lxml_time * 1000:8.2f} ms  "
+              f"speedup {soup_time / lxml_time:5.1f}x  identical={soup_products == lxml_products}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_stream.py
+"""Peak RSS of streaming extraction against the full-tree path on a large listing page.
+
+Each mode runs in its own subprocess so peak RSS is measured independently.
+Run from the repository root:  python -m benchmarks.bench_stream --products 50000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.standin import StandinServer
+
+LISTING_ITEM = """<div class="product-card"><h3 class="product-title">Listing item {n}</h3>
+<span class="price">${n}.50</span><span class="rating">{r}.0 stars</span>
+<p class="description">{filler}</p><a href="/p/{n}">view</a></div>
+"""
+
+
+def listing_page(products):
+    filler = "Lorem ipsum dolor sit amet. " * 8
+    items = "".join(LISTING_ITEM.format(n=n, r=n % 5, filler=filler) for n in range(products))
+    return f"<html><head><title>Category</title></head><body><div id='grid'>{items}</div></body></html>"
+
+
+def run_mode(mode, url):
+    """Child process: scrape with one mode and report counts, time and peak RSS."""
+    start = time.perf_counter()
+    if mode == "full":
+        from scraper import WebScraper
+        scraper = WebScraper(url, "products")
+        products = len(scraper.extract_product_data()["products"])
+        links = len(scraper.extract_links())
+    else:
+        from streaming import StreamingScraper
+        result = StreamingScraper(url).collect()
+        products = len(result["products"])
+        links = len(result["links"])
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "products": products, "links": links,
+                      "seconds": round(elapsed, 2), "peak_rss_mb": round(peak_kb / 1024, 1)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--mode", choices=["full", "stream"], help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.url)
+        return
+
+    page = listing_page(args.products)
+    print(f"listing page: {len(page) / 1024 / 1024:.1f} MB, {args.products} products")
+    with StandinServer(delay=0, pages={"/category": page}) as server:
+        for mode in ("full", "stream"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_stream", "--mode", mode,
+                 "--url", server.url("/category")],
+                capture_output=True, text=True, check=True,
+                env=dict(os.environ, SCRAPER_HTTP_CACHE=""),
+            )
+            print(out.stdout.strip())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_structured.py
+"""extract_product_data with the structured-data fast path against selectors only.
+
+Each known-site page from bench_selectors is served once as is and once with a
+JSON-LD Product block; a generic shop page carries JSON-LD, microdata or only
+OpenGraph product meta tags. Times parse + extract_product_data per page and
+prints the per-site hit rates and savings from structured_data.stats. Run from
+the repository root:  python -m benchmarks.bench_structured
+"""
+import argparse
+import json
+import time
+
+import structured_data
+from scraper import WebScraper
+from benchmarks.bench_selectors import FILLER, SITE_PAGES
+
+
+def json_ld(title, price, currency):
+    block = {
+        "@context": "https://schema.org", "@type": "Product", "name": title, "sku": "SKU-1",
+        "brand": {"@type": "Brand", "name": "Standin"}, "image": ["https://cdn.example.com/p.jpg"],
+        "aggregateRating": {"@type": "AggregateRating", "ratingValue": "4.4", "reviewCount": "321"},
+        "offers": {"@type": "Offer", "price": price, "priceCurrency": currency,
+                   "availability": "https://schema.org/InStock", "seller": {"name": "Standin Store"}},
+    }
+    return f'<script type="application/ld+json">{json.dumps(block)}</script>'
+
+
+def with_head(html, head):
+    return html.replace("<html>", f"<html><head>{head}</head>", 1)
+
+
+GENERIC_URL = "https://shop.example.com/p/standin-kettle"
+GENERIC_BODY = f"""<html><body>{FILLER}<div class="product"><h2 class="product-title">Standin Kettle</h2>
+<span class="price">$39.00</span><span class="rating">4.1</span></div>{FILLER}</body></html>"""
+PAGES = [
+    (url, label, html)
+    for url, html in SITE_PAGES.items() if "category" not in url
+    for label, html in [("selectors", html), ("json-ld", with_head(html, json_ld("Stand-in", "129.00", "USD")))]
+] + [
+    (GENERIC_URL, "selectors", GENERIC_BODY),
+    (GENERIC_URL, "json-ld", with_head(GENERIC_BODY, json_ld("Standin Kettle", "1,299.00", "PKR"))),
+    (GENERIC_URL, "microdata", GENERIC_BODY.replace(
+        '<div class="product">',
+        '<div class="product" itemscope itemtype="https://schema.org/Product">'
+        '<meta itemprop="name" content="Standin Kettle"><meta itemprop="price" content="39.00">'
+        '<meta itemprop="priceCurrency" content="USD">'
+        '<link itemprop="availability" href="https://schema.org/InStock">')),
+    (GENERIC_URL, "opengraph", with_head(
+        GENERIC_BODY, '<meta property="og:title" content="Standin Kettle">'
+                      '<meta property="product:price:amount" content="39.00">'
+                      '<meta property="product:price:currency" content="USD">')),
+]
+
+
+def latency(url, html, structured, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = WebScraper(url, "products", html=html, structured=structured).extract_product_data()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result["products"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for url, label, html in PAGES:
+        plain_time, plain = latency(url, html, False, args.repeat)
+        fast_time, fast = latency(url, html, True, args.repeat)
+        note = f"identical={plain == fast}" if label == "selectors" else \
+            f"price={fast[0]['price'] if fast else None} currency={fast[0]['currency'] if fast else None}"
+        print(f"{url[8:40]:<32} {label:<10} selectors {plain_time * 1000:7.2f} ms  "
+              f"structured {fast_time * 1000:7.2f} ms  {plain_time / fast_time:5.1f}x  {note}")
+    print()
+    for site, counters in structured_data.stats.snapshot().items():
+        print(f"{site:<20} {counters}")
+
+
+if __name__ == "__main__":
+    main()
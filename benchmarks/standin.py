@@ -0,0 +1,91 @@
+# benchmarks/standin.py
+"""Local HTTP stand-in for the sites we scrape, so benchmarks and tests never touch the network."""
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def product_page(n):
+    """A small product page that matches the generic product selectors."""
+    return f"""<html><head><title>Item {n}</title>
+<meta name="description" content="Stand-in product {n}">
+<meta property="og:title" content="Item {n}"></head>
+<body><h1>Item {n}</h1>
+<div class="product"><h2 class="product-title">Item {n}</h2>
+<span class="price">${n}.99</span><span class="rating">4.{n % 10}</span>
+<span class="reviews-count">{n * 3} reviews</span>
+<ul class="specifications"><li>Color: Black</li><li>Weight: {n}g</li></ul>
+<img src="/img/{n}.jpg"></div>
+<p>Contact sales{n}@example.com or +1 555 010 {n % 10000:04d}</p>
+<a href="/page/{n + 1}">next</a> <a href="https://facebook.com/shop">fb</a>
+</body></html>"""
+
+
+class StandinServer:
+    """Threaded HTTP server that serves pages from a callable after a fixed delay.
+
+    The delay stands in for network round-trip time. ``pages`` maps a request
+    path to an HTML string; when it is not given every path gets a product page.
+    With ``etags`` every page carries an ETag and a matching If-None-Match gets
+    a 304. ``requests`` records (path, If-None-Match) for each request served.
+    """
+
+    def __init__(self, delay=0.05, pages=None, port=0, etags=False):
+        self.delay = delay
+        self.pages = pages
+        self.etags = etags
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                time.sleep(server.delay)
+                server.requests.append((self.path, self.headers.get("If-None-Match")))
+                body = server.render(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                payload = body.encode("utf-8")
+                etag = f'"{hashlib.sha1(payload).hexdigest()}"' if server.etags else None
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        # Bind every interface so 127.0.0.x aliases can act as separate hosts
+        self.httpd = ThreadingHTTPServer(("", port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def render(self, path):
+        if self.pages is None:
+            digits = "".join(c for c in path if c.isdigit()) or "0"
+            return product_page(int(digits))
+        return self.pages.get(path)
+
+    def url(self, path="/", host="127.0.0.1"):
+        return f"http://{host}:{self.port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,233 @@
+# benchmarks/suite.py
+"""Offline benchmark suite: per-stage timings on recorded pages, checked against a baseline.
+
+Pages are one recorded fixture per PRODUCT_SELECTORS site (benchmarks/fixtures),
+a generic listing page and multi-MB general pages, all served by the local
+stand-in server. Stages are timed separately:
+    fetch/<page>                  HttpClient GET from the stand-in (no cache, no rate limit)
+    parse/<page>                  WebScraper construction and tree build (soup backend)
+    extract_product_data/<page>   on an already parsed page
+    extract_all_data/<page>       on an already parsed page
+    db/<method>                   Database insert and fetch paths on a temporary database
+
+Results are JSON (median/min ms per stage). With --baseline, stages whose
+best time is more than --threshold slower than the baseline's are listed under
+"regressions" and the exit status is 1; the minimum is compared because it is
+the estimate least disturbed by other load on the machine. Baselines are only
+comparable on the machine that recorded them. Run from the repository root:
+    python -m benchmarks.suite --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --quick --output results.json
+    python -m benchmarks.suite --save-baseline
+    python -m benchmarks.suite --record daraz https://www.daraz.pk/products/...
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from database import Database
+from http_client import HttpClient, polite_client
+from scraper import PRODUCT_SELECTORS, WebScraper
+from benchmarks.bench_db import pages, product_pages
+from benchmarks.bench_extract import large_page
+from benchmarks.bench_stream import listing_page
+from benchmarks.standin import StandinServer
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+# Differences smaller than this are timer noise whatever the ratio
+MIN_DELTA_MS = 0.5
+
+
+def load_fixtures():
+    """{name: (original url, html)} for every recorded fixture; every known site must have one."""
+    with open(os.path.join(FIXTURES, "index.json")) as f:
+        index = json.load(f)
+    missing = sorted(set(PRODUCT_SELECTORS) - set(index))
+    if missing:
+        sys.exit(f"No fixture for {', '.join(missing)}; record one with --record <site> <url>")
+    fixtures = {}
+    for name, entry in sorted(index.items()):
+        with open(os.path.join(FIXTURES, entry["file"]), encoding="utf-8") as f:
+            fixtures[name] = (entry["url"], f.read())
+    return fixtures
+
+
+def record(name, url):
+    """Save a live page as a fixture, fetched with robots.txt checks and a host rate limit."""
+    response = polite_client().get(url)
+    response.raise_for_status()
+    path = os.path.join(FIXTURES, "index.json")
+    with open(path) as f:
+        index = json.load(f)
+    with open(os.path.join(FIXTURES, f"{name}.html"), "w", encoding="utf-8") as f:
+        f.write(response.text)
+    index[name] = {"file": f"{name}.html", "url": url}
+    with open(path, "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"recorded {url} as {name} ({len(response.content)} bytes)")
+
+
+def timings(func, repeat, setup=None):
+    """Median and best milliseconds per call of func() or func(setup(run)); the first call only warms up."""
+    samples = []
+    for run in range(repeat + 1):
+        arg = setup(run) if setup else None
+        start = time.perf_counter()
+        func(arg) if setup else func()
+        elapsed = time.perf_counter() - start
+        if run:
+            samples.append(elapsed)
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "min_ms": round(min(samples) * 1000, 3),
+        "runs": len(samples),
+    }
+
+
+def page_stages(name, url, html, served_url, client, repeat):
+    """fetch, parse, extract_product_data and extract_all_data for one page."""
+    def parsed(scrape_type):
+        def setup(_):
+            scraper = WebScraper(url, scrape_type, html=html)
+            scraper.soup
+            return scraper
+        return setup
+
+    def parse():
+        WebScraper(url, "products", html=html).soup
+
+    return {
+        f"fetch/{name}": timings(lambda: client.get(served_url).content, repeat),
+        f"parse/{name}": timings(parse, repeat),
+        f"extract_product_data/{name}": timings(
+            lambda scraper: scraper.extract_product_data(), repeat, parsed("products")),
+        f"extract_all_data/{name}": timings(
+            lambda scraper: scraper.extract_all_data(), repeat, parsed("general")),
+    }
+
+
+def db_stages(rows, repeat):
+    """Per-row and bulk writes, then lookups, on a fresh database."""
+    def unique(items, run):
+        for item in items:
+            yield dict(item, url=f"{item['url']}?run={run}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, "suite.db"))
+        per_row = list(pages(repeat + 1))
+        results = {
+            "db/insert_data": timings(db.insert_data, repeat, lambda run: per_row[run]),
+            "db/upsert_pages": timings(
+                lambda run: db.upsert_pages(unique(pages(rows), run)), repeat, lambda run: run),
+            "db/upsert_products": timings(
+                lambda run: db.upsert_products(product_pages(rows, run * rows)), repeat, lambda run: run),
+        }
+        ids = [row[0] for row in db.cursor.execute("SELECT id FROM scraped_data LIMIT 200")]
+        results["db/fetch_data_by_id"] = timings(lambda: [db.fetch_data_by_id(i) for i in ids], repeat)
+        results["db/fetch_all_data"] = timings(db.fetch_all_data, repeat)
+        results["db/fetch_all_product_data"] = timings(db.fetch_all_product_data, repeat)
+        db.close()
+    return results
+
+
+def compare(stages, baseline, threshold):
+    regressions, improvements = {}, {}
+    for stage, result in stages.items():
+        before = baseline.get("stages", {}).get(stage)
+        if not before:
+            continue
+        ratio = result["min_ms"] / before["min_ms"] if before["min_ms"] else 1.0
+        delta = result["min_ms"] - before["min_ms"]
+        entry = {"baseline_ms": before["min_ms"], "min_ms": result["min_ms"], "ratio": round(ratio, 3)}
+        if ratio > 1 + threshold and delta > MIN_DELTA_MS:
+            regressions[stage] = entry
+        elif ratio < 1 / (1 + threshold) and -delta > MIN_DELTA_MS:
+            improvements[stage] = entry
+    return regressions, improvements
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=2000, help="rows per bulk database write")
+    parser.add_argument("--quick", action="store_true", help="skip the 5 MB page")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="flag regressions against this results file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write the results to {BASELINE}")
+    parser.add_argument("--record", nargs=2, metavar=("NAME", "URL"), help="save a live page as a fixture")
+    args = parser.parse_args()
+
+    if args.record:
+        record(*args.record)
+        return
+
+    pages_by_name = load_fixtures()
+    pages_by_name["listing"] = ("https://shop.example.com/category/headphones", listing_page(500))
+    pages_by_name["general_2mb"] = ("https://docs.example.com/large", large_page(2))
+    if not args.quick:
+        pages_by_name["general_5mb"] = ("https://docs.example.com/larger", large_page(5))
+
+    stages = {}
+    client = HttpClient(max_retries=0)
+    with StandinServer(delay=0, pages={f"/{name}": html for name, (_, html) in pages_by_name.items()}) as server:
+        for name, (url, html) in pages_by_name.items():
+            print(f"timing {name} ({len(html) / 1024:.0f} KB)", file=sys.stderr)
+            stages.update(page_stages(name, url, html, server.url(f"/{name}"), client, args.repeat))
+    client.close()
+    print("timing database paths", file=sys.stderr)
+    stages.update(db_stages(args.rows, args.repeat))
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "rows": args.rows,
+            "page_bytes": {name: len(html.encode("utf-8")) for name, (_, html) in pages_by_name.items()},
+        },
+        "stages": stages,
+    }
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions, improvements = compare(stages, json.load(f), args.threshold)
+        results["regressions"] = regressions
+        results["improvements"] = improvements
+        for stage, entry in regressions.items():
+            print(f"REGRESSION {stage}: {entry['baseline_ms']} -> {entry['min_ms']} ms "
+                  f"({entry['ratio']}x)", file=sys.stderr)
+        status = 1 if regressions else 0
+
+    output = json.dumps(results, indent=2)
+    if args.save_baseline:
+        with open(BASELINE, "w") as f:
+            f.write(output + "\n")
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    elif not args.save_baseline:
+        print(output)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# content_store.py
+"""Compression codecs for the large scraped_data columns.
+
+main_content, links and images are serialized to JSON, compressed and kept
+once per distinct value in the content_blobs table, keyed by the hash of the
+JSON. The scraped_data column then holds a ``blob:<hash>`` reference, so pages
+that share a navigation link list or an image strip store it once.
+
+zstd (the optional ``zstandard`` package) is used when installed, optionally
+with a dictionary trained on earlier blobs; zlib is the fallback.
+"""
+import hashlib
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # optional: zlib is used instead
+    zstandard = None
+
+BLOB_PREFIX = "blob:"
+# Values whose JSON is shorter than this stay inline; a reference would not be smaller
+INLINE_LIMIT = 64
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 9
+DICTIONARY_SIZE = 112 * 1024
+
+
+def blob_key(payload):
+    """Content hash identifying a serialized value."""
+    return hashlib.sha256(payload).hexdigest()[:32]
+
+
+def is_reference(value):
+    return isinstance(value, str) and value.startswith(BLOB_PREFIX)
+
+
+class BlobCodec:
+    """Compress and decompress blob payloads.
+
+    The codec name is stored with each blob so readers can decode rows written
+    with an older dictionary, or by a process without zstandard, after a switch:
+    "zlib", "zstd" or "zstd:<dictionary id>".
+    """
+
+    def __init__(self, dictionaries=None, dictionary_id=None):
+        # {dictionary id: raw dictionary bytes}; dictionary_id selects the one new blobs use
+        self.dictionaries = dict(dictionaries or {})
+        self.dictionary_id = dictionary_id if zstandard is not None else None
+        self._compressors = {}
+        self._decompressors = {}
+
+    @property
+    def name(self):
+        if zstandard is None:
+            return "zlib"
+        if self.dictionary_id is not None:
+            return f"zstd:{self.dictionary_id}"
+        return "zstd"
+
+    def _zstd_dictionary(self, dictionary_id):
+        return zstandard.ZstdCompressionDict(self.dictionaries[dictionary_id])
+
+    def compress(self, payload):
+        """Returns (codec name, compressed bytes)."""
+        name = self.name
+        if name == "zlib":
+            return name, zlib.compress(payload, ZLIB_LEVEL)
+        compressor = self._compressors.get(name)
+        if compressor is None:
+            if self.dictionary_id is None:
+                compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+            else:
+                compressor = zstandard.ZstdCompressor(
+                    level=ZSTD_LEVEL, dict_data=self._zstd_dictionary(self.dictionary_id))
+            self._compressors[name] = compressor
+        return name, compressor.compress(payload)
+
+    def decompress(self, codec, data):
+        if codec == "zlib":
+            return zlib.decompress(data)
+        if zstandard is None:
+            raise RuntimeError(f"Blob was written with {codec}; install zstandard to read it")
+        decompressor = self._decompressors.get(codec)
+        if decompressor is None:
+            _, _, dictionary_id = codec.partition(":")
+            if dictionary_id:
+                decompressor = zstandard.ZstdDecompressor(
+                    dict_data=self._zstd_dictionary(int(dictionary_id)))
+            else:
+                decompressor = zstandard.ZstdDecompressor()
+            self._decompressors[codec] = decompressor
+        return decompressor.decompress(data)
+
+
+def train_dictionary(samples, size=DICTIONARY_SIZE):
+    """Train a zstd dictionary from sample payloads (requires zstandard)."""
+    if zstandard is None:
+        raise RuntimeError("Dictionary training needs the zstandard package")
+    return zstandard.train_dictionary(size, list(samples)).as_bytes()
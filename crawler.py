@@ -0,0 +1,302 @@
+# crawler.py
+"""Discover product pages by following links from seed URLs.
+
+The frontier is a priority queue: URLs that look like product pages are
+fetched first, listing/category pages next, anything else last, shallower
+pages before deeper ones. Every discovered link is canonicalized (fragment,
+tracking parameters, Amazon /ref= segments and trailing slashes removed, query
+sorted) and checked against a Bloom filter, so the seen-set stays a few MB even
+for millions of URLs. The frontier itself is held in memory and capped at
+max_frontier URLs (about 240 bytes each, so ~25 MB at the default MAX_FRONTIER);
+links found while it is full are counted as frontier_full and left unmarked in
+the seen-set, so a later page can queue them once there is room. Pages are
+classified before extraction: product pages go through extract_product_data and
+are stored in product_data, listing pages through extract_listing_data, other
+pages only feed the frontier (or are stored in scraped_data with
+--scrape-type general).
+
+Usage:
+    python crawler.py https://shop.example.com/ --max-depth 3 --max-pages 500
+    python crawler.py https://www.daraz.pk/smartphones/ --workers 8 --scrape-type general
+    python crawler.py https://shop.example.com/ --host-rate 0.5    # default 1 req/s per host
+"""
+import argparse
+import hashlib
+import heapq
+import logging
+import math
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import requests
+
+import metrics
+from database import STORED_PAGE_FIELDS, STORED_PRODUCT_FIELDS, Database
+from http_client import get_client, polite_client
+from scraper import LISTING_URL_PATTERN, PRODUCT_URL_PATTERN, WebScraper
+
+logger = logging.getLogger(__name__)
+
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "yclid", "dclid", "mc_cid", "mc_eid", "ref", "ref_", "spm", "scm",
+    "clicktrackinfo", "_trkparms", "_trksid", "qid", "sr", "crid", "sprefix", "trk",
+}
+TRACKING_PREFIXES = ("utm_", "pf_rd_", "pd_rd_")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# Amazon appends /ref=<campaign> to product and listing paths
+AMAZON_REF_SEGMENT = re.compile(r"/ref=[^/]*$")
+SKIP_EXTENSIONS = (
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".css", ".js", ".pdf", ".zip",
+    ".mp4", ".mp3", ".woff", ".woff2", ".ttf", ".xml", ".json",
+)
+# Frontier priority classes, lower is fetched first
+PRODUCT_PRIORITY, LISTING_PRIORITY, OTHER_PRIORITY = 0, 1, 2
+# Stored pages are written in batches of this many
+WRITE_BATCH = 100
+# Listing pages are only counted, so their product blocks need no more than this
+LISTING_FIELDS = ("title", "price")
+# Default cap on queued URLs; each costs ~240 bytes, so this bounds the heap at ~25 MB
+MAX_FRONTIER = 100_000
+
+
+def canonicalize_url(url, base=None):
+    """Canonical form of a (possibly relative) link, or None if it is not http(s)."""
+    if base:
+        url = urljoin(base, url)
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower()
+    if port and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+
+    path = AMAZON_REF_SEGMENT.sub("", parts.path.rstrip("/")) or "/"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+def url_priority(url):
+    if PRODUCT_URL_PATTERN.search(url):
+        return PRODUCT_PRIORITY
+    if LISTING_URL_PATTERN.search(url):
+        return LISTING_PRIORITY
+    return OTHER_PRIORITY
+
+
+class BloomFilter:
+    """Fixed-size set membership with false positives but no false negatives.
+
+    Sized for ``capacity`` items at ``error_rate``; 1M URLs at 0.1% take about
+    1.7 MB. Bit positions come from one blake2b digest by double hashing.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        """Add an item; returns True if it was not (probably) present before."""
+        new = False
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, item):
+        return all(self.bits[p // 8] & (1 << (p % 8)) for p in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+
+class Crawler:
+    """Prioritized, depth- and domain-limited crawl from seed URLs.
+
+    Fetching, classification and extraction run on ``workers`` threads; the
+    frontier, the seen-set and database writes stay on the calling thread.
+    ``allowed_domains`` defaults to the seeds' hosts (subdomains included).
+    """
+
+    def __init__(self, seeds, max_depth=3, max_pages=1000, allowed_domains=None, workers=8,
+                 expected_urls=1_000_000, error_rate=0.001, db_name="web_scraper.db",
+                 scrape_type="products", max_frontier=MAX_FRONTIER, client=None):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.workers = workers
+        self.db_name = db_name
+        self.scrape_type = scrape_type
+        self.max_frontier = max_frontier
+        self.client = client or get_client()
+        self.seen = BloomFilter(expected_urls, error_rate)
+        self.frontier = []
+        self._seq = 0
+        self.counters = {
+            "fetched": 0, "product_pages": 0, "listing_pages": 0, "other_pages": 0, "products": 0,
+            "listing_products": 0, "errors": 0, "duplicate_links": 0, "offsite_links": 0,
+            "frontier_full": 0,
+        }
+
+        seeds = [u for u in (canonicalize_url(s) for s in seeds) if u]
+        if allowed_domains is None:
+            allowed_domains = {urlsplit(u).hostname for u in seeds}
+        self.allowed_domains = {d.lower().removeprefix("www.") for d in allowed_domains}
+        for url in seeds:
+            self.seen.add(url)
+            self._push(url, 0)
+
+    def _push(self, url, depth):
+        if len(self.frontier) >= self.max_frontier:
+            self.counters["frontier_full"] += 1
+            return
+        self._seq += 1
+        heapq.heappush(self.frontier, (url_priority(url), depth, self._seq, url))
+
+    def allowed(self, url):
+        host = urlsplit(url).hostname or ""
+        return any(host == d or host.endswith("." + d) or host == "www." + d for d in self.allowed_domains)
+
+    def _visit(self, url, depth):
+        """Fetch, classify and extract one page (worker thread)."""
+        response = self.client.get(url)
+        response.raise_for_status()
+        if "html" not in response.headers.get("Content-Type", "text/html"):
+            return "other", (None, None), []
+        scraper = WebScraper(url, self.scrape_type, html=response.content)
+        kind = scraper.classify_page(LISTING_FIELDS)
+        if kind == "product":
+            data = scraper.extract_product_data(STORED_PRODUCT_FIELDS)
+        elif kind == "listing":
+            data = scraper.extract_listing_data(LISTING_FIELDS)
+        else:
+            data = None
+        page = scraper.extract_all_data(STORED_PAGE_FIELDS) if self.scrape_type == "general" else None
+        if depth >= self.max_depth:
+            links = []
+        else:
+            links = page["links"] if page else scraper.extract_links()
+        return kind, (data, page), links
+
+    def _enqueue_links(self, links, base, depth):
+        for link in links:
+            url = canonicalize_url(link, base)
+            if not url or urlsplit(url).path.lower().endswith(SKIP_EXTENSIONS):
+                continue
+            if not self.allowed(url):
+                self.counters["offsite_links"] += 1
+                continue
+            if len(self.frontier) >= self.max_frontier:
+                self.counters["frontier_full"] += 1
+                continue
+            if not self.seen.add(url):
+                self.counters["duplicate_links"] += 1
+                continue
+            self._push(url, depth)
+
+    def run(self):
+        """Crawl until the frontier is empty or max_pages pages were fetched; returns stats()."""
+        db = Database(self.db_name)
+        products, pages = [], []
+        in_flight = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                while self.frontier or in_flight:
+                    while self.frontier and len(in_flight) < self.workers and \
+                            self.counters["fetched"] + len(in_flight) < self.max_pages:
+                        _, depth, _, url = heapq.heappop(self.frontier)
+                        in_flight[executor.submit(self._visit, url, depth)] = (url, depth)
+                    if not in_flight:
+                        break
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url, depth = in_flight.pop(future)
+                        self.counters["fetched"] += 1
+                        try:
+                            kind, (data, page), links = future.result()
+                        except Exception as e:
+                            # One bad page (network error or a parse/extraction bug) must
+                            # not end the crawl and lose the frontier
+                            self.counters["errors"] += 1
+                            metrics.inc("scraper_errors_total", site=metrics.site_label(url),
+                                        error=type(e).__name__)
+                            logger.warning(f"Crawl of {url} failed: {e}",
+                                           exc_info=not isinstance(e, requests.exceptions.RequestException))
+                            continue
+                        self.counters[f"{kind}_pages"] += 1
+                        if kind == "product" and data and data["products"]:
+                            self.counters["products"] += len(data["products"])
+                            products.append(data)
+                        elif kind == "listing" and data:
+                            # product_data holds one row per URL, so listing entries are
+                            # counted here and stored when their product pages are crawled
+                            self.counters["listing_products"] += len(data["products"])
+                        if page:
+                            pages.append(page)
+                        self._enqueue_links(links, url, depth + 1)
+                    if len(products) >= WRITE_BATCH:
+                        db.upsert_products(products)
+                        products = []
+                    if len(pages) >= WRITE_BATCH:
+                        db.upsert_pages(pages)
+                        pages = []
+            if products:
+                db.upsert_products(products)
+            if pages:
+                db.upsert_pages(pages)
+        finally:
+            db.close()
+        return self.stats()
+
+    def stats(self):
+        return dict(self.counters, frontier=len(self.frontier), seen=len(self.seen))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("seeds", nargs="+")
+    parser.add_argument("--max-depth", type=int, default=3)
+    parser.add_argument("--max-pages", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--domain", action="append", dest="domains",
+                        help="allowed domain (repeatable; default: the seeds' hosts)")
+    parser.add_argument("--scrape-type", choices=["general", "products"], default="products")
+    parser.add_argument("--db", default="web_scraper.db")
+    parser.add_argument("--host-rate", type=float, default=1.0,
+                        help="requests/second per host, with robots.txt checks (0 disables both)")
+    parser.add_argument("--max-frontier", type=int, default=MAX_FRONTIER,
+                        help="most URLs queued at once (~240 bytes each)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    client = polite_client(args.host_rate) if args.host_rate > 0 else None
+    crawler = Crawler(args.seeds, args.max_depth, args.max_pages, args.domains, args.workers,
+                      db_name=args.db, scrape_type=args.scrape_type, max_frontier=args.max_frontier,
+                      client=client)
+    start = time.perf_counter()
+    stats = crawler.run()
+    print(f"crawled {stats['fetched']} pages in {time.perf_counter() - start:.1f}s: {stats}")
+
+
+if __name__ == "__main__":
+    main()
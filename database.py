@@ -1,71 +1,464 @@
 # database.py
 import sqlite3
 import json
-from datetime import datetime
+import re
+import threading
+import time
+from itertools import islice
+from urllib.parse import urlsplit
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import metrics
+from content_store import BLOB_PREFIX, INLINE_LIMIT, BlobCodec, blob_key, is_reference, train_dictionary
+from normalize import iso_currency, minor_exponent, to_major, to_minor
+
+
+def _statements(block):
+    """Split an indented block of SQL DDL into statements (trigger bodies stay whole)."""
+    statements = []
+    current = ''
+    for line in block.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ''
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+
+def _backfill_price_minor(db):
+    """Migration 12: fill product_data.price_minor and move price_history to ISO codes.
+
+    The triggers this migration replaces scaled every price by 100 unless its
+    currency was 'JPY' or '¥' and kept symbols as stored; history rows are
+    rescaled to normalize's minor units for their ISO currency.
+    """
+    rows = db.cursor.execute('SELECT id, price, currency FROM product_data WHERE price IS NOT NULL').fetchall()
+    updates = []
+    for row_id, price, currency in rows:
+        currency = iso_currency(currency)
+        updates.append((currency, to_minor(price, currency), row_id))
+    db.cursor.executemany('UPDATE product_data SET currency = ?, price_minor = ? WHERE id = ?', updates)
+    for (stored,) in db.cursor.execute('SELECT DISTINCT currency FROM price_history').fetchall():
+        currency = iso_currency(stored)
+        factor = 10.0 ** (minor_exponent(currency) - (0 if stored in ('JPY', '¥') else 2))
+        if currency != stored or factor != 1:
+            db.cursor.execute(
+                'UPDATE price_history SET currency = ?, price_minor = CAST(round(price_minor * ?) AS INTEGER) '
+                'WHERE currency IS ?',
+                (currency, factor, stored)
+            )
+
+
+# Versioned schema migrations. PRAGMA user_version records how many have been
+# applied; new schema changes are appended here, never edited in place. A
+# migration step may also be a callable taking the Database, for backfills
+# that need Python (it runs inside the migration transaction).
+MIGRATIONS = [
+    # 1: original tables (CREATE IF NOT EXISTS so pre-migration databases adopt cleanly)
+    _statements('''
+        CREATE TABLE IF NOT EXISTS scraped_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            emails TEXT,
+            phone_numbers TEXT,
+            social_links TEXT,
+            meta_info TEXT,
+            headers TEXT,
+            main_content TEXT,
+            contact_info TEXT,
+            images TEXT,
+            links TEXT,
+            scrape_date TIMESTAMP,
+            last_updated TIMESTAMP,
+            UNIQUE(url)
+        );
+        CREATE TABLE IF NOT EXISTS scrape_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            scrape_date TIMESTAMP,
+            status TEXT,
+            error_message TEXT
+        );
+        CREATE TABLE IF NOT EXISTS product_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            title TEXT,
+            price REAL,
+            currency TEXT,
+            rating REAL,
+            reviews_count INTEGER,
+            availability TEXT,
+            image_url TEXT,
+            seller TEXT,
+            specifications TEXT,
+            scrape_date TIMESTAMP,
+            last_updated TIMESTAMP,
+            UNIQUE(url)
+        )
+    '''),
+    # 2: indexes for history lookups and newest-first listings
+    _statements('''
+        CREATE INDEX IF NOT EXISTS idx_scrape_history_url_date ON scrape_history(url, scrape_date);
+        CREATE INDEX IF NOT EXISTS idx_product_data_last_updated ON product_data(last_updated)
+    '''),
+    # 3: append-only price observations, clustered by (product, time). Prices are
+    # integer minor units; the triggers record every write to product_data.price.
+    _statements('''
+        CREATE TABLE IF NOT EXISTS price_history (
+            product_id INTEGER NOT NULL,
+            observed_at INTEGER NOT NULL,
+            price_minor INTEGER NOT NULL,
+            currency TEXT,
+            PRIMARY KEY (product_id, observed_at)
+        ) WITHOUT ROWID;
+        CREATE TRIGGER IF NOT EXISTS trg_product_price_insert AFTER INSERT ON product_data
+        WHEN NEW.price IS NOT NULL BEGIN
+            INSERT OR REPLACE INTO price_history (product_id, observed_at, price_minor, currency)
+            VALUES (NEW.id, CAST(strftime('%s', 'now') AS INTEGER),
+                    CAST(round(NEW.price * CASE WHEN NEW.currency IN ('JPY', '¥') THEN 1 ELSE 100 END) AS INTEGER),
+                    CASE NEW.currency WHEN '$' THEN 'USD' WHEN '€' THEN 'EUR' WHEN '£' THEN 'GBP'
+                                      WHEN '¥' THEN 'JPY' ELSE NEW.currency END);
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_product_price_update AFTER UPDATE OF price ON product_data
+        WHEN NEW.price IS NOT NULL BEGIN
+            INSERT OR REPLACE INTO price_history (product_id, observed_at, price_minor, currency)
+            VALUES (NEW.id, CAST(strftime('%s', 'now') AS INTEGER),
+                    CAST(round(NEW.price * CASE WHEN NEW.currency IN ('JPY', '¥') THEN 1 ELSE 100 END) AS INTEGER),
+                    CASE NEW.currency WHEN '$' THEN 'USD' WHEN '€' THEN 'EUR' WHEN '£' THEN 'GBP'
+                                      WHEN '¥' THEN 'JPY' ELSE NEW.currency END);
+        END
+    '''),
+    # 4: newest-first keyset pagination over scraped_data
+    _statements('''
+        CREATE INDEX IF NOT EXISTS idx_scraped_data_last_updated ON scraped_data(last_updated)
+    '''),
+    # 5: background scrape jobs; batch_id groups the URLs of one bulk submission
+    _statements('''
+        CREATE TABLE IF NOT EXISTS scrape_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            batch_id TEXT NOT NULL,
+            url TEXT NOT NULL,
+            scrape_type TEXT NOT NULL,
+            status TEXT NOT NULL,
+            message TEXT,
+            created_at TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_scrape_jobs_batch ON scrape_jobs(batch_id);
+        CREATE INDEX IF NOT EXISTS idx_scrape_jobs_status ON scrape_jobs(status)
+    '''),
+    # 6: URLs re-scraped on a schedule; intervals adapt to how often content changes
+    _statements('''
+        CREATE TABLE IF NOT EXISTS tracked_urls (
+            url TEXT PRIMARY KEY,
+            scrape_type TEXT NOT NULL,
+            interval_seconds REAL NOT NULL,
+            min_interval REAL NOT NULL,
+            max_interval REAL NOT NULL,
+            next_due REAL NOT NULL,
+            last_checked REAL,
+            fingerprint TEXT,
+            checks INTEGER NOT NULL DEFAULT 0,
+            changes INTEGER NOT NULL DEFAULT 0
+        )
+    '''),
+    # 7: the UPSERTs that fire the price triggers override their OR REPLACE, so two
+    # price changes within one second collided on price_history's key; upsert instead
+    _statements('''
+        DROP TRIGGER IF EXISTS trg_product_price_insert;
+        DROP TRIGGER IF EXISTS trg_product_price_update;
+        CREATE TRIGGER trg_product_price_insert AFTER INSERT ON product_data
+        WHEN NEW.price IS NOT NULL BEGIN
+            INSERT INTO price_history (product_id, observed_at, price_minor, currency)
+            VALUES (NEW.id, CAST(strftime('%s', 'now') AS INTEGER),
+                    CAST(round(NEW.price * CASE WHEN NEW.currency IN ('JPY', '¥') THEN 1 ELSE 100 END) AS INTEGER),
+                    CASE NEW.currency WHEN '$' THEN 'USD' WHEN '€' THEN 'EUR' WHEN '£' THEN 'GBP'
+                                      WHEN '¥' THEN 'JPY' ELSE NEW.currency END)
+            ON CONFLICT (product_id, observed_at) DO UPDATE
+            SET price_minor = excluded.price_minor, currency = excluded.currency;
+        END;
+        CREATE TRIGGER trg_product_price_update AFTER UPDATE OF price ON product_data
+        WHEN NEW.price IS NOT NULL BEGIN
+            INSERT INTO price_history (product_id, observed_at, price_minor, currency)
+            VALUES (NEW.id, CAST(strftime('%s', 'now') AS INTEGER),
+                    CAST(round(NEW.price * CASE WHEN NEW.currency IN ('JPY', '¥') THEN 1 ELSE 100 END) AS INTEGER),
+                    CASE NEW.currency WHEN '$' THEN 'USD' WHEN '€' THEN 'EUR' WHEN '£' THEN 'GBP'
+                                      WHEN '¥' THEN 'JPY' ELSE NEW.currency END)
+            ON CONFLICT (product_id, observed_at) DO UPDATE
+            SET price_minor = excluded.price_minor, currency = excluded.currency;
+        END
+    '''),
+    # 8: per-URL fingerprints for change detection (these replace tracked_urls.fingerprint)
+    # and each job's outcome, so a run can report how many pages were unchanged
+    _statements('''
+        CREATE TABLE IF NOT EXISTS page_fingerprints (
+            url TEXT NOT NULL,
+            scrape_type TEXT NOT NULL,
+            body_hash TEXT NOT NULL,
+            content_hash TEXT,
+            checked_at TIMESTAMP,
+            changed_at TIMESTAMP,
+            PRIMARY KEY (url, scrape_type)
+        ) WITHOUT ROWID;
+        ALTER TABLE scrape_jobs ADD COLUMN outcome TEXT;
+        ALTER TABLE tracked_urls DROP COLUMN fingerprint
+    '''),
+    # 9: compressed, deduplicated main_content/links/images; scraped_data keeps
+    # "blob:<hash>" references (see content_store.py)
+    _statements('''
+        CREATE TABLE IF NOT EXISTS content_blobs (
+            hash TEXT PRIMARY KEY,
+            codec TEXT NOT NULL,
+            raw_size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS content_dictionaries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data BLOB NOT NULL,
+            created_at TIMESTAMP
+        )
+    '''),
+    # 10: full-text search. product_search indexes product_data directly (external
+    # content, kept in sync by triggers). main_content lives compressed in
+    # content_blobs, so page_search is contentless and written by the page writers
+    # in the same transaction; snippets for pages are cut in Python.
+    _statements('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS product_search USING fts5(
+            title, specifications,
+            content='product_data', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        );
+        CREATE TRIGGER IF NOT EXISTS trg_product_search_insert AFTER INSERT ON product_data BEGIN
+            INSERT INTO product_search (rowid, title, specifications)
+            VALUES (NEW.id, NEW.title, NEW.specifications);
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_product_search_delete AFTER DELETE ON product_data BEGIN
+            INSERT INTO product_search (product_search, rowid, title, specifications)
+            VALUES ('delete', OLD.id, OLD.title, OLD.specifications);
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_product_search_update AFTER UPDATE OF title, specifications
+        ON product_data BEGIN
+            INSERT INTO product_search (product_search, rowid, title, specifications)
+            VALUES ('delete', OLD.id, OLD.title, OLD.specifications);
+            INSERT INTO product_search (rowid, title, specifications)
+            VALUES (NEW.id, NEW.title, NEW.specifications);
+        END;
+        INSERT INTO product_search (product_search, rank) VALUES ('rank', 'bm25(10.0, 1.0)');
+        INSERT INTO product_search (product_search) VALUES ('rebuild');
+        CREATE VIRTUAL TABLE IF NOT EXISTS page_search USING fts5(
+            headers, main_content,
+            content='',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''') + [lambda db: db.rebuild_page_search()],
+    # 11: product_data rows grouped into canonical products by matching.py; group_id
+    # is the lowest product id in the group
+    _statements('''
+        CREATE TABLE IF NOT EXISTS product_matches (
+            product_id INTEGER PRIMARY KEY,
+            group_id INTEGER NOT NULL,
+            site TEXT,
+            score REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_product_matches_group ON product_matches(group_id)
+    '''),
+    # 12: the product_data writers store price_minor and an ISO currency computed by
+    # normalize.py, so the price triggers copy them instead of repeating the
+    # minor-unit rule in SQL
+    _statements('''
+        DROP TRIGGER IF EXISTS trg_product_price_insert;
+        DROP TRIGGER IF EXISTS trg_product_price_update;
+        ALTER TABLE product_data ADD COLUMN price_minor INTEGER
+    ''') + [_backfill_price_minor] + _statements('''
+        CREATE TRIGGER trg_product_price_insert AFTER INSERT ON product_data
+        WHEN NEW.price_minor IS NOT NULL BEGIN
+            INSERT INTO price_history (product_id, observed_at, price_minor, currency)
+            VALUES (NEW.id, CAST(strftime('%s', 'now') AS INTEGER), NEW.price_minor, NEW.currency)
+            ON CONFLICT (product_id, observed_at) DO UPDATE
+            SET price_minor = excluded.price_minor, currency = excluded.currency;
+        END;
+        CREATE TRIGGER trg_product_price_update AFTER UPDATE OF price, price_minor ON product_data
+        WHEN NEW.price_minor IS NOT NULL BEGIN
+            INSERT INTO price_history (product_id, observed_at, price_minor, currency)
+            VALUES (NEW.id, CAST(strftime('%s', 'now') AS INTEGER), NEW.price_minor, NEW.currency)
+            ON CONFLICT (product_id, observed_at) DO UPDATE
+            SET price_minor = excluded.price_minor, currency = excluded.currency;
+        END
+    '''),
+]
+
+TRACKED_COLUMNS = ('url', 'scrape_type', 'interval_seconds', 'min_interval', 'max_interval',
+                   'next_due', 'last_checked', 'checks', 'changes')
+
+JOB_COLUMNS = ('id', 'batch_id', 'url', 'scrape_type', 'status', 'message',
+               'outcome', 'created_at', 'started_at', 'finished_at')
+# A job running for longer than this is assumed orphaned by a dead process
+STALE_JOB_SECONDS = 15 * 60
+
+# Columns the listing views need; blob columns are only read when a row is opened
+PAGE_LIST_COLUMNS = ('id', 'url', 'emails', 'phone_numbers', 'social_links', 'scrape_date', 'last_updated')
+PRODUCT_LIST_COLUMNS = ('id', 'url', 'title', 'price', 'currency', 'rating', 'reviews_count',
+                        'availability', 'seller', 'scrape_date', 'last_updated')
+# Small JSON columns that listings decode for counts
+PAGE_LIST_JSON = {'emails': [], 'phone_numbers': [], 'social_links': {}}
+
+# Extraction fields upsert_pages and upsert_products write; scrapers that only
+# store their results ask WebScraper for these and nothing else
+STORED_PAGE_FIELDS = ("meta_info", "headers", "main_content", "contact_info", "social_links", "images", "links")
+STORED_PRODUCT_FIELDS = ("title", "price", "currency", "rating", "reviews_count", "availability", "image_url",
+                         "seller", "specifications")
+
+# scraped_data columns stored in content_blobs
+CONTENT_COLUMNS = ('main_content', 'images', 'links')
+# Decompressed blobs kept per connection; shared link/image lists hit this often
+CONTENT_CACHE_SIZE = 256
+
+# Rows per query when streaming a whole table out
+EXPORT_BATCH = 1000
+
+# Search result pages
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+SNIPPET_CHARS = 160
+# Broad queries rank only their most recently written matches; bm25 over every
+# match of a term that appears in a fifth of a million rows takes ~0.5 s. Such
+# results carry truncated: True, as an older match may have scored higher.
+RANK_CANDIDATES = 10000
+_SEARCH_TERM = re.compile(r'\w+')
+
+_MAX_EPOCH = 2 ** 62
+
+
+def _epoch(value, default=None):
+    """Unix seconds from a datetime, ISO string or number (None gives default).
+
+    Naive datetimes are taken as UTC, the zone price history is bucketed and shown in.
+    """
+    if value is None:
+        return default
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+def _price_columns(product):
+    """(price, ISO currency, price_minor) for a product_data write; see normalize.py."""
+    currency = iso_currency(product.get("currency"))
+    return product.get("price"), currency, to_minor(product.get("price"), currency)
+
+
+def _parse_cursor(cursor):
+    """[last_updated, id] from a "<last_updated>|<id>" listing cursor; InvalidCursor otherwise."""
+    last_updated, _, row_id = cursor.rpartition('|')
+    try:
+        datetime.fromisoformat(last_updated)
+        return [last_updated, int(row_id)]
+    except ValueError:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from None
+
+
+def _fts_query(text):
+    """User text as an FTS5 query: every word must match; FTS5 operators are not interpreted."""
+    return ' '.join(f'"{term}"' for term in _SEARCH_TERM.findall(text))
+
+
+def _headers_text(headers):
+    return ' '.join(text for texts in (headers or {}).values() for text in texts)
+
+
+def _content_text(content):
+    return content if isinstance(content, str) else ' '.join(map(str, content or []))
+
+
+def _snippet(text, query):
+    """A window of text around the first query term, with matches wrapped in <b>."""
+    terms = _SEARCH_TERM.findall(query)
+    if not text or not terms:
+        return text[:SNIPPET_CHARS] if text else ''
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(0, match.start() - SNIPPET_CHARS // 2) if match else 0
+    window = text[start:start + SNIPPET_CHARS]
+    return (('…' if start else '') + pattern.sub(lambda m: f'<b>{m.group(0)}</b>', window)
+            + ('…' if start + SNIPPET_CHARS < len(text) else ''))
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that list_pages/list_products did not hand out."""
+
+
+class _TimedConnection(sqlite3.Connection):
+    """Connection whose commits, explicit or from ``with conn:``, are timed as "db_commit"."""
+
+    def commit(self):
+        with metrics.timed("db_commit"):
+            super().commit()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            return super().__exit__(exc_type, exc_value, traceback)
+        with metrics.timed("db_commit"):
+            return super().__exit__(exc_type, exc_value, traceback)
+
 
 class Database:
-    def __init__(self, db_name="web_scraper.db"):
-        self.conn = sqlite3.connect(db_name)
+    _migrate_lock = threading.Lock()
+
+    def __init__(self, db_name="web_scraper.db", compress_content=True):
+        self.db_name = db_name
+        # False writes main_content/links/images inline as JSON, as before content_blobs
+        self.compress_content = compress_content
+        self._codec = None
+        self._content_cache = OrderedDict()
+        # busy timeout lets a writer and concurrent Flask readers wait instead of failing
+        self.conn = sqlite3.connect(db_name, timeout=30, factory=_TimedConnection)
         self.cursor = self.conn.cursor()
-        # Drop existing tables to ensure schema consistency
-        self.cursor.execute("DROP TABLE IF EXISTS scraped_data")
-        self.cursor.execute("DROP TABLE IF EXISTS scrape_history")
-        self.cursor.execute("DROP TABLE IF EXISTS product_data")
+        self._configure()
         self.create_tables()
 
+    def _configure(self):
+        """Per-connection pragmas. WAL lets readers proceed while a crawler writes."""
+        if self.db_name != ":memory:":
+            self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+        self.cursor.execute("PRAGMA cache_size=-20000")
+        self.cursor.execute("PRAGMA temp_store=MEMORY")
+        self.cursor.execute("PRAGMA busy_timeout=30000")
+
     def create_tables(self):
-        """Create necessary tables with expanded schema"""
-        # Table for general scraped data
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scraped_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                url TEXT NOT NULL,
-                emails TEXT,
-                phone_numbers TEXT,
-                social_links TEXT,
-                meta_info TEXT,
-                headers TEXT,
-                main_content TEXT,
-                contact_info TEXT,
-                images TEXT,
-                links TEXT,
-                scrape_date TIMESTAMP,
-                last_updated TIMESTAMP,
-                UNIQUE(url)
-            )
-        ''')
-        
-        # Table for logging scrape attempts
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scrape_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                url TEXT NOT NULL,
-                scrape_date TIMESTAMP,
-                status TEXT,
-                error_message TEXT
-            )
-        ''')
-        
-        # Table for product-specific data
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS product_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                url TEXT NOT NULL,
-                title TEXT,
-                price REAL,
-                currency TEXT,
-                rating REAL,
-                reviews_count INTEGER,
-                availability TEXT,
-                image_url TEXT,
-                seller TEXT,
-                specifications TEXT,
-                scrape_date TIMESTAMP,
-                last_updated TIMESTAMP,
-                UNIQUE(url)
-            )
-        ''')
-        self.conn.commit()
+        """Bring the schema up to date by applying any pending migrations.
+
+        user_version is read on every connection rather than remembered per file
+        name, so a database deleted and recreated mid-process is migrated again.
+        """
+        if self.cursor.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+            return
+        with Database._migrate_lock:
+            version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+            if version < len(MIGRATIONS):
+                # IMMEDIATE takes the write lock so two processes cannot migrate at once
+                self.cursor.execute("BEGIN IMMEDIATE")
+                try:
+                    version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+                    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+                        for statement in statements:
+                            if callable(statement):
+                                statement(self)
+                            else:
+                                self.cursor.execute(statement)
+                        self.cursor.execute(f"PRAGMA user_version = {number}")
+                    self.conn.commit()
+                except Exception:
+                    self.conn.rollback()
+                    raise
 
     def log_scrape_attempt(self, url, status, error_message=None):
         """Log a scrape attempt into the scrape_history table."""
@@ -79,33 +472,38 @@ class Database:
     def insert_data(self, data):
         """Insert scraped data into the database with JSON serialization"""
         current_time = datetime.now().isoformat()
-        
-        self.cursor.execute('''
-            INSERT INTO scraped_data (
-                url, emails, phone_numbers, social_links, meta_info,
-                headers, main_content, contact_info, images, links,
-                scrape_date, last_updated
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        start = time.perf_counter()
+        row = (
             data["url"],
             json.dumps(data.get("emails", [])),
             json.dumps(data.get("phone_numbers", [])),
             json.dumps(data.get("social_links", [])),
             json.dumps(data.get("meta_info", {})),
             json.dumps(data.get("headers", {})),
-            json.dumps(data.get("main_content", [])),
+            self._store_content(data.get("main_content", [])),
             json.dumps(data.get("contact_info", {})),
-            json.dumps(data.get("images", [])),
-            json.dumps(data.get("links", [])),
+            self._store_content(data.get("images", [])),
+            self._store_content(data.get("links", [])),
             current_time,
             current_time
-        ))
+        )
+        metrics.observe("serialize", time.perf_counter() - start)
+
+        self.cursor.execute('''
+            INSERT INTO scraped_data (
+                url, emails, phone_numbers, social_links, meta_info,
+                headers, main_content, contact_info, images, links,
+                scrape_date, last_updated
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', row)
+        self._index_pages([(data["url"], data)])
         self.conn.commit()
 
     def update_data(self, url, data):
         """Update existing data with JSON serialization"""
         current_time = datetime.now().isoformat()
+        self._unindex_pages([url])
         
         self.cursor.execute('''
             UPDATE scraped_data
@@ -126,13 +524,14 @@ class Database:
             json.dumps(data.get("social_links", [])),
             json.dumps(data.get("meta_info", {})),
             json.dumps(data.get("headers", {})),
-            json.dumps(data.get("main_content", [])),
+            self._store_content(data.get("main_content", [])),
             json.dumps(data.get("contact_info", {})),
-            json.dumps(data.get("images", [])),
-            json.dumps(data.get("links", [])),
+            self._store_content(data.get("images", [])),
+            self._store_content(data.get("links", [])),
             current_time,
             url
         ))
+        self._index_pages([(url, data)])
         self.conn.commit()
 
     def insert_product_data(self, product_data):
@@ -140,18 +539,19 @@ class Database:
         current_time = datetime.now().isoformat()
         
         for product in product_data.get("products", []):
+            price, currency, price_minor = _price_columns(product)
             self.cursor.execute('''
                 INSERT INTO product_data (
                     url, title, price, currency, rating, reviews_count,
                     availability, image_url, seller, specifications,
-                    scrape_date, last_updated
+                    scrape_date, last_updated, price_minor
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 product_data["url"],
                 product.get("title"),
-                product.get("price"),
-                product.get("currency"),
+                price,
+                currency,
                 product.get("rating"),
                 product.get("reviews_count"),
                 product.get("availability"),
@@ -159,7 +559,8 @@ class Database:
                 product.get("seller"),
                 json.dumps(product.get("specifications", {})),
                 current_time,
-                current_time
+                current_time,
+                price_minor
             ))
         self.conn.commit()
 
@@ -168,10 +569,12 @@ class Database:
         current_time = datetime.now().isoformat()
         
         for product in product_data.get("products", []):
+            price, currency, price_minor = _price_columns(product)
             self.cursor.execute('''
                 UPDATE product_data
                 SET title = ?,
                     price = ?,
+                    price_minor = ?,
                     currency = ?,
                     rating = ?,
                     reviews_count = ?,
@@ -183,8 +586,9 @@ class Database:
                 WHERE url = ?
             ''', (
                 product.get("title"),
-                product.get("price"),
-                product.get("currency"),
+                price,
+                price_minor,
+                currency,
                 product.get("rating"),
                 product.get("reviews_count"),
                 product.get("availability"),
@@ -196,6 +600,763 @@ class Database:
             ))
         self.conn.commit()
 
+    @metrics.traced("store")
+    def upsert_pages(self, pages, batch_size=5000):
+        """Insert or update many extract_all_data results, one transaction per batch.
+
+        Returns the number of rows written. scrape_date keeps its first value.
+        page_search is updated in the same transactions.
+        """
+        def rows():
+            for data in pages:
+                current_time = datetime.now().isoformat()
+                start = time.perf_counter()
+                row = (
+                    data["url"],
+                    json.dumps(data.get("emails", [])),
+                    json.dumps(data.get("phone_numbers", [])),
+                    json.dumps(data.get("social_links", [])),
+                    json.dumps(data.get("meta_info", {})),
+                    json.dumps(data.get("headers", {})),
+                    self._store_content(data.get("main_content", [])),
+                    json.dumps(data.get("contact_info", {})),
+                    self._store_content(data.get("images", [])),
+                    self._store_content(data.get("links", [])),
+                    current_time,
+                    current_time
+                )
+                metrics.observe("serialize", time.perf_counter() - start)
+                yield data, row
+
+        written = 0
+        items = rows()
+        while True:
+            batch = list(islice(items, batch_size))
+            if not batch:
+                return written
+            with self.conn:
+                self._unindex_pages([data["url"] for data, _ in batch])
+                self.cursor.executemany('''
+                    INSERT INTO scraped_data (
+                        url, emails, phone_numbers, social_links, meta_info,
+                        headers, main_content, contact_info, images, links,
+                        scrape_date, last_updated
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        emails = excluded.emails,
+                        phone_numbers = excluded.phone_numbers,
+                        social_links = excluded.social_links,
+                        meta_info = excluded.meta_info,
+                        headers = excluded.headers,
+                        main_content = excluded.main_content,
+                        contact_info = excluded.contact_info,
+                        images = excluded.images,
+                        links = excluded.links,
+                        last_updated = excluded.last_updated
+                ''', [row for _, row in batch])
+                self._index_pages([(data["url"], data) for data, _ in batch])
+            written += len(batch)
+
+    @metrics.traced("store")
+    def upsert_products(self, product_pages, batch_size=5000):
+        """Insert or update products from many extract_product_data results.
+
+        Each item is a dict with "url" and "products"; rows are written with
+        executemany in one transaction per batch. Returns the number of rows written.
+        """
+        def rows():
+            for product_data in product_pages:
+                current_time = datetime.now().isoformat()
+                for product in product_data.get("products", []):
+                    start = time.perf_counter()
+                    price, currency, price_minor = _price_columns(product)
+                    row = (
+                        product_data["url"],
+                        product.get("title"),
+                        price,
+                        currency,
+                        product.get("rating"),
+                        product.get("reviews_count"),
+                        product.get("availability"),
+                        product.get("image_url"),
+                        product.get("seller"),
+                        json.dumps(product.get("specifications", {})),
+                        current_time,
+                        current_time,
+                        price_minor
+                    )
+                    metrics.observe("serialize", time.perf_counter() - start)
+                    yield row
+
+        return self._executemany_batched('''
+            INSERT INTO product_data (
+                url, title, price, currency, rating, reviews_count,
+                availability, image_url, seller, specifications,
+                scrape_date, last_updated, price_minor
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                title = excluded.title,
+                price = excluded.price,
+                price_minor = excluded.price_minor,
+                currency = excluded.currency,
+                rating = excluded.rating,
+                reviews_count = excluded.reviews_count,
+                availability = excluded.availability,
+                image_url = excluded.image_url,
+                seller = excluded.seller,
+                specifications = excluded.specifications,
+                last_updated = excluded.last_updated
+        ''', rows(), batch_size)
+
+    def _executemany_batched(self, sql, rows, batch_size):
+        """Run executemany over an iterable of rows, committing once per batch."""
+        written = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                written += self._write_batch(sql, batch)
+                batch = []
+        if batch:
+            written += self._write_batch(sql, batch)
+        return written
+
+    def _write_batch(self, sql, batch):
+        with self.conn:
+            self.cursor.executemany(sql, batch)
+        return len(batch)
+
+    def _indexed_page_text(self, urls):
+        """(id, headers, main_content) text of existing rows, as page_search indexed them."""
+        rows = self.conn.execute('''
+            SELECT id, headers, main_content FROM scraped_data
+            WHERE url IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(list(urls)),)).fetchall()
+        return [
+            (row_id, _headers_text(json.loads(headers) if headers else {}),
+             _content_text(self._load_content(main_content)))
+            for row_id, headers, main_content in rows
+        ]
+
+    def _unindex_pages(self, urls):
+        """Remove the current rows for these URLs from page_search (before they are rewritten)."""
+        self.conn.executemany(
+            "INSERT INTO page_search (page_search, rowid, headers, main_content) VALUES ('delete', ?, ?, ?)",
+            self._indexed_page_text(set(urls))
+        )
+
+    def _index_pages(self, pages):
+        """Add (url, data) pairs to page_search once their scraped_data rows are written."""
+        latest = dict(pages)
+        ids = dict(self.conn.execute(
+            'SELECT url, id FROM scraped_data WHERE url IN (SELECT value FROM json_each(?))',
+            (json.dumps(list(latest)),)
+        ))
+        self.conn.executemany(
+            'INSERT INTO page_search (rowid, headers, main_content) VALUES (?, ?, ?)',
+            [(ids[url], _headers_text(data.get("headers", {})), _content_text(data.get("main_content", [])))
+             for url, data in latest.items() if url in ids]
+        )
+
+    def rebuild_page_search(self, batch_size=1000):
+        """Re-index every scraped_data row in page_search."""
+        started = not self.conn.in_transaction
+        self.conn.execute("INSERT INTO page_search (page_search) VALUES ('delete-all')")
+        self.conn.execute("INSERT INTO page_search (page_search, rank) VALUES ('rank', 'bm25(5.0, 1.0)')")
+        last_id = 0
+        while True:
+            rows = self.conn.execute(
+                'SELECT id, headers, main_content FROM scraped_data WHERE id > ? ORDER BY id LIMIT ?',
+                (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            self.conn.executemany(
+                'INSERT INTO page_search (rowid, headers, main_content) VALUES (?, ?, ?)',
+                [(row_id, _headers_text(json.loads(headers) if headers else {}),
+                  _content_text(self._load_content(main_content)))
+                 for row_id, headers, main_content in rows]
+            )
+        if started:
+            self.conn.commit()
+
+    def _rank_floor(self, table, query):
+        """(rowid, truncated): rank the matches above rowid.
+
+        That is every match, or for broad queries only the newest
+        RANK_CANDIDATES, in which case truncated is True.
+        """
+        row = self.conn.execute(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?',
+            (query, RANK_CANDIDATES)
+        ).fetchone()
+        return (row[0], True) if row else (0, False)
+
+    def search_products(self, text, limit=SEARCH_LIMIT, offset=0):
+        """Products whose title or specifications match every word of text, best first.
+
+        Titles weigh ten times as much as specifications. Returns
+        {"results": [...], "next_offset": int or None, "truncated": bool};
+        truncated means more than RANK_CANDIDATES products matched and only the
+        newest of them were ranked.
+        """
+        query = _fts_query(text)
+        if not query:
+            return {'results': [], 'next_offset': None, 'truncated': False}
+        floor, truncated = self._rank_floor('product_search', query)
+        self.cursor.execute('''
+            SELECT p.id, p.url, p.title, p.price, p.currency, p.rating, hits.snippet, hits.rank
+            FROM (
+                SELECT rowid, snippet(product_search, -1, '<b>', '</b>', '…', 12) AS snippet, rank
+                FROM product_search
+                WHERE product_search MATCH ? AND rowid > ?
+                ORDER BY rank
+                LIMIT ? OFFSET ?
+            ) AS hits
+            JOIN product_data p ON p.id = hits.rowid
+            ORDER BY hits.rank
+        ''', (query, floor, limit + 1, offset))
+        columns = ('id', 'url', 'title', 'price', 'currency', 'rating', 'snippet', 'score')
+        return self._search_page([dict(zip(columns, row)) for row in self.cursor.fetchall()],
+                                 limit, offset, truncated)
+
+    def search_pages(self, text, limit=SEARCH_LIMIT, offset=0):
+        """Pages whose headers or main content match every word of text, best first.
+
+        Only the returned rows' main_content is decompressed, to cut their snippets.
+        Broad queries are truncated as in search_products.
+        """
+        query = _fts_query(text)
+        if not query:
+            return {'results': [], 'next_offset': None, 'truncated': False}
+        floor, truncated = self._rank_floor('page_search', query)
+        self.cursor.execute('''
+            SELECT d.id, d.url, d.headers, d.main_content, hits.rank
+            FROM (
+                SELECT rowid, rank FROM page_search
+                WHERE page_search MATCH ? AND rowid > ?
+                ORDER BY rank
+                LIMIT ? OFFSET ?
+            ) AS hits
+            JOIN scraped_data d ON d.id = hits.rowid
+            ORDER BY hits.rank
+        ''', (query, floor, limit + 1, offset))
+        results = []
+        for row_id, url, headers, main_content, score in self.cursor.fetchall():
+            headers = json.loads(headers) if headers else {}
+            results.append({
+                'id': row_id,
+                'url': url,
+                'title': next(iter(headers.get('h1') or []), None),
+                'snippet': _snippet(_content_text(self._load_content(main_content)), text),
+                'score': score
+            })
+        return self._search_page(results, limit, offset, truncated)
+
+    @staticmethod
+    def _search_page(results, limit, offset, truncated):
+        next_offset = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_offset = offset + limit
+        return {'results': results, 'next_offset': next_offset, 'truncated': truncated}
+
+    @property
+    def content_codec(self):
+        """Codec for new blobs, using the most recently trained dictionary if any."""
+        if self._codec is None:
+            rows = self.conn.execute('SELECT id, data FROM content_dictionaries ORDER BY id').fetchall()
+            self._codec = BlobCodec(dict(rows), rows[-1][0] if rows else None)
+        return self._codec
+
+    def _store_content(self, value):
+        """Serialize a content column: a blob reference, or inline JSON for small values."""
+        serialized = json.dumps(value)
+        if not self.compress_content or len(serialized) < INLINE_LIMIT:
+            return serialized
+        payload = serialized.encode('utf-8')
+        key = blob_key(payload)
+        # Identical values are stored once; skip compressing when the blob exists
+        if self.conn.execute('SELECT 1 FROM content_blobs WHERE hash = ?', (key,)).fetchone() is None:
+            codec, data = self.content_codec.compress(payload)
+            self.conn.execute(
+                'INSERT OR IGNORE INTO content_blobs (hash, codec, raw_size, data) VALUES (?, ?, ?, ?)',
+                (key, codec, len(payload), data)
+            )
+        return BLOB_PREFIX + key
+
+    def _load_content(self, stored):
+        """Decode a content column written by _store_content (or inline JSON from older rows)."""
+        if not stored:
+            return []
+        if not is_reference(stored):
+            return json.loads(stored)
+        key = stored[len(BLOB_PREFIX):]
+        payload = self._content_cache.get(key)
+        if payload is None:
+            row = self.conn.execute('SELECT codec, data FROM content_blobs WHERE hash = ?', (key,)).fetchone()
+            if row is None:
+                return []
+            payload = self.content_codec.decompress(*row)
+            self._content_cache[key] = payload
+            if len(self._content_cache) > CONTENT_CACHE_SIZE:
+                self._content_cache.popitem(last=False)
+        else:
+            self._content_cache.move_to_end(key)
+        return json.loads(payload)
+
+    def compress_existing_content(self, batch_size=500):
+        """Move inline main_content/links/images JSON of older rows into content_blobs.
+
+        Returns the number of rows rewritten.
+        """
+        rewritten = 0
+        last_id = 0
+        while True:
+            rows = self.conn.execute(f'''
+                SELECT id, {", ".join(CONTENT_COLUMNS)} FROM scraped_data
+                WHERE id > ? ORDER BY id LIMIT ?
+            ''', (last_id, batch_size)).fetchall()
+            if not rows:
+                return rewritten
+            last_id = rows[-1][0]
+            with self.conn:
+                for row_id, *stored in rows:
+                    if all(not value or is_reference(value) for value in stored):
+                        continue
+                    values = [self._store_content(self._load_content(value)) for value in stored]
+                    self.conn.execute(
+                        f'UPDATE scraped_data SET {", ".join(f"{c} = ?" for c in CONTENT_COLUMNS)} WHERE id = ?',
+                        (*values, row_id)
+                    )
+                    rewritten += 1
+
+    def train_content_dictionary(self, samples=2000):
+        """Train a zstd dictionary on existing blobs; later writes compress with it.
+
+        Requires the zstandard package. Blobs already stored keep their codec.
+        Returns the new dictionary's id.
+        """
+        rows = self.conn.execute(
+            'SELECT codec, data FROM content_blobs ORDER BY random() LIMIT ?', (samples,)
+        ).fetchall()
+        dictionary = train_dictionary(self.content_codec.decompress(codec, data) for codec, data in rows)
+        with self.conn:
+            self.cursor.execute('INSERT INTO content_dictionaries (data, created_at) VALUES (?, ?)',
+                                (dictionary, datetime.now().isoformat()))
+        self._codec = None
+        return self.cursor.lastrowid
+
+    def prune_content_blobs(self):
+        """Delete blobs no scraped_data row references any more; returns how many."""
+        references = ' UNION '.join(
+            f"SELECT substr({column}, {len(BLOB_PREFIX) + 1}) FROM scraped_data WHERE {column} LIKE '{BLOB_PREFIX}%'"
+            for column in CONTENT_COLUMNS
+        )
+        with self.conn:
+            self.cursor.execute(f'DELETE FROM content_blobs WHERE hash NOT IN ({references})')
+        return self.cursor.rowcount
+
+    def content_stats(self):
+        """Blob count, and raw vs stored bytes, for the content store."""
+        blobs, raw_bytes, stored_bytes = self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(length(data)), 0) FROM content_blobs'
+        ).fetchone()
+        return {'blobs': blobs, 'raw_bytes': raw_bytes, 'stored_bytes': stored_bytes,
+                'codec': self.content_codec.name}
+
+    def product_id(self, url):
+        """Return the product_data id for a URL, or None."""
+        row = self.cursor.execute('SELECT id FROM product_data WHERE url = ?', (url,)).fetchone()
+        return row[0] if row else None
+
+    def record_price_observations(self, observations, batch_size=5000):
+        """Append (product_id, observed_at, price_minor, currency) rows, e.g. for backfills.
+
+        observed_at may be a datetime or Unix seconds. Normal scrapes do not need
+        this: the product_data triggers record every price write.
+        """
+        rows = (
+            (product_id, _epoch(observed_at), price_minor, currency)
+            for product_id, observed_at, price_minor, currency in observations
+        )
+        return self._executemany_batched('''
+            INSERT OR REPLACE INTO price_history (product_id, observed_at, price_minor, currency)
+            VALUES (?, ?, ?, ?)
+        ''', rows, batch_size)
+
+    def fetch_price_history(self, product_id, start=None, end=None):
+        """Price observations for one product in [start, end], oldest first; times are UTC."""
+        self.cursor.execute('''
+            SELECT observed_at, price_minor, currency FROM price_history
+            WHERE product_id = ? AND observed_at BETWEEN ? AND ?
+            ORDER BY observed_at
+        ''', (product_id, _epoch(start, 0), _epoch(end, _MAX_EPOCH)))
+        return [
+            {
+                'observed_at': datetime.fromtimestamp(observed_at, timezone.utc).isoformat(),
+                'price_minor': price_minor,
+                'price': to_major(price_minor, currency),
+                'currency': currency
+            }
+            for observed_at, price_minor, currency in self.cursor.fetchall()
+        ]
+
+    def fetch_daily_prices(self, product_id, start=None, end=None):
+        """Per-day (UTC) min, max and last price for one product in [start, end]."""
+        self.cursor.execute('''
+            WITH days AS (
+                SELECT observed_at / 86400 AS day,
+                       MIN(price_minor) AS low,
+                       MAX(price_minor) AS high,
+                       MAX(observed_at) AS last_at,
+                       COUNT(*) AS observations
+                FROM price_history
+                WHERE product_id = ? AND observed_at BETWEEN ? AND ?
+                GROUP BY day
+            )
+            SELECT days.day, days.low, days.high, h.price_minor, h.currency, days.observations
+            FROM days
+            JOIN price_history h ON h.product_id = ? AND h.observed_at = days.last_at
+            ORDER BY days.day
+        ''', (product_id, _epoch(start, 0), _epoch(end, _MAX_EPOCH), product_id))
+        return [
+            {
+                'date': datetime.fromtimestamp(day * 86400, timezone.utc).date().isoformat(),
+                'min': to_major(low, currency),
+                'max': to_major(high, currency),
+                'last': to_major(last, currency),
+                'currency': currency,
+                'observations': observations
+            }
+            for day, low, high, last, currency, observations in self.cursor.fetchall()
+        ]
+
+    def compact_price_history(self, older_than_days=30, retention_days=None):
+        """Thin old observations to the last one per product per day, and drop expired ones.
+
+        Observations older than ``older_than_days`` keep only each day's last price;
+        with ``retention_days`` anything older than that is deleted outright.
+        Returns the number of rows removed.
+        """
+        now = int(datetime.now().timestamp())
+        removed = 0
+        with self.conn:
+            if retention_days is not None:
+                self.cursor.execute('DELETE FROM price_history WHERE observed_at < ?',
+                                    (now - retention_days * 86400,))
+                removed += self.cursor.rowcount
+            self.cursor.execute('''
+                DELETE FROM price_history
+                WHERE observed_at < :cutoff
+                  AND (product_id, observed_at) NOT IN (
+                      SELECT product_id, MAX(observed_at) FROM price_history
+                      WHERE observed_at < :cutoff
+                      GROUP BY product_id, observed_at / 86400
+                  )
+            ''', {'cutoff': now - older_than_days * 86400})
+            removed += self.cursor.rowcount
+        return removed
+
+    def iter_products_for_matching(self, batch_size=10000):
+        """(id, url, title, specifications JSON, image_url) for every product, in id order."""
+        last_id = 0
+        while True:
+            rows = self.conn.execute('''
+                SELECT id, url, title, specifications, image_url FROM product_data
+                WHERE id > ? ORDER BY id LIMIT ?
+            ''', (last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1][0]
+
+    def replace_product_matches(self, rows):
+        """Swap in a new set of (product_id, group_id, site, score) rows in one transaction."""
+        with self.conn:
+            self.cursor.execute('DELETE FROM product_matches')
+            self.cursor.executemany(
+                'INSERT INTO product_matches (product_id, group_id, site, score) VALUES (?, ?, ?, ?)', rows
+            )
+
+    def fetch_matched_products(self, product_id):
+        """Every listing of the same canonical product as product_id, cheapest first.
+
+        Prices are compared as stored; listings in other currencies sort by their
+        own amounts.
+        """
+        self.cursor.execute('''
+            SELECT p.id, p.url, m.site, p.title, p.price, p.currency, p.availability, m.score, m.group_id
+            FROM product_matches m
+            JOIN product_data p ON p.id = m.product_id
+            WHERE m.group_id = (SELECT group_id FROM product_matches WHERE product_id = ?)
+            ORDER BY p.price IS NULL, p.price, p.id
+        ''', (product_id,))
+        columns = ('id', 'url', 'site', 'title', 'price', 'currency', 'availability', 'score', 'group_id')
+        return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+
+    def list_match_groups(self, limit=50, offset=0, min_sites=2):
+        """Canonical products listed on at least min_sites sites, largest price spread first."""
+        self.cursor.execute('''
+            SELECT m.group_id, canonical.title, COUNT(*), COUNT(DISTINCT m.site),
+                   MIN(p.price), MAX(p.price)
+            FROM product_matches m
+            JOIN product_data p ON p.id = m.product_id
+            JOIN product_data canonical ON canonical.id = m.group_id
+            GROUP BY m.group_id
+            HAVING COUNT(DISTINCT m.site) >= ?
+            ORDER BY MAX(p.price) - MIN(p.price) DESC, m.group_id
+            LIMIT ? OFFSET ?
+        ''', (min_sites, limit, offset))
+        columns = ('group_id', 'title', 'listings', 'sites', 'min_price', 'max_price')
+        return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+
+    def count_pages(self):
+        """Number of rows in scraped_data."""
+        return self.cursor.execute('SELECT COUNT(*) FROM scraped_data').fetchone()[0]
+
+    def count_products(self):
+        """Number of rows in product_data."""
+        return self.cursor.execute('SELECT COUNT(*) FROM product_data').fetchone()[0]
+
+    def list_pages(self, limit=50, cursor=None):
+        """One newest-first page of scraped_data listing columns.
+
+        Returns {"rows": [...], "next_cursor": str or None}; pass next_cursor back
+        to get the following page. Blob columns are not read.
+        """
+        page = self._list('scraped_data', PAGE_LIST_COLUMNS, limit, cursor)
+        for row in page['rows']:
+            for column, empty in PAGE_LIST_JSON.items():
+                row[column] = json.loads(row[column]) if row[column] else empty
+        return page
+
+    def list_products(self, limit=50, cursor=None):
+        """One newest-first page of product_data listing columns (no specifications)."""
+        return self._list('product_data', PRODUCT_LIST_COLUMNS, limit, cursor)
+
+    def _list(self, table, columns, limit, cursor):
+        """Keyset pagination on (last_updated, id) descending."""
+        sql = f'SELECT {", ".join(columns)} FROM {table}'
+        params = []
+        if cursor:
+            sql += ' WHERE (last_updated, id) < (?, ?)'
+            params += _parse_cursor(cursor)
+        sql += ' ORDER BY last_updated DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
+        self.cursor.execute(sql, params)
+        rows = [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = f"{rows[-1]['last_updated']}|{rows[-1]['id']}"
+        return {'rows': rows, 'next_cursor': next_cursor}
+
+    def iter_pages(self, site=None, since=None, until=None, updated_since=None, batch_size=EXPORT_BATCH):
+        """Every matching scraped_data row, deserialized, oldest last_updated first.
+
+        See _iter_rows for the filters. Rows are read in keyset-paginated
+        chunks, so memory stays flat however large the table is.
+        """
+        return self._iter_rows('scraped_data', self._deserialize_row, site, since, until, updated_since,
+                               batch_size)
+
+    def iter_products(self, site=None, since=None, until=None, updated_since=None, batch_size=EXPORT_BATCH):
+        """Every matching product_data row, deserialized, oldest last_updated first."""
+        return self._iter_rows('product_data', self._deserialize_product_row, site, since, until,
+                               updated_since, batch_size)
+
+    def _iter_rows(self, table, deserialize, site, since, until, updated_since, batch_size):
+        """Yield rows chunk by chunk in (last_updated, id) order.
+
+        site matches the URL's host ("daraz" or "www.daraz.pk"); since/until
+        bound scrape_date (inclusive/exclusive); updated_since keeps rows
+        updated strictly after it, for incremental exports. Dates may be
+        datetimes or ISO strings. Each chunk is its own query, so no read
+        transaction stays open while the caller writes rows out.
+        """
+        conditions, params = [], []
+        if site:
+            # Narrows the scan; % and _ in site are literal, and the host check below decides
+            conditions.append("url LIKE ? ESCAPE '\\'")
+            params.append('%' + re.sub(r'([\\%_])', r'\\\1', site) + '%')
+        for column, operator, value in (('scrape_date', '>=', since), ('scrape_date', '<', until),
+                                        ('last_updated', '>', updated_since)):
+            if value is not None:
+                conditions.append(f'{column} {operator} ?')
+                params.append(value.isoformat() if isinstance(value, datetime) else str(value))
+        where = ' AND '.join(conditions)
+        position = None
+        while True:
+            keyset = ['(last_updated, id) > (?, ?)'] if position else []
+            clauses = ' AND '.join(filter(None, [where] + keyset))
+            rows = self.conn.execute(
+                f'SELECT * FROM {table} {"WHERE " + clauses if clauses else ""} '
+                f'ORDER BY last_updated, id LIMIT ?',
+                params + list(position or ()) + [batch_size]
+            ).fetchall()
+            for row in rows:
+                if site and site.lower() not in (urlsplit(row[1]).hostname or ''):
+                    continue
+                yield deserialize(row)
+            if len(rows) < batch_size:
+                return
+            # Both tables end with (..., scrape_date, last_updated) and start with id
+            position = (rows[-1][12], rows[-1][0])
+
+    def fetch_data_by_id(self, row_id):
+        """Open one scraped_data row with every column deserialized."""
+        self.cursor.execute('SELECT * FROM scraped_data WHERE id = ?', (row_id,))
+        row = self.cursor.fetchone()
+        return self._deserialize_row(row) if row else None
+
+    def fetch_product_by_id(self, row_id):
+        """Open one product_data row with specifications deserialized."""
+        self.cursor.execute('SELECT * FROM product_data WHERE id = ?', (row_id,))
+        row = self.cursor.fetchone()
+        return self._deserialize_product_row(row) if row else None
+
+    def create_jobs(self, batch_id, urls, scrape_type):
+        """Queue one job per URL under a batch id; returns the new job ids in order."""
+        current_time = datetime.now().isoformat()
+        job_ids = []
+        with self.conn:
+            for url in urls:
+                self.cursor.execute('''
+                    INSERT INTO scrape_jobs (batch_id, url, scrape_type, status, created_at)
+                    VALUES (?, ?, ?, 'queued', ?)
+                ''', (batch_id, url, scrape_type, current_time))
+                job_ids.append(self.cursor.lastrowid)
+        return job_ids
+
+    def start_job(self, job_id):
+        """Claim a queued job by marking it running; False if another worker already has it."""
+        with self.conn:
+            self.cursor.execute(
+                "UPDATE scrape_jobs SET status = 'running', started_at = ? WHERE id = ? AND status = 'queued'",
+                (datetime.now().isoformat(), job_id)
+            )
+            return self.cursor.rowcount == 1
+
+    def finish_job(self, job_id, status, message=None, outcome=None):
+        """Record a job's final status ('done' or 'error'), result message and change outcome."""
+        with self.conn:
+            self.cursor.execute(
+                'UPDATE scrape_jobs SET status = ?, message = ?, outcome = ?, finished_at = ? WHERE id = ?',
+                (status, message, outcome, datetime.now().isoformat(), job_id)
+            )
+
+    def fetch_job(self, job_id):
+        """One job as a dict, or None."""
+        self.cursor.execute(f'SELECT {", ".join(JOB_COLUMNS)} FROM scrape_jobs WHERE id = ?', (job_id,))
+        row = self.cursor.fetchone()
+        return dict(zip(JOB_COLUMNS, row)) if row else None
+
+    def fetch_batch_jobs(self, batch_id):
+        """Every job of one bulk submission, in submission order."""
+        self.cursor.execute(
+            f'SELECT {", ".join(JOB_COLUMNS)} FROM scrape_jobs WHERE batch_id = ? ORDER BY id',
+            (batch_id,)
+        )
+        return [dict(zip(JOB_COLUMNS, row)) for row in self.cursor.fetchall()]
+
+    def fetch_unfinished_jobs(self, stale_after=STALE_JOB_SECONDS):
+        """Queued jobs, after requeueing running ones started more than stale_after seconds ago.
+
+        A running job that old is taken to belong to a process that died; jobs
+        other processes are still working on are left alone.
+        """
+        cutoff = (datetime.now() - timedelta(seconds=stale_after)).isoformat()
+        with self.conn:
+            self.cursor.execute(
+                "UPDATE scrape_jobs SET status = 'queued' WHERE status = 'running' AND started_at < ?",
+                (cutoff,)
+            )
+        self.cursor.execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM scrape_jobs WHERE status = 'queued' ORDER BY id"
+        )
+        return [dict(zip(JOB_COLUMNS, row)) for row in self.cursor.fetchall()]
+
+    def track_url(self, url, scrape_type, interval, min_interval, max_interval, next_due):
+        """Add a URL to the re-scrape schedule, or reset its interval if already tracked."""
+        with self.conn:
+            self.cursor.execute('''
+                INSERT INTO tracked_urls
+                    (url, scrape_type, interval_seconds, min_interval, max_interval, next_due)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    scrape_type = excluded.scrape_type,
+                    interval_seconds = excluded.interval_seconds,
+                    min_interval = excluded.min_interval,
+                    max_interval = excluded.max_interval,
+                    next_due = excluded.next_due
+            ''', (url, scrape_type, interval, min_interval, max_interval, next_due))
+
+    def untrack_url(self, url):
+        """Remove a URL from the schedule."""
+        with self.conn:
+            self.cursor.execute('DELETE FROM tracked_urls WHERE url = ?', (url,))
+
+    def fetch_tracked_urls(self):
+        """Every tracked URL as a dict, soonest due first."""
+        self.cursor.execute(f'SELECT {", ".join(TRACKED_COLUMNS)} FROM tracked_urls ORDER BY next_due')
+        return [dict(zip(TRACKED_COLUMNS, row)) for row in self.cursor.fetchall()]
+
+    def fetch_tracked_url(self, url):
+        """One tracked URL as a dict, or None."""
+        self.cursor.execute(f'SELECT {", ".join(TRACKED_COLUMNS)} FROM tracked_urls WHERE url = ?', (url,))
+        row = self.cursor.fetchone()
+        return dict(zip(TRACKED_COLUMNS, row)) if row else None
+
+    def claim_tracked_url(self, url, now, lease_until):
+        """Claim a due URL's check by moving next_due to lease_until; False if it is not due here.
+
+        Schedulers in several processes share tracked_urls; only one of them
+        sees the row as due and wins the claim.
+        """
+        with self.conn:
+            self.cursor.execute(
+                'UPDATE tracked_urls SET next_due = ? WHERE url = ? AND next_due <= ?',
+                (lease_until, url, now)
+            )
+            return self.cursor.rowcount == 1
+
+    def record_tracked_check(self, url, checked_at, next_due, interval, changed):
+        """Store the outcome of one scheduled check."""
+        with self.conn:
+            self.cursor.execute('''
+                UPDATE tracked_urls
+                SET last_checked = ?, next_due = ?, interval_seconds = ?,
+                    checks = checks + 1, changes = changes + ?
+                WHERE url = ?
+            ''', (checked_at, next_due, interval, int(changed), url))
+
+    def fetch_fingerprint(self, url, scrape_type):
+        """The stored body/content hashes for a URL, or None if it was never scraped."""
+        self.cursor.execute('''
+            SELECT body_hash, content_hash, checked_at, changed_at
+            FROM page_fingerprints WHERE url = ? AND scrape_type = ?
+        ''', (url, scrape_type))
+        row = self.cursor.fetchone()
+        return dict(zip(('body_hash', 'content_hash', 'checked_at', 'changed_at'), row)) if row else None
+
+    def record_fingerprint(self, url, scrape_type, body_hash, content_hash, changed):
+        """Store a URL's latest hashes; changed_at only moves when the content changed."""
+        current_time = datetime.now().isoformat()
+        with self.conn:
+            self.cursor.execute('''
+                INSERT INTO page_fingerprints (url, scrape_type, body_hash, content_hash, checked_at, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url, scrape_type) DO UPDATE SET
+                    body_hash = excluded.body_hash,
+                    content_hash = excluded.content_hash,
+                    checked_at = excluded.checked_at,
+                    changed_at = CASE WHEN ? THEN excluded.changed_at ELSE changed_at END
+            ''', (url, scrape_type, body_hash, content_hash, current_time, current_time, int(changed)))
+
     def fetch_data(self, url):
         """Fetch general scraped data for a specific URL with JSON deserialization"""
         self.cursor.execute('SELECT * FROM scraped_data WHERE url = ?', (url,))
@@ -244,10 +1405,10 @@ class Database:
             'social_links': json.loads(row[4]) if row[4] else [],
             'meta_info': json.loads(row[5]) if row[5] else {},
             'headers': json.loads(row[6]) if row[6] else {},
-            'main_content': json.loads(row[7]) if row[7] else [],
+            'main_content': self._load_content(row[7]),
             'contact_info': json.loads(row[8]) if row[8] else {},
-            'images': json.loads(row[9]) if row[9] else [],
-            'links': json.loads(row[10]) if row[10] else [],
+            'images': self._load_content(row[9]),
+            'links': self._load_content(row[10]),
             'scrape_date': row[11],
             'last_updated': row[12]
         }
@@ -0,0 +1,226 @@
+# export.py
+"""Stream product_data and scraped_data out as NDJSON, CSV, Parquet or Arrow.
+
+Rows come from Database.iter_products/iter_pages, which read the table in
+keyset-paginated chunks, and each format is produced as a generator of byte
+chunks. Nothing holds more than one chunk of rows, so memory stays flat for
+any table size, and the same generators back the CLI and the chunked HTTP
+downloads in app.py. Nested values (specifications, meta_info, links, ...)
+are JSON-encoded in CSV cells and Parquet/Arrow string columns. Parquet and
+Arrow need the optional ``pyarrow`` package.
+
+Usage:
+    python export.py products --format csv -o products.csv
+    python export.py pages --format ndjson --site daraz --since 2024-01-01 > pages.ndjson
+    python export.py products --format parquet --updated-since 2024-06-01T00:00:00 -o delta.parquet
+
+The last last_updated exported is printed to stderr; pass it as
+--updated-since next time for an incremental export.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import datetime
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # optional: only the Parquet and Arrow formats need it
+    pyarrow = None
+
+from database import EXPORT_BATCH, Database
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+# Column order and Arrow type per table; "json" columns are JSON-encoded strings
+COLUMNS = {
+    "products": [
+        ("id", "int64"), ("url", "string"), ("title", "string"), ("price", "float64"),
+        ("currency", "string"), ("rating", "float64"), ("reviews_count", "int64"),
+        ("availability", "string"), ("image_url", "string"), ("seller", "string"),
+        ("specifications", "json"), ("scrape_date", "string"), ("last_updated", "string"),
+    ],
+    "pages": [
+        ("id", "int64"), ("url", "string"), ("emails", "json"), ("phone_numbers", "json"),
+        ("social_links", "json"), ("meta_info", "json"), ("headers", "json"), ("main_content", "string"),
+        ("contact_info", "json"), ("images", "json"), ("links", "json"), ("scrape_date", "string"),
+        ("last_updated", "string"),
+    ],
+}
+# Rows per chunk handed to the HTTP response or written to the file
+CHUNK_ROWS = 500
+
+
+def iter_rows(db, table, site=None, since=None, until=None, updated_since=None, batch_size=EXPORT_BATCH):
+    """Deserialized rows of "products" or "pages" with the export filters applied."""
+    if table not in COLUMNS:
+        raise ValueError(f"Unknown table: {table}")
+    fetch = db.iter_products if table == "products" else db.iter_pages
+    return fetch(site=site, since=since, until=until, updated_since=updated_since, batch_size=batch_size)
+
+
+def _chunks(rows, size=CHUNK_ROWS):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _cell(value, kind):
+    if kind == "json":
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def ndjson_chunks(rows, table):
+    for chunk in _chunks(rows):
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in chunk).encode("utf-8")
+
+
+def csv_chunks(rows, table):
+    columns = COLUMNS[table]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for chunk in _chunks(rows):
+        writer.writerows([_cell(row[name], kind) for name, kind in columns] for row in chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink handing everything pyarrow writes back to the generator."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def _arrow_schema(table):
+    types = {"int64": pyarrow.int64(), "float64": pyarrow.float64(), "string": pyarrow.string(),
+             "json": pyarrow.string()}
+    return pyarrow.schema([(name, types[kind]) for name, kind in COLUMNS[table]])
+
+
+def _arrow_chunks(rows, table, open_writer):
+    schema = _arrow_schema(table)
+    columns = COLUMNS[table]
+    sink = _Drain()
+    writer = open_writer(sink, schema)
+    for chunk in _chunks(rows):
+        arrays = [[_cell(row[name], kind) for row in chunk] for name, kind in columns]
+        writer.write_table(pyarrow.table(arrays, schema=schema))
+        data = sink.take()
+        if data:
+            yield data
+    writer.close()
+    yield sink.take()
+
+
+def parquet_chunks(rows, table):
+    # One row group per chunk keeps the writer's buffer at a chunk of rows
+    return _arrow_chunks(rows, table, lambda sink, schema: pyarrow.parquet.ParquetWriter(sink, schema))
+
+
+def arrow_chunks(rows, table):
+    return _arrow_chunks(rows, table, lambda sink, schema: pyarrow.ipc.new_stream(sink, schema))
+
+
+WRITERS = {"ndjson": ndjson_chunks, "csv": csv_chunks, "parquet": parquet_chunks, "arrow": arrow_chunks}
+
+
+def iso_datetime(value):
+    """Validate an ISO date/time filter value; the string itself is what gets compared."""
+    datetime.fromisoformat(value)
+    return value
+
+
+def export_chunks(db, table, fmt, **filters):
+    """Byte chunks of the filtered table in the given format.
+
+    Raises ValueError/ImportError up front, before any chunk is produced.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown format: {fmt}")
+    if fmt in ("parquet", "arrow") and pyarrow is None:
+        raise ImportError("Parquet and Arrow export need the 'pyarrow' package")
+    return WRITERS[fmt](iter_rows(db, table, **filters), table)
+
+
+class _Tracker:
+    """Counts rows and remembers the newest last_updated on their way to a writer."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.count = 0
+        self.last_updated = None
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            if row["last_updated"] and (self.last_updated is None or row["last_updated"] > self.last_updated):
+                self.last_updated = row["last_updated"]
+            yield row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("table", choices=sorted(COLUMNS))
+    parser.add_argument("--format", choices=sorted(WRITERS), default="ndjson")
+    parser.add_argument("--site", help='only URLs on this host, e.g. "daraz" or "www.amazon.com"')
+    parser.add_argument("--since", type=iso_datetime, help="scrape_date on or after this ISO date/time")
+    parser.add_argument("--until", type=iso_datetime, help="scrape_date before this ISO date/time")
+    parser.add_argument("--updated-since", type=iso_datetime,
+                        help="last_updated after this ISO date/time (incremental export)")
+    parser.add_argument("--db", default="web_scraper.db")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+    if args.format in ("parquet", "arrow") and pyarrow is None:
+        parser.error("Parquet and Arrow export need the 'pyarrow' package")
+
+    db = Database(args.db)
+    rows = _Tracker(iter_rows(db, args.table, site=args.site, since=args.since, until=args.until,
+                              updated_since=args.updated_since))
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for data in WRITERS[args.format](rows, args.table):
+            out.write(data)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        db.close()
+    print(f"{rows.count} rows exported; last_updated {rows.last_updated}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# fingerprint.py
+"""Page fingerprints used to skip re-extraction and writes for unchanged pages.
+
+Two hashes are kept per URL: one over the raw response body, which lets a
+byte-identical page skip parsing entirely, and one over the normalized
+extracted fields, which catches pages whose markup changed (ads, cache
+busters, CSRF tokens) while the data we store did not.
+"""
+import hashlib
+import json
+
+# Extracted fields that differ on every run without the page changing
+VOLATILE_FIELDS = {"timestamp"}
+
+
+def body_hash(content):
+    """Hash of the raw response body (bytes or str)."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def normalize(value):
+    """Drop volatile fields, collapse whitespace and order lists of plain strings.
+
+    Link, image and email lists are compared as sets so that rotating ad
+    slots and shuffled recommendation blocks do not count as changes.
+    """
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items() if key not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        items = [normalize(item) for item in value]
+        if all(isinstance(item, str) for item in items):
+            return sorted(set(items))
+        return items
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def content_hash(scraped_data):
+    """Hash of the normalized extracted data."""
+    normalized = json.dumps(normalize(scraped_data), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
@@ -0,0 +1,176 @@
+# http_cache.py
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class HttpCache:
+    """On-disk store of response bodies and their validators for conditional GETs.
+
+    Bodies live in one file per URL under ``cache_dir``; an SQLite index keeps the
+    ETag/Last-Modified validators, sizes and last-access times used for LRU eviction
+    once the total body size goes over ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir=".http_cache", max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                encoding TEXT,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)')
+        self.conn.commit()
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_saved": 0}
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".body")
+
+    def lookup(self, url):
+        """Return the cached entry for a URL as a dict, or None."""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT key, etag, last_modified, content_type, encoding, size FROM entries WHERE key = ?',
+                (self._key(url),)
+            ).fetchone()
+        if not row or not os.path.exists(self._path(row[0])):
+            return None
+        return {
+            "key": row[0],
+            "etag": row[1],
+            "last_modified": row[2],
+            "content_type": row[3],
+            "encoding": row[4],
+            "size": row[5],
+        }
+
+    def conditional_headers(self, entry):
+        """Validator headers to send when revalidating an entry."""
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, response):
+        """Save a 200 response that carries validators; others are not cacheable."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            self._count("misses")
+            return
+        key = self._key(url)
+        body = response.content
+        # Write beside the final path and rename it into place, so a reader never
+        # sees a partly written body and the body and its index row change together
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+        except OSError:
+            os.remove(tmp_path)
+            raise
+        with self._lock:
+            os.replace(tmp_path, self._path(key))
+            self.conn.execute('''
+                INSERT OR REPLACE INTO entries
+                    (key, url, etag, last_modified, content_type, encoding, size, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (key, url, etag, last_modified, response.headers.get("Content-Type"),
+                  response.encoding, len(body), time.time()))
+            self.conn.commit()
+            self.counters["misses"] += 1
+            self.counters["stores"] += 1
+        self._evict()
+
+    def not_modified(self, url, entry, response):
+        """Build a 200 response from the cached body after the server answered 304.
+
+        Returns None when the body file has gone (evicted), cannot be read or is
+        not the size recorded for it; the entry is dropped and the caller
+        refetches in full.
+        """
+        try:
+            with open(self._path(entry["key"]), "rb") as f:
+                body = f.read()
+        except OSError:
+            body = None
+        if body is None or len(body) != entry["size"]:
+            self._discard(entry["key"])
+            return None
+        with self._lock:
+            self.conn.execute('UPDATE entries SET last_access = ? WHERE key = ?', (time.time(), entry["key"]))
+            self.conn.commit()
+            self.counters["hits"] += 1
+            self.counters["bytes_saved"] += len(body)
+
+        cached = requests.Response()
+        cached.status_code = 200
+        cached._content = body
+        cached.headers = CaseInsensitiveDict(response.headers)
+        if entry["content_type"]:
+            cached.headers["Content-Type"] = entry["content_type"]
+        cached.encoding = entry["encoding"]
+        cached.url = response.url
+        cached.request = response.request
+        cached.from_cache = True
+        cached.cache_validator = entry["etag"] or entry["last_modified"]
+        return cached
+
+    def _discard(self, key):
+        with self._lock:
+            self.conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop least recently used bodies until the store fits in max_bytes."""
+        with self._lock:
+            total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for key, size in self.conn.execute('SELECT key, size FROM entries ORDER BY last_access').fetchall():
+                if total <= self.max_bytes:
+                    break
+                self.conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+                total -= size
+                self.counters["evictions"] += 1
+            self.conn.commit()
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            row = self.conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        stats.update({"entries": row[0], "bytes_stored": row[1]})
+        return stats
+
+    def close(self):
+        self.conn.close()
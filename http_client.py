@@ -0,0 +1,262 @@
+# http_client.py
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import metrics
+from http_cache import HttpCache
+from politeness import Politeness
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
+}
+
+
+class _TimedConnection:
+    """Records DNS resolution + TCP connect as "connect" and the TLS handshake as "tls"."""
+
+    _connected_at = None
+
+    def _new_conn(self):
+        with metrics.timed("connect", metrics.site_label(f"//{self.host}")):
+            sock = super()._new_conn()
+        self._connected_at = time.perf_counter()
+        return sock
+
+    def connect(self):
+        super().connect()
+        if isinstance(self, HTTPSConnection) and self._connected_at is not None:
+            metrics.observe("tls", time.perf_counter() - self._connected_at, metrics.site_label(f"//{self.host}"))
+
+
+class _TimedHTTPConnection(_TimedConnection, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnection, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose new connections report connect and TLS handshake times to metrics."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class HttpClient:
+    """Shared keep-alive HTTP transport with per-host connection pools and retry/backoff.
+
+    One client is meant to live for the whole process so that repeated scrapes
+    of the same host reuse open TCP/TLS connections instead of handshaking again.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, pool_connections=32, pool_maxsize=16, max_retries=3,
+                 backoff_factor=0.5, max_backoff=30.0, timeout=10, cache=None, politeness=None):
+        self.cache = cache
+        self.politeness = politeness
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        # Retries are handled here rather than by urllib3 so Retry-After and jitter apply
+        self.adapter = TimedHTTPAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "failures": 0}
+        if politeness is not None and politeness.fetch is None:
+            # robots.txt goes through the pooled session but not through the limiter itself
+            politeness.fetch = lambda url: self.session.get(url, timeout=self.timeout)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _backoff(self, attempt):
+        """Exponential backoff with equal jitter."""
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _retry_after(self, response):
+        """Seconds requested by a Retry-After header, or None."""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    def get(self, url, timeout=None, **kwargs):
+        """GET a URL, revalidating against the response cache when one is configured.
+
+        A 304 answer is turned into a normal 200 response carrying the cached body,
+        with ``from_cache`` set so callers can skip work on unchanged pages.
+        """
+        if self.cache is None or kwargs.get('stream'):
+            return self._send(url, timeout, **kwargs)
+
+        entry = self.cache.lookup(url)
+        if entry:
+            headers = dict(kwargs.get('headers') or {})
+            headers.update(self.cache.conditional_headers(entry))
+            response = self._send(url, timeout, **dict(kwargs, headers=headers))
+            if response.status_code == 304:
+                cached = self.cache.not_modified(url, entry, response)
+                if cached is not None:
+                    return cached
+                # The cached body vanished after lookup; fall back to an unconditional GET
+                response = self._send(url, timeout, **kwargs)
+        else:
+            response = self._send(url, timeout, **kwargs)
+        self.cache.store(url, response)
+        return response
+
+    def _send(self, url, timeout=None, **kwargs):
+        """GET a URL, retrying connection errors, 429 and 5xx responses.
+
+        With a politeness layer every attempt, retries included, waits for the
+        host's rate limit and reports its outcome back to it.
+        """
+        timeout = timeout or self.timeout
+        site = metrics.site_label(url)
+        attempt = 0
+        while True:
+            if self.politeness is not None:
+                self.politeness.acquire(url)
+            self._count("requests")
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, timeout=timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                metrics.inc("scraper_http_errors_total", site=site, status=type(e).__name__)
+                if self.politeness is not None:
+                    self.politeness.record(url, None)
+                if attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+                delay = self._backoff(attempt)
+                logger.debug(f"Retrying {url} in {delay:.2f}s after error: {e}")
+            else:
+                self._observe(response, site, time.perf_counter() - start, kwargs.get('stream'))
+                retry_after = self._retry_after(response) if response.status_code in self.RETRY_STATUSES else None
+                if self.politeness is not None:
+                    self.politeness.record(url, response.status_code, retry_after)
+                if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = min(self.max_backoff, retry_after) if retry_after is not None else self._backoff(attempt)
+                logger.debug(f"Retrying {url} in {delay:.2f}s after HTTP {response.status_code}")
+                response.close()
+            self._count("retries")
+            attempt += 1
+            time.sleep(delay)
+
+    def _observe(self, response, site, total, streamed):
+        """Headers (time to first byte), body download and whole-fetch times, bytes fetched and error statuses."""
+        headers = min(response.elapsed.total_seconds(), total)
+        metrics.observe("http_headers", headers, site)
+        if streamed:
+            size = int(response.headers.get('Content-Length') or 0)
+        else:
+            metrics.observe("download", total - headers, site)
+            metrics.observe("fetch", total, site)
+            size = len(response.content)
+        metrics.inc("scraper_fetched_bytes_total", size, site=site)
+        if response.status_code >= 400:
+            metrics.inc("scraper_http_errors_total", site=site, status=response.status_code)
+
+    def stats(self):
+        """Request/retry counters plus connection reuse across all live host pools."""
+        connections = pool_requests = 0
+        pools = self.adapter.poolmanager.pools
+        with pools.lock:
+            live = list(pools._container.values())
+        for pool in live:
+            connections += pool.num_connections
+            pool_requests += pool.num_requests
+        with self._lock:
+            stats = dict(self.counters)
+        stats.update({
+            "hosts": len(live),
+            "new_connections": connections,
+            "pool_hits": max(0, pool_requests - connections),
+        })
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        if self.politeness is not None:
+            stats["politeness"] = self.politeness.stats()
+        return stats
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide shared HttpClient, creating it on first use.
+
+    It has no response cache and no politeness layer unless asked for:
+    SCRAPER_HTTP_CACHE names a cache directory, and SCRAPER_HOST_RATE sets a
+    per-host request rate (requests/second) with robots.txt checks. Callers that
+    need either regardless of the environment build their own client (see
+    polite_client) and pass it in.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            cache_dir = os.environ.get('SCRAPER_HTTP_CACHE')
+            host_rate = os.environ.get('SCRAPER_HOST_RATE')
+            _client = HttpClient(
+                cache=HttpCache(cache_dir) if cache_dir else None,
+                politeness=Politeness(float(host_rate), user_agent=DEFAULT_HEADERS['User-Agent']) if host_rate else None
+            )
+        return _client
+
+
+def polite_client(rate=1.0, cache_dir=None):
+    """A new HttpClient that obeys robots.txt and limits each host to ``rate`` requests/second."""
+    return HttpClient(
+        cache=HttpCache(cache_dir) if cache_dir else None,
+        politeness=Politeness(rate, user_agent=DEFAULT_HEADERS['User-Agent'])
+    )
@@ -0,0 +1,163 @@
+# jobs.py
+import logging
+import queue
+import threading
+import uuid
+
+import fingerprint
+import metrics
+from database import STORED_PAGE_FIELDS, STORED_PRODUCT_FIELDS, Database
+from http_client import get_client
+from scraper import WebScraper
+
+logger = logging.getLogger(__name__)
+
+
+def run_scrape(db, url, scrape_type):
+    """Scrape one URL and store the result, skipping work for unchanged pages.
+
+    A body identical to the last scrape's is not parsed at all; extracted data
+    whose normalized hash matches the last scrape's is not written again.
+
+    Returns (status, message, scraped_data, outcome). outcome is 'new',
+    'changed', 'same_body' or 'same_content' ('same_body' has no scraped_data),
+    and None on error, when scraped_data is None too.
+    """
+    try:
+        response = get_client().get(url)
+        response.raise_for_status()
+        raw_hash = fingerprint.body_hash(response.content)
+        previous = db.fetch_fingerprint(url, scrape_type)
+        if previous and previous['body_hash'] == raw_hash:
+            db.record_fingerprint(url, scrape_type, raw_hash, previous['content_hash'], changed=False)
+            db.log_scrape_attempt(url, 'success')
+            return 'done', f'Unchanged since last scrape: {url}', None, 'same_body'
+
+        scraper = WebScraper(url, scrape_type, html=response.content)
+        if scrape_type == "products":
+            logger.debug("Extracting product data...")
+            scraped_data = scraper.extract_product_data(STORED_PRODUCT_FIELDS)
+        else:
+            logger.debug("Extracting general data...")
+            scraped_data = scraper.extract_all_data(STORED_PAGE_FIELDS)
+
+        data_hash = fingerprint.content_hash(scraped_data)
+        if previous is None:
+            outcome = 'new'
+        elif previous['content_hash'] == data_hash:
+            outcome = 'same_content'
+        else:
+            outcome = 'changed'
+
+        if outcome == 'same_content':
+            message = f'Content unchanged since last scrape: {url}'
+        elif scrape_type == "products":
+            if scraped_data and scraped_data.get("products"):
+                db.upsert_products([scraped_data])
+                message = f'Product data saved for {url}'
+            else:
+                message = 'No product data found on the page'
+        else:
+            if scraped_data:
+                db.upsert_pages([scraped_data])
+                message = f'Data saved for {url}'
+            else:
+                message = 'No data found on the page'
+
+        db.record_fingerprint(url, scrape_type, raw_hash, data_hash, changed=outcome != 'same_content')
+        db.log_scrape_attempt(url, 'success')
+        return 'done', message, scraped_data, outcome
+
+    except Exception as e:
+        logger.error(f"Scraping error: {str(e)}", exc_info=True)
+        metrics.inc("scraper_errors_total", site=metrics.site_label(url), error=type(e).__name__)
+        db.log_scrape_attempt(url, 'error', str(e))
+        return 'error', f'Error scraping {url}: {str(e)}', None, None
+
+
+class JobQueue:
+    """In-process scrape job queue backed by the scrape_jobs table.
+
+    Submissions are recorded in SQLite and handed to a pool of worker threads,
+    so callers get job ids back immediately. On start the queue also picks up
+    queued jobs and jobs left running past STALE_JOB_SECONDS by a dead process.
+    Workers claim a job with a conditional UPDATE before scraping it, so when
+    several processes share the database each job still runs once.
+    """
+
+    def __init__(self, workers=4, db_name="web_scraper.db"):
+        self.db_name = db_name
+        self.pending = queue.Queue()
+        self.workers = [
+            threading.Thread(target=self._work, name=f"scrape-worker-{n}", daemon=True)
+            for n in range(workers)
+        ]
+        self._recover()
+        for worker in self.workers:
+            worker.start()
+
+    def _recover(self):
+        db = Database(self.db_name)
+        try:
+            for job in db.fetch_unfinished_jobs():
+                self.pending.put((job['id'], job['url'], job['scrape_type']))
+        finally:
+            db.close()
+
+    def submit(self, urls, scrape_type="general"):
+        """Queue a list of URLs; returns (batch_id, job_ids) without waiting."""
+        batch_id = uuid.uuid4().hex
+        db = Database(self.db_name)
+        try:
+            job_ids = db.create_jobs(batch_id, urls, scrape_type)
+        finally:
+            db.close()
+        for job_id, url in zip(job_ids, urls):
+            self.pending.put((job_id, url, scrape_type))
+        return batch_id, job_ids
+
+    def _work(self):
+        db = Database(self.db_name)
+        while True:
+            job_id, url, scrape_type = self.pending.get()
+            try:
+                if not db.start_job(job_id):
+                    logger.debug(f"Job {job_id} was claimed by another worker")
+                    continue
+                status, message, _, outcome = run_scrape(db, url, scrape_type)
+                db.finish_job(job_id, status, message, outcome)
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {str(e)}", exc_info=True)
+            finally:
+                self.pending.task_done()
+
+
+def batch_progress(jobs):
+    """Summarize a batch's jobs as counts per status and change outcome plus percent finished."""
+    counts = {'queued': 0, 'running': 0, 'done': 0, 'error': 0}
+    outcomes = {'new': 0, 'changed': 0, 'same_body': 0, 'same_content': 0}
+    for job in jobs:
+        counts[job['status']] = counts.get(job['status'], 0) + 1
+        if job.get('outcome'):
+            outcomes[job['outcome']] = outcomes.get(job['outcome'], 0) + 1
+    finished = counts['done'] + counts['error']
+    return {
+        'total': len(jobs),
+        'counts': counts,
+        'outcomes': outcomes,
+        'unchanged': outcomes['same_body'] + outcomes['same_content'],
+        'percent_complete': round(100 * finished / len(jobs), 1) if jobs else 100.0
+    }
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide JobQueue, starting its workers on first use."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
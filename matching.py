@@ -0,0 +1,302 @@
+# matching.py
+"""Group product_data rows that are the same product, within and across sites.
+
+Titles are normalized into tokens (case, accents, punctuation, marketing
+words, "128 GB" vs "128GB", "SM-A546E" vs "SMA546E"). Brand/model
+specifications and image file names are normalized too. Candidate pairs come
+from blocking rather than comparing every pair:
+  * MinHash signatures of the title tokens, bucketed with LSH bands
+  * exact model numbers and image keys
+Each candidate pair is then verified: token containment must pass a threshold,
+and brands, model-like tokens and capacities/sizes must not conflict. Matched
+pairs are merged with union-find, refusing merges that would put two brands
+or model numbers in one group (A~B and B~C must not join a conflicting A and
+C), and the groups are written to the product_matches table, which
+Database.fetch_matched_products queries.
+
+Usage:
+    python matching.py               # rebuild product_matches in web_scraper.db
+    python matching.py --threshold 0.8
+"""
+import argparse
+import json
+import re
+import time
+import unicodedata
+import zlib
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import numpy as np
+
+from database import Database
+
+KNOWN_SITES = ("amazon", "ebay", "daraz")
+STOPWORDS = {
+    "a", "an", "and", "the", "with", "for", "by", "of", "in", "on", "to", "new", "original", "genuine",
+    "official", "brand", "free", "shipping", "delivery", "sale", "hot", "best", "latest", "edition",
+    "version", "pta", "approved", "warranty", "year", "years", "fast", "pcs", "pack",
+}
+UNITS = {"gb", "tb", "mb", "mah", "w", "kw", "v", "inch", "mm", "cm", "kg", "g", "ml", "l", "hz", "ton", "mp"}
+SPEC_KEYS = {
+    "brand": "brand", "manufacturer": "brand", "brandname": "brand",
+    "model": "model", "modelnumber": "model", "modelname": "model", "itemmodelnumber": "model",
+    "mpn": "model", "partnumber": "model", "sku": "model",
+}
+# Image file names that say nothing about the product (e.g. eBay's s-l1600.jpg)
+GENERIC_IMAGE_NAME = re.compile(r"^(s-l\d+|image|img|main|default|large|\d{1,4})$")
+IMAGE_SIZE_SUFFIX = re.compile(r"[-_]\d+x\d+[a-z0-9]*$")
+
+NUM_PERM = 63
+BANDS = 21
+ROWS = NUM_PERM // BANDS
+# LSH buckets larger than this are titles too generic to compare pairwise
+MAX_BUCKET = 100
+# Tokens in more than this share of titles are left out of MinHash (corpora of MIN_DF_CORPUS+)
+MAX_DF = 0.02
+MIN_DF_CORPUS = 1000
+DEFAULT_THRESHOLD = 0.75
+_PRIME = 4294967311
+_rng = np.random.default_rng(20240101)
+_PERM_A = _rng.integers(1, 2 ** 31, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 2 ** 31, NUM_PERM, dtype=np.uint64)
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+# Listing boilerplate that carries numbers but says nothing about the product
+_NOISE = re.compile(r"\b\d+\s*(?:years?|months?|days?)\s*(?:official\s*)?warranty\b|\bpack of \d+\b")
+_JOINED_HYPHEN = re.compile(r"(?<=[a-z0-9])[-/](?=[a-z0-9])")
+_NUMBER_UNIT = re.compile(r"(\d+(?:\.\d+)?)\s+(" + "|".join(sorted(UNITS, key=len, reverse=True)) + r")\b")
+_UNIT_TOKEN = re.compile(r"^(\d+(?:\.\d+)?)(" + "|".join(UNITS) + r")$")
+
+
+def _fold(text):
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+
+
+def normalize_title(title):
+    """Title as a list of comparable tokens."""
+    text = _fold(title or "").replace('"', " inch ").replace("''", " inch ")
+    text = _NOISE.sub(" ", text)
+    text = _JOINED_HYPHEN.sub("", text)
+    text = _NUMBER_UNIT.sub(r"\1\2", text)
+    return [token for token in _TOKEN.findall(text) if token not in STOPWORDS]
+
+
+def normalize_specs(specifications):
+    """{"brand": ..., "model": ...} from a specifications dict with site-specific keys."""
+    normalized = {}
+    for key, value in (specifications or {}).items():
+        canonical = SPEC_KEYS.get(re.sub(r"[^a-z]", "", _fold(str(key))))
+        if canonical and value:
+            normalized.setdefault(canonical, "".join(normalize_title(str(value))))
+    return normalized
+
+
+def image_key(image_url):
+    """The image's file name without CDN size/format variants, or None."""
+    if not image_url:
+        return None
+    segments = [s for s in urlparse(image_url).path.lower().split("/") if s]
+    for segment in reversed(segments):
+        # Amazon's 71abc._AC_SX679_.jpg and Daraz's abc.jpg_720x720q80.jpg_.webp keep
+        # their variants after the first dot
+        name = IMAGE_SIZE_SUFFIX.sub("", segment.split(".")[0])
+        if len(name) >= 6 and not GENERIC_IMAGE_NAME.match(name):
+            return name
+    return None
+
+
+def site_of(url):
+    host = urlparse(url).netloc.lower()
+    for site in KNOWN_SITES:
+        if site in host:
+            return site
+    return host[4:] if host.startswith("www.") else host
+
+
+def _is_identifier(token):
+    """Model numbers and bare numbers ("a54", "15"), but not capacities ("128gb")."""
+    return any(c.isdigit() for c in token) and not _UNIT_TOKEN.match(token)
+
+
+class ProductRecord:
+    __slots__ = ("id", "site", "tokens", "identifiers", "units", "brand", "model", "image")
+
+    def __init__(self, product_id, url, title, specifications, image_url):
+        self.id = product_id
+        self.site = site_of(url)
+        specs = normalize_specs(specifications)
+        tokens = normalize_title(title)
+        if specs.get("brand") and specs["brand"] not in tokens:
+            tokens.append(specs["brand"])
+        self.tokens = frozenset(tokens)
+        self.brand = specs.get("brand") or None
+        self.model = specs.get("model") or None
+        self.identifiers = {t for t in self.tokens if _is_identifier(t)}
+        if self.model:
+            self.identifiers.add(self.model)
+        self.units = defaultdict(set)
+        for token in self.tokens:
+            match = _UNIT_TOKEN.match(token)
+            if match:
+                self.units[match.group(2)].add(match.group(1))
+        self.image = image_key(image_url)
+
+
+def similarity(a, b):
+    """Token containment of the shorter title in the longer one, 0 if they conflict.
+
+    Conflicts: different brands, model-like tokens with nothing in common, or
+    capacities/sizes where neither listing's values contain the other's
+    ("8GB 128GB" and "128GB" agree; "8GB 128GB" and "8GB 256GB" do not).
+    """
+    if not a.tokens or not b.tokens:
+        return 0.0
+    if a.brand and b.brand and a.brand != b.brand:
+        return 0.0
+    for unit in a.units.keys() & b.units.keys():
+        if not (a.units[unit] <= b.units[unit] or b.units[unit] <= a.units[unit]):
+            return 0.0
+    if a.identifiers and b.identifiers and not a.identifiers & b.identifiers:
+        return 0.0
+    return len(a.tokens & b.tokens) / min(len(a.tokens), len(b.tokens))
+
+
+def minhash_signatures(token_sets, chunk=5000):
+    """(n, NUM_PERM) uint64 MinHash signatures, computed chunk by chunk with numpy."""
+    signatures = np.full((len(token_sets), NUM_PERM), _PRIME, dtype=np.uint64)
+    for start in range(0, len(token_sets), chunk):
+        block = token_sets[start:start + chunk]
+        lengths = np.fromiter((len(tokens) for tokens in block), dtype=np.int64, count=len(block))
+        present = np.flatnonzero(lengths)
+        if not len(present):
+            continue
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode()) for tokens in block for token in tokens), dtype=np.uint64
+        )
+        permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _PRIME
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))[present]
+        signatures[start + present] = np.minimum.reduceat(permuted, offsets, axis=1).T
+    return signatures
+
+
+def _lsh_tokens(records):
+    """Token sets for MinHash without corpus-wide frequent tokens.
+
+    Words in a large share of titles (brands, "unlocked", a site's title
+    template) would otherwise put unrelated listings in the same LSH buckets.
+    """
+    if len(records) < MIN_DF_CORPUS:
+        return [record.tokens for record in records]
+    frequency = defaultdict(int)
+    for record in records:
+        for token in record.tokens:
+            frequency[token] += 1
+    limit = MAX_DF * len(records)
+    return [frozenset(t for t in record.tokens if frequency[t] <= limit) for record in records]
+
+
+def candidate_buckets(records, token_sets, signatures):
+    """Lists of record indexes sharing an LSH band, a model number or an image key."""
+    with_tokens = [index for index, tokens in enumerate(token_sets) if tokens]
+    for band in range(BANDS):
+        buckets = defaultdict(list)
+        rows = signatures[with_tokens, band * ROWS:(band + 1) * ROWS]
+        for index, key in zip(with_tokens, map(bytes, rows)):
+            buckets[key].append(index)
+        yield from buckets.values()
+
+    for attribute in ("model", "image"):
+        buckets = defaultdict(list)
+        for index, record in enumerate(records):
+            value = getattr(record, attribute)
+            if value:
+                buckets[value].append(index)
+        yield from buckets.values()
+
+
+def _groups_conflict(brand, model, root_i, root_j):
+    """Whether two groups name different brands or model numbers."""
+    return any(values[root_i] and values[root_j] and values[root_i] != values[root_j]
+               for values in (brand, model))
+
+
+def match_products(records, threshold=DEFAULT_THRESHOLD):
+    """[(product_id, group_id, site, score)] for every record; group_id is the group's lowest id."""
+    parent = list(range(len(records)))
+    score = [0.0] * len(records)
+    # The brand and model number of each group, kept at its root
+    brand = [record.brand for record in records]
+    model = [record.model for record in records]
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    token_sets = _lsh_tokens(records)
+    signatures = minhash_signatures(token_sets)
+    rejected = set()
+    for members in candidate_buckets(records, token_sets, signatures):
+        if not 1 < len(members) <= MAX_BUCKET:
+            continue
+        for position, i in enumerate(members):
+            for j in members[position + 1:]:
+                root_i, root_j = find(i), find(j)
+                # Pairs already in one group, or already checked, are not compared again
+                if root_i == root_j or (i, j) in rejected:
+                    continue
+                a, b = records[i], records[j]
+                value = similarity(a, b)
+                # A shared model number or image is strong evidence by itself, barring conflicts
+                if value and ((a.model and a.model == b.model) or (a.image and a.image == b.image)):
+                    value = max(value, threshold)
+                if value >= threshold and not _groups_conflict(brand, model, root_i, root_j):
+                    if records[root_i].id > records[root_j].id:
+                        root_i, root_j = root_j, root_i
+                    parent[root_j] = root_i
+                    brand[root_i] = brand[root_i] or brand[root_j]
+                    model[root_i] = model[root_i] or model[root_j]
+                    score[i] = max(score[i], value)
+                    score[j] = max(score[j], value)
+                else:
+                    rejected.add((i, j))
+
+    rows = []
+    for index, record in enumerate(records):
+        root = find(index)
+        rows.append((record.id, records[root].id, record.site, 1.0 if root == index else score[index]))
+    return rows
+
+
+def rebuild_matches(db, threshold=DEFAULT_THRESHOLD):
+    """Recompute product_matches from product_data; returns (products, groups with >1 member)."""
+    records = [
+        ProductRecord(product_id, url, title, json.loads(specifications) if specifications else {}, image_url)
+        for product_id, url, title, specifications, image_url in db.iter_products_for_matching()
+    ]
+    rows = match_products(records, threshold)
+    db.replace_product_matches(rows)
+    sizes = defaultdict(int)
+    for _, group_id, _, _ in rows:
+        sizes[group_id] += 1
+    return len(rows), sum(1 for size in sizes.values() if size > 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="web_scraper.db")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    start = time.perf_counter()
+    products, groups = rebuild_matches(db, args.threshold)
+    db.close()
+    print(f"matched {products} products into {groups} multi-listing groups "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# metrics.py
+"""Process-wide latency histograms and counters, rendered in Prometheus text format.
+
+Stages are timed with ``timed(stage, site)`` blocks or the ``traced(stage)``
+decorator and recorded in fixed-bucket histograms, so an observation is a
+bisect and two additions under a lock. Quantiles (p50/p95/p99) are estimated
+from the buckets the way Prometheus' histogram_quantile does. Set
+SCRAPER_METRICS=0 to turn every hook into a no-op.
+
+Hooks sit at stage level (fetch and its parts, parse, structured_data, the
+extract_* entry points, serialize, store, db_commit), not on per-field
+helpers, which run too often for their bookkeeping not to skew the numbers.
+"""
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+ENABLED = os.environ.get("SCRAPER_METRICS", "1") != "0"
+# Upper bounds in seconds; the last bucket is +Inf
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUANTILES = (0.5, 0.95, 0.99)
+KNOWN_SITES = ("amazon", "ebay", "daraz")
+
+STAGE_METRIC = "scraper_stage_seconds"
+HELP = {
+    STAGE_METRIC: ("histogram", "Time spent per scrape stage"),
+    "scraper_fetched_bytes_total": ("counter", "Response body bytes fetched"),
+    "scraper_http_errors_total": ("counter", "HTTP error statuses and connection failures"),
+    "scraper_errors_total": ("counter", "Failed scrapes by exception type"),
+}
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def quantile(self, q):
+        """Linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = BUCKETS[index - 1] if index else 0.0
+                if index == len(BUCKETS):
+                    return lower
+                return lower + (BUCKETS[index] - lower) * (rank - seen) / count
+            seen += count
+        return BUCKETS[-1]
+
+
+def site_label(url):
+    """"amazon"/"ebay"/"daraz" for the known sites, otherwise the host name."""
+    host = (urlsplit(url).hostname or "") if url else ""
+    for site in KNOWN_SITES:
+        if site in host:
+            return site
+    return host
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def observe(stage, seconds, site=None):
+    """Record one duration for a stage (and site, when known)."""
+    if not ENABLED:
+        return
+    _record(_key(STAGE_METRIC, {"stage": stage, "site": site}), seconds)
+
+
+def _record(key, seconds):
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.counts[bisect_left(BUCKETS, seconds)] += 1
+        histogram.sum += seconds
+        histogram.count += 1
+
+
+def inc(name, amount=1, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+@contextmanager
+def timed(stage, site=None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start, site)
+
+
+def traced(stage):
+    """Decorator recording each call's duration under ``stage`` (no-op when disabled)."""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        key = _key(STAGE_METRIC, {"stage": stage})
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(key, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    """{"stages": [{stage, site, count, sum, p50, p95, p99}], "counters": [{name, labels, value}]}."""
+    with _lock:
+        histograms = [(key, list(h.counts), h.sum, h.count) for key, h in _histograms.items()]
+        counters = list(_counters.items())
+    stages = []
+    for (_, labels), counts, total, count in histograms:
+        histogram = Histogram()
+        histogram.counts, histogram.sum, histogram.count = counts, total, count
+        entry = dict(labels, count=count, sum=round(total, 6))
+        for q in QUANTILES:
+            value = histogram.quantile(q)
+            entry[f"p{round(q * 100)}"] = round(value, 6) if value is not None else None
+        stages.append(entry)
+    return {
+        "stages": sorted(stages, key=lambda e: (e["stage"], e.get("site", ""))),
+        "counters": [{"name": name, "labels": dict(labels), "value": value}
+                     for (name, labels), value in sorted(counters)],
+    }
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def render():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    with _lock:
+        histograms = sorted((key, list(h.counts), h.sum, h.count) for key, h in _histograms.items())
+        counters = sorted(_counters.items())
+    lines = []
+    kind, text = HELP[STAGE_METRIC]
+    lines += [f"# HELP {STAGE_METRIC} {text}", f"# TYPE {STAGE_METRIC} {kind}"]
+    for (_, labels), counts, total, count in histograms:
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS + ("+Inf",), counts):
+            cumulative += bucket
+            lines.append(f"{STAGE_METRIC}_bucket{_labels(labels, le=bound)} {cumulative}")
+        lines.append(f"{STAGE_METRIC}_sum{_labels(labels)} {total:.6f}")
+        lines.append(f"{STAGE_METRIC}_count{_labels(labels)} {count}")
+
+    quantile_metric = f"{STAGE_METRIC}_quantile"
+    lines += [f"# HELP {quantile_metric} p50/p95/p99 estimated from {STAGE_METRIC}",
+              f"# TYPE {quantile_metric} gauge"]
+    for (_, labels), counts, total, count in histograms:
+        histogram = Histogram()
+        histogram.counts, histogram.count = counts, count
+        for q in QUANTILES:
+            lines.append(f"{quantile_metric}{_labels(labels, quantile=q)} {histogram.quantile(q):.6f}")
+
+    names = sorted({name for (name, _), _ in counters})
+    for name in names:
+        kind, text = HELP.get(name, ("counter", name))
+        lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+        for (counter, labels), value in counters:
+            if counter == name:
+                lines.append(f"{name}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
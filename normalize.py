@@ -0,0 +1,228 @@
+# normalize.py
+"""Locale-aware parsing of scraped price, rating and review-count strings.
+
+Prices come back as integer minor units plus an ISO 4217 code, so
+"Rs. 12,499" is (1249900, "PKR") and "1.299,00 €" is (129900, "EUR").
+Thousands separators and the decimal mark are resolved per locale: when a
+number has both "." and ",", the last one is the decimal mark; a lone
+separator followed by exactly three digits is a thousands separator if it is
+the locale's grouping character, and repeated separators ("1,00,000") always
+group. Ambiguous symbols ("$", "Rs") take the locale's currency when it uses
+that symbol.
+
+Every pattern is compiled once. The batch functions parse each distinct
+string once and return NumPy columns, which is what bulk imports and price
+history backfills want:
+
+    minor, currency, valid = parse_prices(texts, "en-PK")
+"""
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# ISO 4217 currencies whose minor unit is the whole unit. price_history stores
+# amounts in these units, so changing the set needs a database migration that
+# rescales the stored rows (as migration 12 in database.py does for this set).
+ZERO_DECIMAL_CURRENCIES = {
+    "BIF", "CLP", "DJF", "GNF", "ISK", "JPY", "KMF", "KRW", "PYG", "RWF", "UGX", "VND", "VUV",
+    "XAF", "XOF", "XPF",
+}
+
+# decimal: the decimal mark; currency: what "$"/"Rs"/no symbol means there
+LOCALES = {
+    "en": {"decimal": ".", "currency": None},
+    "en-US": {"decimal": ".", "currency": "USD"},
+    "en-GB": {"decimal": ".", "currency": "GBP"},
+    "en-CA": {"decimal": ".", "currency": "CAD"},
+    "en-AU": {"decimal": ".", "currency": "AUD"},
+    "en-PK": {"decimal": ".", "currency": "PKR"},
+    "en-IN": {"decimal": ".", "currency": "INR"},
+    "de-DE": {"decimal": ",", "currency": "EUR"},
+    "fr-FR": {"decimal": ",", "currency": "EUR"},
+    "es-ES": {"decimal": ",", "currency": "EUR"},
+    "it-IT": {"decimal": ",", "currency": "EUR"},
+    "nl-NL": {"decimal": ",", "currency": "EUR"},
+    "ja-JP": {"decimal": ".", "currency": "JPY"},
+}
+DEFAULT_LOCALE = "en"
+# Host suffixes checked in order; the first match decides the locale
+HOST_LOCALES = (
+    ("amazon.com", "en-US"), ("ebay.com", "en-US"),
+    (".pk", "en-PK"), (".in", "en-IN"), (".co.uk", "en-GB"), (".uk", "en-GB"), (".ca", "en-CA"),
+    (".com.au", "en-AU"), (".de", "de-DE"), (".fr", "fr-FR"), (".es", "es-ES"), (".it", "it-IT"),
+    (".nl", "nl-NL"), (".co.jp", "ja-JP"), (".jp", "ja-JP"),
+)
+
+DOLLAR_CURRENCIES = {"USD", "CAD", "AUD", "NZD", "SGD", "HKD"}
+RUPEE_CURRENCIES = {"PKR", "INR", "LKR", "NPR"}
+# Symbols and prefixes that name one currency; "$" and "Rs" are resolved per locale
+CURRENCY_SYMBOLS = {
+    "US$": "USD", "US $": "USD", "C$": "CAD", "CA$": "CAD", "AU$": "AUD", "A$": "AUD", "NZ$": "NZD",
+    "S$": "SGD", "HK$": "HKD", "R$": "BRL", "€": "EUR", "£": "GBP", "¥": "JPY", "￥": "JPY",
+    "₹": "INR", "₩": "KRW", "₺": "TRY", "₽": "RUB", "zł": "PLN",
+}
+ISO_CODES = {
+    "USD", "EUR", "GBP", "JPY", "PKR", "INR", "CAD", "AUD", "NZD", "SGD", "HKD", "BRL", "CNY",
+    "KRW", "TRY", "RUB", "PLN", "SEK", "NOK", "DKK", "CHF", "AED", "SAR", "LKR", "NPR", "BDT",
+}
+
+_CURRENCY = re.compile(
+    r"\b(" + "|".join(sorted(ISO_CODES)) + r")\b"
+    r"|(" + "|".join(re.escape(s) for s in sorted(CURRENCY_SYMBOLS, key=len, reverse=True)) + r")"
+    r"|(\$)"
+    r"|(₨|\bRs\b\.?|\bRe\b\.?)"
+)
+# Digits with ".", ",", apostrophes or (no-break) spaces between them: "1,299.00", "1 299,00", "1'299"
+_NUMBER = re.compile(r"\d+(?:[.,']\d+|[ \u00a0\u202f]\d{3}(?!\d))*")
+_GROUPING = re.compile(r"[' \u00a0\u202f]")
+_SUFFIX = re.compile(r"\s*([kKmM])\b")
+_MULTIPLIERS = {"k": 1000, "m": 1000000}
+
+
+def locale_for(url):
+    """Locale name for a page URL from its host, DEFAULT_LOCALE when nothing matches."""
+    host = (urlsplit(url).hostname or "") if url else ""
+    for suffix, locale in HOST_LOCALES:
+        if host.endswith(suffix):
+            return locale
+    return DEFAULT_LOCALE
+
+
+def minor_exponent(currency):
+    return 0 if currency in ZERO_DECIMAL_CURRENCIES else 2
+
+
+def iso_currency(currency):
+    """ISO code for a stored currency; rows scraped before normalization may hold "$" or "€"."""
+    if not currency or currency in ISO_CODES:
+        return currency or None
+    if currency == "$":
+        return "USD"
+    return CURRENCY_SYMBOLS.get(currency, currency)
+
+
+def to_minor(price, currency):
+    """A price in major units as integer minor units of an ISO currency."""
+    if price is None:
+        return None
+    return int(round(price * 10 ** minor_exponent(currency)))
+
+
+def to_major(minor, currency):
+    """Integer minor units back to a price in major units."""
+    if minor is None:
+        return None
+    return minor / 10 ** minor_exponent(currency)
+
+
+def _split_number(token, decimal):
+    """(integer digits, fraction digits) of a number token under a locale's decimal mark."""
+    token = _GROUPING.sub("", token)
+    last_dot, last_comma = token.rfind("."), token.rfind(",")
+    if last_dot < 0 and last_comma < 0:
+        return token, ""
+    if last_dot >= 0 and last_comma >= 0:
+        mark = "." if last_dot > last_comma else ","
+    else:
+        mark = "." if last_dot >= 0 else ","
+        after = len(token) - max(last_dot, last_comma) - 1
+        if token.count(mark) > 1 or (after == 3 and mark != decimal):
+            return token.replace(mark, ""), ""
+    whole, _, fraction = token.rpartition(mark)
+    return whole.replace(".", "").replace(",", ""), fraction
+
+
+def _currency(text, locale):
+    match = _CURRENCY.search(text)
+    default = LOCALES[locale]["currency"]
+    if match is None:
+        return default
+    code, symbol, dollar, rupee = match.groups()
+    if code or symbol:
+        return code or CURRENCY_SYMBOLS[symbol]
+    if dollar:
+        return default if default in DOLLAR_CURRENCIES else "USD"
+    return default if default in RUPEE_CURRENCIES else None
+
+
+@lru_cache(maxsize=65536)
+def parse_price(text, locale=DEFAULT_LOCALE):
+    """(minor units, ISO currency) from a price string; (None, currency) when there is no number."""
+    if not text:
+        return None, None
+    locale = locale if locale in LOCALES else DEFAULT_LOCALE
+    currency = _currency(text, locale)
+    match = _NUMBER.search(text)
+    if match is None:
+        return None, currency
+    whole, fraction = _split_number(match.group(), LOCALES[locale]["decimal"])
+    exponent = minor_exponent(currency)
+    # Integer arithmetic throughout; extra fraction digits round half up
+    fraction = fraction.ljust(exponent + 1, "0")
+    minor = int(whole or "0") * 10 ** exponent + int(fraction[:exponent] or "0")
+    if fraction[exponent] >= "5":
+        minor += 1
+    return minor, currency
+
+
+def _decimal(text, locale):
+    match = _NUMBER.search(text) if text else None
+    if match is None:
+        return None
+    decimal_mark = LOCALES.get(locale, LOCALES[DEFAULT_LOCALE])["decimal"]
+    whole, fraction = _split_number(match.group(), decimal_mark)
+    value = float(f"{whole or 0}.{fraction or 0}")
+    suffix = _SUFFIX.match(text, match.end())
+    if suffix:
+        value *= _MULTIPLIERS[suffix.group(1).lower()]
+    return value
+
+
+@lru_cache(maxsize=4096)
+def parse_rating(text, locale=DEFAULT_LOCALE):
+    """First number in a rating string ("4.3 out of 5 stars", "4,5 von 5"), or None."""
+    return _decimal(text, locale)
+
+
+@lru_cache(maxsize=65536)
+def parse_count(text, locale=DEFAULT_LOCALE):
+    """Review/rating count ("21,482 ratings", "1.2K reviews"), or None."""
+    value = _decimal(text, locale)
+    return int(round(value)) if value is not None else None
+
+
+def _batch(parse, texts, locale):
+    """Parse each distinct string once, then map the results back onto every position."""
+    seen = {}
+    results = []
+    for text in texts:
+        result = seen.get(text, seen)
+        if result is seen:
+            result = seen[text] = parse.__wrapped__(text, locale)
+        results.append(result)
+    return results
+
+
+def parse_prices(texts, locale=DEFAULT_LOCALE):
+    """Batch parse_price: (int64 minor units, object array of ISO codes, bool mask of parsed prices)."""
+    results = _batch(parse_price, texts, locale)
+    minor = np.fromiter((m if m is not None else 0 for m, _ in results), dtype=np.int64, count=len(results))
+    valid = np.fromiter((m is not None for m, _ in results), dtype=bool, count=len(results))
+    currency = np.array([c for _, c in results], dtype=object)
+    return minor, currency, valid
+
+
+def parse_ratings(texts, locale=DEFAULT_LOCALE):
+    """Batch parse_rating: float64 array, NaN where no rating was found."""
+    results = _batch(parse_rating, texts, locale)
+    return np.fromiter((np.nan if r is None else r for r in results), dtype=np.float64, count=len(results))
+
+
+def parse_counts(texts, locale=DEFAULT_LOCALE):
+    """Batch parse_count: (int64 counts, bool mask of parsed counts)."""
+    results = _batch(parse_count, texts, locale)
+    counts = np.fromiter((c if c is not None else 0 for c in results), dtype=np.int64, count=len(results))
+    valid = np.fromiter((c is not None for c in results), dtype=bool, count=len(results))
+    return counts, valid
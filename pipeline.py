@@ -0,0 +1,183 @@
+# pipeline.py
+"""Fetch/extract pipeline: network fetching on threads, parsing and extraction on processes.
+
+Usage:
+    python pipeline.py --urls urls.txt --scrape-type products > results.ndjson
+    python pipeline.py --html-dir saved_pages/ --workers 8 -o results.ndjson
+    python pipeline.py --urls urls.txt --fields meta_info,headers -o results.ndjson
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import requests
+
+from http_client import get_client
+
+_DONE = object()
+
+
+def extract_page(url, html, scrape_type="general", backend="soup", fields=None):
+    """Worker-process entry point: run WebScraper extraction on raw page bytes."""
+    from scraper import WebScraper
+
+    try:
+        scraper = WebScraper(url, scrape_type, html=html, backend=backend)
+        if scrape_type == "products":
+            data = scraper.extract_product_data(fields)
+        else:
+            data = scraper.extract_all_data(fields)
+        return {"url": url, "data": data, "error": None}
+    except Exception as e:
+        return {"url": url, "data": None, "error": str(e)}
+
+
+class ScrapePipeline:
+    """Two-stage pipeline with bounded queues between the stages.
+
+    Fetcher threads put raw bytes on a bounded queue; the extraction stage keeps
+    at most ``max_in_flight`` pages inside the process pool. When extraction falls
+    behind, the queue fills and fetchers block, so memory stays bounded.
+    """
+
+    def __init__(self, scrape_type="general", workers=None, fetchers=16, queue_size=64,
+                 max_in_flight=None, backend="soup", client=None, fields=None):
+        self.scrape_type = scrape_type
+        # Product fields or page sections to extract; None is all of them
+        self.fields = fields
+        self.workers = workers or os.cpu_count() or 1
+        self.fetchers = fetchers
+        self.queue_size = queue_size
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.backend = backend
+        self.client = client or get_client()
+
+    def _fetch_loop(self, urls, urls_lock, raw_pages):
+        while True:
+            with urls_lock:
+                url = next(urls, None)
+            if url is None:
+                break
+            try:
+                response = self.client.get(url)
+                response.raise_for_status()
+                raw_pages.put((url, response.content, None))
+            except requests.exceptions.RequestException as e:
+                raw_pages.put((url, None, str(e)))
+        raw_pages.put(_DONE)
+
+    def _start_fetchers(self, urls):
+        """Start fetcher threads over a URL iterable; return the queue they feed."""
+        raw_pages = queue.Queue(maxsize=self.queue_size)
+        urls_lock = threading.Lock()
+        url_iter = iter(urls)
+        for _ in range(self.fetchers):
+            threading.Thread(target=self._fetch_loop, args=(url_iter, urls_lock, raw_pages),
+                             daemon=True).start()
+        return raw_pages, self.fetchers
+
+    def _iter_raw(self, raw_pages, producers):
+        """Drain the raw-page queue until every producer has finished."""
+        remaining = producers
+        while remaining:
+            item = raw_pages.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield item
+
+    def _extract(self, raw_items):
+        """Feed (url, bytes, error) items through the process pool, yielding results."""
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            in_flight = set()
+            for url, html, error in raw_items:
+                if error is not None:
+                    yield {"url": url, "data": None, "error": error}
+                    continue
+                if len(in_flight) >= self.max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                in_flight.add(pool.submit(extract_page, url, html, self.scrape_type, self.backend, self.fields))
+            for future in wait(in_flight).done:
+                yield future.result()
+
+    def run_urls(self, urls):
+        """Fetch and extract every URL; results are yielded as they complete."""
+        raw_pages, producers = self._start_fetchers(urls)
+        yield from self._extract(self._iter_raw(raw_pages, producers))
+
+    def run_files(self, paths):
+        """Extract saved HTML files; each file's URL is its file:// URI."""
+        def read_files():
+            for path in paths:
+                path = Path(path)
+                try:
+                    yield path.resolve().as_uri(), path.read_bytes(), None
+                except OSError as e:
+                    yield path.resolve().as_uri(), None, str(e)
+        yield from self._extract(read_files())
+
+
+def iter_html_files(directory):
+    """Every .html/.htm file under a directory, in a stable order."""
+    for path in sorted(Path(directory).rglob("*")):
+        if path.suffix.lower() in (".html", ".htm") and path.is_file():
+            yield path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--urls", help="file with one URL per line ('-' for stdin)")
+    source.add_argument("--html-dir", help="directory of saved HTML files")
+    parser.add_argument("--scrape-type", choices=["general", "products"], default="general")
+    parser.add_argument("--backend", choices=["soup", "lxml"], default="soup")
+    parser.add_argument("--fields", help="comma-separated product fields or page sections to extract "
+                                         "(default: all), e.g. meta_info,headers")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: CPU count)")
+    parser.add_argument("--fetchers", type=int, default=16, help="fetcher threads")
+    parser.add_argument("--queue-size", type=int, default=64, help="raw pages buffered between stages")
+    parser.add_argument("-o", "--output", help="NDJSON output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    fields = [field.strip() for field in args.fields.split(",") if field.strip()] if args.fields else None
+    if fields:
+        from scraper import page_fields, product_fields
+        try:
+            (product_fields if args.scrape_type == "products" else page_fields)(fields)
+        except ValueError as e:
+            parser.error(str(e))
+    pipeline = ScrapePipeline(args.scrape_type, args.workers, args.fetchers, args.queue_size,
+                              backend=args.backend, fields=fields)
+    if args.urls:
+        handle = sys.stdin if args.urls == "-" else open(args.urls)
+        urls = (line.strip() for line in handle if line.strip())
+        results = pipeline.run_urls(urls)
+    else:
+        results = pipeline.run_files(iter_html_files(args.html_dir))
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    start = time.perf_counter()
+    pages = errors = 0
+    try:
+        for result in results:
+            pages += 1
+            errors += result["error"] is not None
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"{pages} pages ({errors} errors) in {elapsed:.2f}s, "
+          f"{pages / elapsed if elapsed else 0:.1f} pages/sec", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
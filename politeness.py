@@ -0,0 +1,202 @@
+# politeness.py
+import logging
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Statuses (besides connection errors) that count as a host pushing back
+ERROR_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+# Weight of the latest request in a host's moving error rate
+ERROR_ALPHA = 0.2
+MAX_SLOWDOWN = 64.0
+# Per-success decay of the slowdown a 429/503 caused
+SLOWDOWN_DECAY = 0.9
+# Upper bounds (seconds) of the wait-time histogram buckets
+WAIT_BUCKETS = (0.0, 0.1, 0.5, 1.0, 5.0, 30.0, float("inf"))
+
+
+class RobotsDisallowed(requests.exceptions.RequestException):
+    """robots.txt does not allow fetching this URL."""
+
+
+class HostState:
+    """Token bucket and error tracking for one host."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated", "blocked_until", "slowdown", "error_rate",
+                 "requests", "errors", "waits", "wait_seconds")
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+        self.blocked_until = 0.0
+        self.slowdown = 1.0
+        self.error_rate = 0.0
+        self.requests = self.errors = self.waits = 0
+        self.wait_seconds = 0.0
+
+    @property
+    def effective_rate(self):
+        """Configured rate slowed by recent 429/503s and by the moving error rate."""
+        return self.rate / max(self.slowdown, 1 / (1 - min(self.error_rate, 0.9)))
+
+    def reserve(self, now):
+        """Take one token and return how long to wait before using it.
+
+        Tokens may go negative: each caller reserves its own slot, so waiting
+        happens outside the lock and concurrent callers are spaced out in order.
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.effective_rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.effective_rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+
+class Politeness:
+    """robots.txt rules, Crawl-delay and per-host rate limits for every outgoing request.
+
+    robots.txt is fetched once per origin and cached for ``robots_ttl`` seconds
+    (per RFC 9309: a 4xx means no restrictions, a 5xx or network error means
+    nothing may be fetched until it is retried after ``robots_error_ttl``).
+    Each host gets a token bucket of ``rate`` requests/second (lowered to the
+    Crawl-delay when robots.txt sets one) with ``burst`` tokens. 429/503
+    answers double a host's slowdown and honor Retry-After; every success
+    shrinks it again, and a rising moving error rate slows the host further.
+    """
+
+    def __init__(self, rate=1.0, burst=2, user_agent="*", robots_ttl=86400, robots_error_ttl=600,
+                 fetch=None):
+        self.rate = rate
+        self.burst = burst
+        self.user_agent = user_agent
+        self.robots_ttl = robots_ttl
+        self.robots_error_ttl = robots_error_ttl
+        self.fetch = fetch
+        self._lock = threading.Lock()
+        self._robots = {}
+        self._robots_locks = defaultdict(threading.Lock)
+        self.hosts = {}
+        self.counters = {"requests": 0, "waited": 0, "wait_seconds": 0.0, "max_wait": 0.0,
+                         "disallowed": 0, "robots_fetches": 0, "robots_errors": 0}
+        self.wait_histogram = [0] * len(WAIT_BUCKETS)
+
+    def _host(self, host, now):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostState(self.rate, self.burst, now)
+        return state
+
+    def robots(self, url):
+        """The (cached) RobotFileParser for a URL's origin."""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        cached = self._robots.get(origin)
+        if cached and cached[1] > time.time():
+            return cached[0]
+        # One fetch per origin; other threads wait for it instead of fetching too
+        with self._robots_locks[origin]:
+            cached = self._robots.get(origin)
+            if cached and cached[1] > time.time():
+                return cached[0]
+            parser, ttl = self._fetch_robots(origin)
+            self._robots[origin] = (parser, time.time() + ttl)
+        delay = parser.crawl_delay(self.user_agent)
+        if delay:
+            with self._lock:
+                state = self._host(parts.netloc, time.monotonic())
+                state.rate = min(self.rate, 1 / float(delay))
+                state.burst = 1
+        return parser
+
+    def _fetch_robots(self, origin):
+        parser = RobotFileParser(origin + "/robots.txt")
+        with self._lock:
+            self.counters["robots_fetches"] += 1
+        try:
+            fetch = self.fetch or (lambda url: requests.get(url, timeout=10))
+            response = fetch(origin + "/robots.txt")
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"robots.txt for {origin} unreachable, not fetching from it: {e}")
+            response = None
+        if response is None or response.status_code >= 500:
+            with self._lock:
+                self.counters["robots_errors"] += 1
+            parser.disallow_all = True
+            return parser, self.robots_error_ttl
+        if response.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(response.text.splitlines())
+        return parser, self.robots_ttl
+
+    def acquire(self, url):
+        """Block until the URL's host may be hit; raises RobotsDisallowed. Returns the wait."""
+        if not self.robots(url).can_fetch(self.user_agent, url):
+            with self._lock:
+                self.counters["disallowed"] += 1
+            raise RobotsDisallowed(f"Disallowed by robots.txt: {url}")
+        host = urlsplit(url).netloc
+        with self._lock:
+            state = self._host(host, time.monotonic())
+            wait = state.reserve(time.monotonic())
+            state.requests += 1
+            self.counters["requests"] += 1
+            if wait > 0:
+                state.waits += 1
+                state.wait_seconds += wait
+                self.counters["waited"] += 1
+                self.counters["wait_seconds"] += wait
+                self.counters["max_wait"] = max(self.counters["max_wait"], wait)
+            self.wait_histogram[next(i for i, bound in enumerate(WAIT_BUCKETS) if wait <= bound)] += 1
+        metrics.observe("politeness_wait", wait, metrics.site_label(url))
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record(self, url, status=None, retry_after=None):
+        """Feed back a request's outcome: an HTTP status, or None for a connection error."""
+        host = urlsplit(url).netloc
+        error = status is None or status in ERROR_STATUSES
+        with self._lock:
+            state = self._host(host, time.monotonic())
+            state.error_rate += ERROR_ALPHA * (error - state.error_rate)
+            if status in THROTTLE_STATUSES:
+                state.slowdown = min(MAX_SLOWDOWN, state.slowdown * 2)
+            elif not error:
+                state.slowdown = max(1.0, state.slowdown * SLOWDOWN_DECAY)
+            if error:
+                state.errors += 1
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, time.monotonic() + retry_after)
+
+    def stats(self):
+        """Wait-time totals and histogram, robots.txt counters and per-host limiter state."""
+        with self._lock:
+            stats = dict(self.counters)
+            stats["wait_histogram"] = {
+                f"le_{bound:g}": count for bound, count in zip(WAIT_BUCKETS, self.wait_histogram)
+            }
+            stats["hosts"] = {
+                host: {
+                    "rate": round(state.effective_rate, 3),
+                    "slowdown": round(state.slowdown, 2),
+                    "error_rate": round(state.error_rate, 3),
+                    "requests": state.requests,
+                    "errors": state.errors,
+                    "waits": state.waits,
+                    "wait_seconds": round(state.wait_seconds, 3),
+                }
+                for host, state in self.hosts.items()
+            }
+        return stats
@@ -0,0 +1,88 @@
+# profiler.py
+"""Low-overhead sampling profiler for finding where scrape time goes in a live process.
+
+A background thread looks at every other thread's stack every ``interval``
+seconds (sys._current_frames) and counts each stack in collapsed form,
+"outer;inner;leaf", which flamegraph.pl and speedscope read directly. Nothing
+is hooked into the profiled code, so the cost is one stack walk per thread
+per sample. Used by app.py's /debug/profile and usable around any block:
+
+    with SamplingProfiler() as profiler:
+        crawler.run()
+    print(profiler.report())
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005, max_depth=64, include_caller=True):
+        self.interval = interval
+        self.max_depth = max_depth
+        # False leaves out the thread that called start(), e.g. when it only sleeps
+        self.include_caller = include_caller
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._caller = None
+
+    def _frame_name(self, frame):
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+    def _sample(self):
+        skip = (threading.get_ident(), self._caller)
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id in skip:
+                continue
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                names.append(self._frame_name(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._caller = None if self.include_caller else threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def report(self, limit=None):
+        """Collapsed stacks with their sample counts, most frequent first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common(limit))
+
+    def top_functions(self, limit=20):
+        """[(function, samples with it on top of the stack)], the self-time view."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+
+def profile_for(seconds, interval=0.005):
+    """Sample the whole process for ``seconds`` and return the profiler."""
+    with SamplingProfiler(interval, include_caller=False) as profiler:
+        time.sleep(seconds)
+    return profiler
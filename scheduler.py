@@ -0,0 +1,256 @@
+# scheduler.py
+"""Re-scrape tracked URLs on adaptive per-URL intervals.
+
+Every process that serves the Flask app runs a scheduler, started with the app
+by app.start_background_workers. Before a check runs it is claimed in
+tracked_urls with a conditional UPDATE that moves next_due a lease ahead, so
+when several processes share the database each due URL is checked by one of
+them; the others pick up the new next_due and wait for it.
+
+Usage:
+    python scheduler.py --track https://www.daraz.pk/products/... --interval 3600
+    python scheduler.py --workers 4 --host-delay 5
+"""
+import argparse
+import heapq
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from database import Database
+from jobs import run_scrape
+
+logger = logging.getLogger(__name__)
+
+# Interval multipliers applied after each check
+CHANGED_FACTOR = 0.5
+UNCHANGED_FACTOR = 1.5
+# How long a claimed check keeps other processes off a URL if its process dies mid-check
+CLAIM_LEASE = 600
+SCRAPE_TYPES = ("general", "products")
+
+
+def next_interval(interval, changed, min_interval, max_interval):
+    """Shrink the interval for pages that changed, grow it for pages that did not."""
+    interval *= CHANGED_FACTOR if changed else UNCHANGED_FACTOR
+    return max(min_interval, min(max_interval, interval))
+
+
+class RescrapeScheduler:
+    """Priority queue of tracked URLs by next-due time, dispatched to a worker pool.
+
+    Politeness: at most one request in flight per host, and successive requests
+    to the same host are at least ``host_delay`` seconds apart. A URL that comes
+    due while its host is busy is pushed back instead of blocking other hosts.
+    """
+
+    def __init__(self, db_name="web_scraper.db", workers=4, host_delay=5.0):
+        self.db_name = db_name
+        self.host_delay = host_delay
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.cond = threading.Condition()
+        self.heap = []
+        self.entries = {}
+        self.host_busy = set()
+        self.host_ready_at = {}
+        self.counters = {"checks": 0, "changes": 0, "unchanged": 0, "errors": 0, "deferred": 0,
+                         "claimed_elsewhere": 0}
+        self.running = False
+        self.thread = None
+
+        db = Database(db_name)
+        try:
+            for entry in db.fetch_tracked_urls():
+                self._schedule(entry, entry["next_due"])
+        finally:
+            db.close()
+
+    def _schedule(self, entry, due):
+        entry["next_due"] = due
+        self.entries[entry["url"]] = entry
+        heapq.heappush(self.heap, (due, entry["url"]))
+
+    def track(self, url, scrape_type="products", interval=3600, min_interval=300,
+              max_interval=7 * 86400):
+        """Start tracking a URL; its first check is due immediately.
+
+        Raises ValueError for an unknown scrape_type or an interval that is not
+        a positive number of seconds.
+        """
+        if scrape_type not in SCRAPE_TYPES:
+            raise ValueError(f"unknown scrape_type: {scrape_type}")
+        for value in (interval, min_interval, max_interval):
+            if not (math.isfinite(value) and value > 0):
+                raise ValueError("intervals must be positive numbers of seconds")
+        now = time.time()
+        db = Database(self.db_name)
+        try:
+            db.track_url(url, scrape_type, interval, min_interval, max_interval, now)
+        finally:
+            db.close()
+        with self.cond:
+            self._schedule({
+                "url": url,
+                "scrape_type": scrape_type,
+                "interval_seconds": interval,
+                "min_interval": min_interval,
+                "max_interval": max_interval,
+            }, now)
+            self.cond.notify()
+
+    def untrack(self, url):
+        db = Database(self.db_name)
+        try:
+            db.untrack_url(url)
+        finally:
+            db.close()
+        with self.cond:
+            # The heap entry goes stale and is skipped when popped
+            self.entries.pop(url, None)
+            self.cond.notify()
+
+    def start(self):
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._loop, name="rescrape-scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread:
+            self.thread.join()
+        self.executor.shutdown(wait=True)
+
+    def _loop(self):
+        with self.cond:
+            while self.running:
+                if not self.heap:
+                    self.cond.wait()
+                    continue
+                due, url = self.heap[0]
+                entry = self.entries.get(url)
+                if entry is None or entry["next_due"] != due:
+                    heapq.heappop(self.heap)
+                    continue
+                now = time.time()
+                if due > now:
+                    self.cond.wait(due - now)
+                    continue
+
+                heapq.heappop(self.heap)
+                host = urlparse(url).netloc
+                ready_at = self.host_ready_at.get(host, 0)
+                if host in self.host_busy or ready_at > now:
+                    self.counters["deferred"] += 1
+                    self._schedule(entry, max(ready_at, now + self.host_delay))
+                    continue
+
+                self.host_busy.add(host)
+                self.host_ready_at[host] = now + self.host_delay
+                entry["next_due"] = None
+                self.executor.submit(self._check, dict(entry), host)
+
+    def _check(self, entry, host):
+        url = entry["url"]
+        db = Database(self.db_name)
+        try:
+            if not db.claim_tracked_url(url, time.time(), time.time() + CLAIM_LEASE):
+                self._resync(url, host, db.fetch_tracked_url(url))
+                return
+            status, message, _, outcome = run_scrape(db, url, entry["scrape_type"])
+            checked_at = time.time()
+            changed = outcome == "changed"
+            if status == "done":
+                interval = next_interval(entry["interval_seconds"], changed,
+                                         entry["min_interval"], entry["max_interval"])
+            else:
+                # Keep the interval on failures; the next attempt is one interval away
+                interval = entry["interval_seconds"]
+            next_due = checked_at + interval
+            db.record_tracked_check(url, checked_at, next_due, interval, changed)
+        except Exception as e:
+            logger.error(f"Scheduled check of {url} failed: {str(e)}", exc_info=True)
+            status, outcome, changed = "error", None, False
+            interval = entry["interval_seconds"]
+            next_due = time.time() + interval
+        finally:
+            db.close()
+
+        with self.cond:
+            self.host_busy.discard(host)
+            self.counters["checks"] += 1
+            self.counters["changes"] += int(changed)
+            self.counters["unchanged"] += int(outcome in ("same_body", "same_content"))
+            self.counters["errors"] += int(status != "done")
+            current = self.entries.get(url)
+            # Skip rescheduling if the URL was untracked or re-tracked meanwhile
+            if current is not None and current["next_due"] is None:
+                current["interval_seconds"] = interval
+                self._schedule(current, next_due)
+            self.cond.notify()
+
+    def _resync(self, url, host, row):
+        """Adopt the database's schedule for a URL another process claimed or changed."""
+        with self.cond:
+            self.host_busy.discard(host)
+            self.counters["claimed_elsewhere"] += 1
+            current = self.entries.get(url)
+            if row is None:
+                self.entries.pop(url, None)
+            elif current is not None and current["next_due"] is None:
+                current.update(row)
+                self._schedule(current, row["next_due"])
+            self.cond.notify()
+
+    def stats(self):
+        with self.cond:
+            stats = dict(self.counters)
+            stats["tracked"] = len(self.entries)
+        return stats
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide scheduler, starting it on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RescrapeScheduler()
+            _scheduler.start()
+        return _scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--track", nargs="*", default=[], help="URLs to add before running")
+    parser.add_argument("--scrape-type", choices=SCRAPE_TYPES, default="products")
+    parser.add_argument("--interval", type=float, default=3600, help="initial interval (seconds)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--host-delay", type=float, default=5.0, help="minimum seconds between hits to a host")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    scheduler = RescrapeScheduler(workers=args.workers, host_delay=args.host_delay)
+    for url in args.track:
+        scheduler.track(url, args.scrape_type, args.interval)
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f"Scheduler stats: {scheduler.stats()}")
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
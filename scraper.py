@@ -1,204 +1,487 @@
 # scraper.py
 from bs4 import BeautifulSoup
+from bs4.element import NavigableString, Tag
 import requests
 import re
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 import json
+import time
 from datetime import datetime
+from lxml import html as lxml_html
+import metrics
+import normalize
+import structured_data
+from http_client import get_client
+from selector_plans import (
+    BACKENDS, GENERIC_SELECTORS, PRODUCT_CLASS_XPATH, compile_plan, lxml_text
+)
+
+SOCIAL_PLATFORMS = ['facebook', 'twitter', 'instagram', 'linkedin', 'youtube']
+SOCIAL_PATTERNS = [(platform, re.compile(platform, re.IGNORECASE)) for platform in SOCIAL_PLATFORMS]
+EMAIL_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+')
+PHONE_PATTERN = re.compile(r'\+?\d[\d -]{8,12}\d')
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+PRODUCT_CLASS_PATTERN = re.compile(r'product|item|listing')
+# URL shapes of single-product and listing/search pages, used when the markup is inconclusive
+PRODUCT_URL_PATTERN = re.compile(r'/dp/|/gp/product/|/itm/|/products?/|-i\d+(?:-s\d+)?\.html')
+LISTING_URL_PATTERN = re.compile(r'/s\?|/b/|/sch/|/catalog/|/categor|/collections?/|/search|[?&](?:q|k|page)=')
+# Product fields and the selector-plan entry that fills each one
+FIELD_SELECTORS = {
+    "title": "title", "price": "price", "currency": "price", "rating": "rating",
+    "reviews_count": "reviews", "availability": "availability", "image_url": "image_url",
+    "seller": "seller", "specifications": "specifications"
+}
+FIELD_EXTRACTORS = {
+    "rating": "rating", "reviews_count": "reviews_count", "availability": "availability",
+    "image_url": "image", "seller": "seller", "specifications": "specifications"
+}
+# What a field holds when nothing on the page provides it
+EMPTY_FIELDS = {
+    "title": "", "price": None, "currency": None, "rating": None, "reviews_count": 0,
+    "availability": "", "image_url": None, "seller": "", "specifications": {}
+}
+# Fields the generic selectors may add to a product found in structured data; page-wide
+# seller/specification matches would come from unrelated blocks
+GENERIC_FILL_FIELDS = ("title", "price", "currency", "rating", "reviews_count", "availability")
+# Everything extract_product_data and extract_all_data can return, in output order
+PRODUCT_FIELDS = tuple(FIELD_SELECTORS)
+PAGE_FIELDS = ("meta_info", "headers", "main_content", "contact_info", "social_links", "images", "links")
+# A block only counts as a product when it has both, so they are always extracted
+REQUIRED_PRODUCT_FIELDS = ("title", "price")
+
+# Common product selectors for major e-commerce sites
+# PRODUCT_SELECTORS = {
+#     "amazon": {
+#         "price": "#priceblock_ourprice, .a-price-whole",
+#         "title": "#productTitle",
+#         "rating": "#acrPopover",
+#         "reviews": "#acrCustomerReviewText",
+#         "availability": "#availability span"
+#     },
+#     "ebay": {
+#         "price": ".x-price-primary",
+#         "title": ".x-item-title",
+#         "rating": ".stars-ratings",
+#         "reviews": ".review-ratings-count",
+#         "availability": ".quantity-available"
+#     },
+#     "daraz": {
+#         "price": ".pdp-price",
+#         "title": ".pdp-mod-product-badge-title",
+#         "rating": ".score",
+#         "reviews": ".count",
+#         "availability": ".stock",
+#         "image_url": ".gallery-preview-panel__image",
+#         "seller": ".pdp-product-brand a",
+#         "specifications": ".specification-keys li"
+#     },
+#     # Add more e-commerce sites as needed
+# }
+PRODUCT_SELECTORS = {
+    "amazon": {
+        "price": "#priceblock_ourprice, .a-price",
+        "title": "#productTitle",
+        "rating": "#acrPopover",
+        "reviews": "#acrCustomerReviewText",
+        "availability": "#availability span",
+        "image_url": "#imgTagWrapperId img, #landingImage",  # Added image_url selector for Amazon
+        "seller": "#bylineInfo, #sellerProfileTriggerId",    # Added seller selector for Amazon
+        "specifications": "#productDetails_detailBullets_sections1 tr"  # Added specifications selector for Amazon
+    },
+    "ebay": {
+        "price": ".x-price-primary",
+        "title": ".x-item-title",
+        "rating": ".stars-ratings",
+        "reviews": ".review-ratings-count",
+        "availability": ".quantity-available",
+        "image_url": ".ux-image-carousel-item img",  # Added image_url selector for eBay
+        "seller": ".ux-seller-section__item--seller a",  # Added seller selector for eBay
+        "specifications": ".ux-layout-section--features .ux-layout-section__item"  # Added specifications selector for eBay
+    },
+    "daraz": {
+        "price": ".pdp-price",
+        "title": ".pdp-mod-product-badge-title",
+        "rating": ".score",
+        "reviews": ".count",
+        "availability": ".stock",
+        "image_url": ".gallery-preview-panel__image",
+        "seller": ".pdp-product-brand a",
+        "specifications": ".specification-keys li"
+    },
+    # Add more e-commerce sites as needed
+}
+
+# Compile every site plan once at startup
+for _selectors in PRODUCT_SELECTORS.values():
+    compile_plan(_selectors)
+
+def product_fields(fields=None):
+    """The requested product fields in output order, title and price included; None means all."""
+    if fields is None:
+        return PRODUCT_FIELDS
+    unknown = set(fields) - set(PRODUCT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown product fields: {', '.join(sorted(unknown))}")
+    wanted = set(fields) | set(REQUIRED_PRODUCT_FIELDS)
+    return tuple(field for field in PRODUCT_FIELDS if field in wanted)
+
+
+def page_fields(fields=None):
+    """The requested general-scrape sections in output order; None means all."""
+    if fields is None:
+        return PAGE_FIELDS
+    unknown = set(fields) - set(PAGE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown page fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in PAGE_FIELDS if field in fields)
+
 
 class WebScraper:
-    def __init__(self, url, scrape_type="general"):
+    def __init__(self, url, scrape_type="general", html=None, backend="soup", structured=True):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
         self.url = url
         self.scrape_type = scrape_type
-        self.soup = self.get_soup()
-        
-        # Common product selectors for major e-commerce sites
-        # self.product_selectors = {
-        #     "amazon": {
-        #         "price": "#priceblock_ourprice, .a-price-whole",
-        #         "title": "#productTitle",
-        #         "rating": "#acrPopover",
-        #         "reviews": "#acrCustomerReviewText",
-        #         "availability": "#availability span"
-        #     },
-        #     "ebay": {
-        #         "price": ".x-price-primary",
-        #         "title": ".x-item-title",
-        #         "rating": ".stars-ratings",
-        #         "reviews": ".review-ratings-count",
-        #         "availability": ".quantity-available"
-        #     },
-        #     "daraz": {
-        #         "price": ".pdp-price",
-        #         "title": ".pdp-mod-product-badge-title",
-        #         "rating": ".score",
-        #         "reviews": ".count",
-        #         "availability": ".stock",
-        #         "image_url": ".gallery-preview-panel__image",
-        #         "seller": ".pdp-product-brand a",
-        #         "specifications": ".specification-keys li"
-        #     },
-        #     # Add more e-commerce sites as needed
-        # }
-        self.product_selectors = {
-            "amazon": {
-                "price": "#priceblock_ourprice, .a-price-whole",
-                "title": "#productTitle",
-                "rating": "#acrPopover",
-                "reviews": "#acrCustomerReviewText",
-                "availability": "#availability span",
-                "image_url": "#imgTagWrapperId img, #landingImage",  # Added image_url selector for Amazon
-                "seller": "#bylineInfo, #sellerProfileTriggerId",    # Added seller selector for Amazon
-                "specifications": "#productDetails_detailBullets_sections1 tr"  # Added specifications selector for Amazon
-            },
-            "ebay": {
-                "price": ".x-price-primary",
-                "title": ".x-item-title",
-                "rating": ".stars-ratings",
-                "reviews": ".review-ratings-count",
-                "availability": ".quantity-available",
-                "image_url": ".ux-image-carousel-item img",  # Added image_url selector for eBay
-                "seller": ".ux-seller-section__item--seller a",  # Added seller selector for eBay
-                "specifications": ".ux-layout-section--features .ux-layout-section__item"  # Added specifications selector for eBay
-            },
-            "daraz": {
-                "price": ".pdp-price",
-                "title": ".pdp-mod-product-badge-title",
-                "rating": ".score",
-                "reviews": ".count",
-                "availability": ".stock",
-                "image_url": ".gallery-preview-panel__image",
-                "seller": ".pdp-product-brand a",
-                "specifications": ".specification-keys li"
-            },
-            # Add more e-commerce sites as needed
-        }
+        # Decimal mark and default currency for the site's price and count strings
+        self.locale = normalize.locale_for(url)
+        # "lxml" runs the compiled selector plans on an lxml tree; the soup is then
+        # only built if a general-data method asks for it
+        self.backend = backend
+        # JSON-LD/microdata/OpenGraph fields are used before the selectors
+        self.structured = structured
+        self.tree = None
+        self._html = None
+        self._source = None
+        self._structured_products = None
+        self._listing_products = None
+        self._listing_fields = None
+        # Pages fetched elsewhere (e.g. by the batch engine) are parsed directly
+        self.soup = self.get_soup() if html is None else self.parse_html(html)
+        self.product_selectors = PRODUCT_SELECTORS
+
+    @property
+    def soup(self):
+        """BeautifulSoup tree of the current page, built on first use."""
+        if self._soup is None and self._html is not None:
+            with metrics.timed("parse", metrics.site_label(self.url)):
+                self._soup = BeautifulSoup(self._html, 'lxml')
+            self._html = None
+        return self._soup
+
+    @soup.setter
+    def soup(self, value):
+        self._soup = value
+
     def get_soup(self):
         """Fetch and parse the webpage with rotating user agents."""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-        }
         try:
-            response = requests.get(self.url, headers=headers, timeout=10)
+            response = get_client().get(self.url)
             response.raise_for_status()
-            return BeautifulSoup(response.text, 'lxml')
+            return self.parse_html(response.text)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching the URL: {e}")
+            self.tree = None
+            self._html = None
+            self._new_page(None)
             return None
 
-    def extract_product_data(self):
-        """Extract product-specific data from e-commerce sites."""
-        if not self.soup:
-            return {}
+    def _new_page(self, html):
+        """Forget everything derived from the previous page."""
+        self._source = html
+        self._html = None
+        self._structured_products = None
+        self._listing_products = None
+        self._listing_fields = None
 
-        product_data = {
-            "url": self.url,
-            "timestamp": datetime.now().isoformat(),
-            "products": []
-        }
+    def parse_html(self, html):
+        """Parse already-downloaded HTML.
+
+        The soup is built on first use, so pages answered entirely by their
+        structured data are never parsed into a tree.
+        """
+        self._new_page(html)
+        if self.backend == "lxml":
+            self.tree = self._parse_lxml(html)
+        self._html = html
+        return None
+
+    def _parse_lxml(self, html):
+        if not html:
+            return None
+        try:
+            with metrics.timed("parse", metrics.site_label(self.url)):
+                return lxml_html.document_fromstring(html)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration
+            if isinstance(html, str):
+                return lxml_html.document_fromstring(html.encode('utf-8'))
+            raise
 
-        # Determine the site based on the URL
-        site = None
+    def _detect_site(self):
+        """Determine the site based on the URL."""
         if "amazon" in self.url:
-            site = "amazon"
+            return "amazon"
         elif "ebay" in self.url:
-            site = "ebay"
+            return "ebay"
         elif "daraz" in self.url:
-            site = "daraz"
+            return "daraz"
+        return None
+
+    def _document_root(self):
+        """Root the selector plans run against, or None when there is no page."""
+        if self.backend == "lxml":
+            return self.tree.getroottree() if self.tree is not None else None
+        return self.soup if self.soup else None
+
+    def structured_products(self):
+        """Products the page declares in JSON-LD/microdata/OpenGraph with a title and a price."""
+        if self._structured_products is None:
+            with metrics.timed("structured_data", metrics.site_label(self.url)):
+                found = structured_data.extract(self._source) if self.structured else []
+            self._structured_products = [p for p in found if p.get("title") and p.get("price")]
+            # The raw HTML is only kept around for this
+            self._source = None
+        return self._structured_products
+
+    @metrics.traced("extract_product_data")
+    def extract_product_data(self, fields=None):
+        """Extract product-specific data from e-commerce sites.
+
+        Fields the page declares as structured data are used as they are; the
+        CSS selectors only run for the rest, and the generic product-block scan
+        only runs for pages without structured data. ``fields`` limits each
+        product to those PRODUCT_FIELDS (title and price are always included);
+        no work is done for the others.
+        """
+        start = time.perf_counter()
+        wanted = product_fields(fields)
+        known = self.structured_products()
+        site = self._detect_site()
+        stats = {"structured": 0, "selector": 0}
 
         # Use site-specific selectors if available
         if site and site in self.product_selectors:
-            selectors = self.product_selectors[site]
-            # product_info = {
-            #     "title": self._extract_text(self.soup, selectors["title"]),
-            #     "price": self._extract_price(self.soup, selectors["price"]),
-            #     "currency": self._detect_currency(self.soup, selectors["price"]),
-            #     "rating": self._extract_rating(self.soup, selectors["rating"]),
-            #     "reviews_count": self._extract_reviews_count(self.soup, selectors["reviews"]),
-            #     "availability": self._extract_availability(self.soup, selectors["availability"]),
-            #     "image_url": self._extract_image(self.soup, selectors["image_url"]),
-            #     "seller": self._extract_seller(self.soup, selectors["seller"]),
-            #     "specifications": self._extract_specifications(self.soup, selectors["specifications"])
-            # }
-            product_info = {
-                "title": self._extract_text(self.soup, selectors.get("title")),
-                "price": self._extract_price(self.soup, selectors.get("price")),
-                "currency": self._detect_currency(self.soup, selectors.get("price")),
-                "rating": self._extract_rating(self.soup, selectors.get("rating")),
-                "reviews_count": self._extract_reviews_count(self.soup, selectors.get("reviews")),
-                "availability": self._extract_availability(self.soup, selectors.get("availability")),
-                "image_url": self._extract_image(self.soup, selectors.get("image_url")),
-                "seller": self._extract_seller(self.soup, selectors.get("seller")),
-                "specifications": self._extract_specifications(self.soup, selectors.get("specifications"))
+            plan = compile_plan(self.product_selectors[site], self.backend)
+            declared = known[0] if known else None
+            missing = declared is None or any(
+                field not in declared and FIELD_SELECTORS[field] in plan for field in wanted
+            )
+            root = self._document_root() if missing else None
+            if root is None and declared is None:
+                return {}
+            product_info = self._build_product_info(root, plan, declared, stats, wanted=wanted)
+            products = [product_info] if product_info["title"] and product_info["price"] else []
+        elif known:
+            # One declared product is completed from the page's first product block;
+            # listings are taken as declared
+            missing = len(known) == 1 and any(
+                f not in known[0] and f in GENERIC_FILL_FIELDS for f in wanted
+            )
+            root = self._document_root() if missing else None
+            block = self._first_product_block(root) if root is not None else None
+            products = [
+                self._build_product_info(block, self._generic_plan, product, stats, GENERIC_FILL_FIELDS, wanted)
+                for product in known
+            ]
+        else:
+            root = self._document_root()
+            if root is None:
+                return {}
+            products = self._extract_generic_products(root, wanted)
+
+        if self.structured:
+            structured_data.stats.record(
+                site or urlparse(self.url).netloc, bool(known), stats["structured"], stats["selector"],
+                root is not None, time.perf_counter() - start
+            )
+        return {
+            "url": self.url,
+            "timestamp": datetime.now().isoformat(),
+            "products": products
+        }
+
+    def classify_page(self, fields=None):
+        """Return "product", "listing" or "other" for the fetched page.
+
+        Known sites count as product pages when their product selectors find a
+        title and a price; elsewhere one generic product block means a product
+        page and several mean a listing. The URL decides when the markup does not.
+        The generic blocks found are kept, with ``fields``, for extract_listing_data.
+        """
+        known = self.structured_products()
+        if known:
+            return "product" if len(known) == 1 else "listing"
+        root = self._document_root()
+        if root is None:
+            return "other"
+        site = self._detect_site()
+        if site and site in self.product_selectors:
+            plan = compile_plan(self.product_selectors[site], self.backend)
+            if self._extract_text(root, plan.get("title")) and self._extract_text(root, plan.get("price")):
+                return "product"
+        else:
+            # Kept for extract_listing_data, which would otherwise walk the page again
+            self._listing_fields = product_fields(fields)
+            self._listing_products = self._extract_generic_products(root, self._listing_fields)
+            if len(self._listing_products) > 1:
+                return "listing"
+            if self._listing_products:
+                return "product"
+        if PRODUCT_URL_PATTERN.search(self.url):
+            return "product"
+        if LISTING_URL_PATTERN.search(self.url):
+            return "listing"
+        return "other"
+
+    def extract_listing_data(self, fields=None):
+        """Every product block on a listing page, in extract_product_data's shape."""
+        wanted = product_fields(fields)
+        if self._listing_products is None and len(self.structured_products()) > 1:
+            return self.extract_product_data(fields)
+        root = self._document_root()
+        if root is None:
+            return {}
+        products = self._listing_products if self._listing_fields == wanted else None
+        return {
+            "url": self.url,
+            "timestamp": datetime.now().isoformat(),
+            "products": products if products is not None else self._extract_generic_products(root, wanted)
+        }
+
+    def _build_product_info(self, element, plan, known=None, stats=None, fields=FIELD_SELECTORS,
+                            wanted=PRODUCT_FIELDS):
+        """Fill a product dict with the ``wanted`` fields from one element using a compiled selector plan.
+
+        Fields in ``known`` are taken from it; selectors only run for the other
+        ``fields``, and only when there is an element. Anything left gets the
+        same empty value the selectors return when they match nothing.
+        """
+        if known is None and wanted is PRODUCT_FIELDS:
+            if stats is not None:
+                stats["selector"] += len(FIELD_SELECTORS)
+            # The price text is read once and used for both price and currency
+            price_text = self._extract_text(element, plan.get("price") or self._generic_plan["price"])
+            return {
+                "title": self._extract_text(element, plan.get("title")),
+                "price": self._parse_price(price_text),
+                "currency": self._parse_currency(price_text),
+                "rating": self._extract_rating(element, plan.get("rating")),
+                "reviews_count": self._extract_reviews_count(element, plan.get("reviews")),
+                "availability": self._extract_availability(element, plan.get("availability")),
+                "image_url": self._extract_image(element, plan.get("image_url")),
+                "seller": self._extract_seller(element, plan.get("seller")),
+                "specifications": self._extract_specifications(element, plan.get("specifications"))
             }
-            if product_info["title"] and product_info["price"]:
-                product_data["products"].append(product_info)
+
+        known = known or {}
+        product_info = {}
+        price_text = None
+        for field in wanted:
+            if field in known:
+                product_info[field] = known[field]
+                if stats is not None:
+                    stats["structured"] += 1
+                continue
+            if element is None or field not in fields:
+                product_info[field] = EMPTY_FIELDS[field]
+                continue
+            if field in ("price", "currency"):
+                if price_text is None:
+                    price_text = self._extract_text(element, plan.get("price") or self._generic_plan["price"])
+                value = self._parse_price(price_text) if field == "price" else self._parse_currency(price_text)
+            elif field == "title":
+                value = self._extract_text(element, plan.get("title"))
+            else:
+                extract = getattr(self, f"_extract_{FIELD_EXTRACTORS[field]}")
+                value = extract(element, plan.get(FIELD_SELECTORS[field]))
+            product_info[field] = value
+            if stats is not None:
+                stats["selector"] += 1
+        return product_info
+
+    @property
+    def _generic_plan(self):
+        return compile_plan(GENERIC_SELECTORS, self.backend)
+
+    @metrics.traced("extract_generic_products")
+    def _extract_generic_products(self, root, wanted=PRODUCT_FIELDS):
+        """Generic product extraction over every product-like element under root."""
+        if self.backend == "lxml":
+            candidates = PRODUCT_CLASS_XPATH(root)
         else:
-            # Generic product extraction
-            products = self.soup.find_all(class_=re.compile(r'product|item|listing'))
-            for product in products:
-                product_info = {
-                    "title": self._extract_text(product, '.product-title, .item-title, h2, h3'),
-                    "price": self._extract_price(product),
-                    "currency": self._detect_currency(product),
-                    "rating": self._extract_rating(product),
-                    "reviews_count": self._extract_reviews_count(product),
-                    "availability": self._extract_availability(product),
-                    "image_url": self._extract_image(product),
-                    "seller": self._extract_seller(product),
-                    "specifications": self._extract_specifications(product)
-                }
-                if product_info["title"] and product_info["price"]:
-                    product_data["products"].append(product_info)
-
-        return product_data
+            candidates = root.find_all(class_=PRODUCT_CLASS_PATTERN)
+        plan = self._generic_plan
+        products = []
+        for product in candidates:
+            product_info = self._build_product_info(product, plan, wanted=wanted)
+            if product_info["title"] and product_info["price"]:
+                products.append(product_info)
+        return products
+
+    def _first_product_block(self, root):
+        """The first element the generic scan would look at, or root if there is none."""
+        if self.backend == "lxml":
+            candidates = PRODUCT_CLASS_XPATH(root)
+            return candidates[0] if candidates else root
+        block = root.find(class_=PRODUCT_CLASS_PATTERN)
+        return block if block is not None else root
+
+    def _select_one(self, element, selector):
+        if self.backend == "lxml":
+            found = selector(element)
+            return found[0] if found else None
+        return element.select_one(selector)
+
+    def _select(self, element, selector):
+        if self.backend == "lxml":
+            return selector(element)
+        return element.select(selector)
+
+    def _node_text(self, node):
+        if self.backend == "lxml":
+            return lxml_text(node)
+        return node.get_text(strip=True)
 
     def _extract_text(self, element, selector, default=""):
         """Helper method to extract text from elements."""
+        if selector is None:
+            return default
         try:
-            found = element.select_one(selector)
-            return found.get_text(strip=True) if found else default
+            found = self._select_one(element, selector)
+            return self._node_text(found) if found is not None else default
         except:
             return default
 
+    def _parse_price(self, price_text):
+        """Normalize a price string to a number in the site's locale."""
+        minor, currency = normalize.parse_price(price_text, self.locale)
+        return normalize.to_major(minor, currency)
+
+    def _parse_currency(self, price_text):
+        """ISO code of the currency a price string is in."""
+        return normalize.parse_price(price_text, self.locale)[1]
+
     def _extract_price(self, element, selector=None):
         """Extract and normalize price."""
-        price_text = self._extract_text(element, selector or '.price, .product-price, [class*="price"]')
-        if price_text:
-            # Remove currency symbols and normalize
-            price = re.sub(r'[^\d.,]', '', price_text)
-            try:
-                return float(price.replace(',', '.'))
-            except:
-                return None
-        return None
+        return self._parse_price(self._extract_text(element, selector or self._generic_plan["price"]))
 
     def _detect_currency(self, element, selector=None):
         """Detect currency symbol/code."""
-        price_text = self._extract_text(element, selector or '.price, .product-price, [class*="price"]')
-        currency_match = re.search(r'[\$\€\£\¥]|USD|EUR|GBP|JPY', price_text)
-        return currency_match.group() if currency_match else None
+        return self._parse_currency(self._extract_text(element, selector or self._generic_plan["price"]))
 
     def _extract_rating(self, element, selector=None):
         """Extract product rating."""
-        rating_text = self._extract_text(element, selector or '.rating, .stars, [class*="rating"]')
-        try:
-            return float(re.search(r'\d+\.?\d*', rating_text).group())
-        except:
-            return None
+        rating_text = self._extract_text(element, selector or self._generic_plan["rating"])
+        return normalize.parse_rating(rating_text, self.locale)
 
     def _extract_reviews_count(self, element, selector=None):
         """Extract number of reviews."""
-        reviews_text = self._extract_text(element, selector or '.reviews-count, [class*="review"]')
-        try:
-            return int(re.search(r'\d+', reviews_text).group())
-        except:
-            return 0
+        reviews_text = self._extract_text(element, selector or self._generic_plan["reviews"])
+        return normalize.parse_count(reviews_text, self.locale) or 0
 
     def _extract_availability(self, element, selector=None):
         """Extract product availability status."""
-        return self._extract_text(element, selector or '.availability, .stock-status, [class*="stock"]')
+        return self._extract_text(element, selector or self._generic_plan["availability"])
 
     # def _extract_image(self, element, selector=None):
     #     """Extract product image URL."""
@@ -208,46 +491,124 @@ class WebScraper:
         """Extract product image URL."""
         if selector is None:
             return None
-        img = element.select_one(selector)
-        return urljoin(self.url, img['src']) if img and 'src' in img.attrs else None
+        img = self._select_one(element, selector)
+        if img is None:
+            return None
+        src = img.get('src')
+        return urljoin(self.url, src) if src is not None else None
 
     def _extract_seller(self, element, selector=None):
         """Extract seller information."""
-        return self._extract_text(element, selector or '.seller, .vendor, [class*="seller"]')
+        return self._extract_text(element, selector or self._generic_plan["seller"])
 
     def _extract_specifications(self, element, selector=None):
         """Extract product specifications."""
         specs = {}
-        spec_elements = element.select(selector or '.specifications li, .specs li, .details li')
+        spec_elements = self._select(element, selector or self._generic_plan["specifications"])
         for spec in spec_elements:
-            text = spec.get_text(strip=True)
+            text = self._node_text(spec)
             if ':' in text:
                 key, value = text.split(':', 1)
                 specs[key.strip()] = value.strip()
         return specs
 
-    def extract_all_data(self):
-        """Extract all data based on scrape type."""
+    def extract_all_data(self, fields=None):
+        """Extract all data based on scrape type.
+
+        ``fields`` names the PRODUCT_FIELDS or PAGE_FIELDS sections to return
+        (default: all of them); sections that are not asked for are not computed.
+        """
         if self.scrape_type == "products":
-            return self.extract_product_data()
+            return self.extract_product_data(fields)
         else:
-            # Original general scraping logic
-            return {
-                "url": self.url,
-                "meta_info": self.extract_meta_info(),
-                "headers": self.extract_headers(),
-                "main_content": self.extract_main_content(),
-                "contact_info": self.extract_contact_info(),
-                "social_links": self.extract_social_links(),
-                "images": self.extract_images(),
-                "links": self.extract_links()
-            }
+            return self._extract_general_data(page_fields(fields))
+
+    @metrics.traced("extract_general_data")
+    def _extract_general_data(self, wanted=PAGE_FIELDS):
+        """Build the ``wanted`` general-scrape sections in a single walk over the tree.
+
+        With every section wanted this produces the same dict as calling
+        extract_meta_info, extract_headers, extract_main_content,
+        extract_contact_info, extract_social_links, extract_images and
+        extract_links one after another. Text is only collected for
+        main_content/contact_info, and only the wanted tags are looked at.
+        """
+        want_text = "main_content" in wanted or "contact_info" in wanted
+        want_links = "links" in wanted or "social_links" in wanted
+        want_images = "images" in wanted
+        want_meta = "meta_info" in wanted
+        want_headers = "headers" in wanted
+        meta_info = {}
+        headers = {name: [] for name in HEADING_TAGS}
+        social = {platform: [] for platform in SOCIAL_PLATFORMS}
+        images = []
+        links = []
+        raw_text = []
+        content = []
+
+        if self.soup:
+            text_types = self.soup.interesting_string_types or Tag.MAIN_CONTENT_STRING_TYPES
+            if isinstance(text_types, type):
+                text_types = {text_types}
+
+            for node in self.soup.descendants:
+                if isinstance(node, NavigableString):
+                    # Same string types get_text() keeps: no comments, scripts, doctypes
+                    if want_text and type(node) in text_types:
+                        raw_text.append(node)
+                        stripped = node.strip()
+                        if stripped:
+                            content.append(stripped)
+                    continue
+
+                name = node.name
+                attrs = node.attrs
+                if name == 'a':
+                    href = attrs.get('href')
+                    if want_links and href is not None:
+                        links.append(urljoin(self.url, href))
+                        for platform, pattern in SOCIAL_PATTERNS:
+                            if pattern.search(href):
+                                social[platform].append(href)
+                elif name == 'img':
+                    if want_images and 'src' in attrs:
+                        images.append(urljoin(self.url, attrs['src']))
+                elif name == 'meta':
+                    if not want_meta:
+                        continue
+                    if 'name' in attrs:
+                        meta_info[attrs['name']] = attrs.get('content', '')
+                    elif 'property' in attrs:
+                        meta_info[attrs['property']] = attrs.get('content', '')
+                elif want_headers and name in headers:
+                    headers[name].append(node.get_text(strip=True))
+
+        contact_info = {}
+        if self.soup and "contact_info" in wanted:
+            text = ''.join(raw_text)
+            emails = EMAIL_PATTERN.findall(text)
+            if emails:
+                contact_info['emails'] = emails
+            phones = PHONE_PATTERN.findall(text)
+            if phones:
+                contact_info['phones'] = phones
+
+        sections = {
+            "meta_info": meta_info,
+            "headers": headers if self.soup else {},
+            "main_content": ''.join(content),
+            "contact_info": contact_info,
+            "social_links": {platform: hrefs for platform, hrefs in social.items() if hrefs},
+            "images": images,
+            "links": links
+        }
+        return {"url": self.url, **{field: sections[field] for field in wanted}}
 
     def track_price(self, product_url, target_price):
         """Track the price of a product and notify if it drops below the target price."""
         self.url = product_url
         self.soup = self.get_soup()
-        product_data = self.extract_product_data()
+        product_data = self.extract_product_data(REQUIRED_PRODUCT_FIELDS)
         if product_data["products"]:
             current_price = product_data["products"][0]["price"]
             if current_price and current_price <= target_price:
@@ -258,13 +619,14 @@ class WebScraper:
 
     def compare_prices(self, product_urls):
         """Compare prices of the same product across different URLs."""
+        from batch import scrape_batch
+
         price_comparison = {}
-        for url in product_urls:
-            self.url = url
-            self.soup = self.get_soup()
-            product_data = self.extract_product_data()
-            if product_data["products"]:
-                price_comparison[url] = product_data["products"][0]["price"]
+        # Fetch all URLs concurrently instead of one round trip at a time
+        for result in scrape_batch(product_urls, scrape_type="products", fields=("price",)):
+            product_data = result["data"]
+            if product_data and product_data["products"]:
+                price_comparison[result["url"]] = product_data["products"][0]["price"]
         return price_comparison
 
     def extract_meta_info(self):
@@ -0,0 +1,82 @@
+# selector_plans.py
+import threading
+
+import soupsieve as sv
+from lxml import etree
+
+try:
+    from cssselect import HTMLTranslator
+except ImportError:  # cssselect is only needed for the lxml backend
+    HTMLTranslator = None
+
+# Fallback selectors used when a site has no entry for a field (and for generic pages)
+GENERIC_SELECTORS = {
+    "title": '.product-title, .item-title, h2, h3',
+    "price": '.price, .product-price, [class*="price"]',
+    "rating": '.rating, .stars, [class*="rating"]',
+    "reviews": '.reviews-count, [class*="review"]',
+    "availability": '.availability, .stock-status, [class*="stock"]',
+    "seller": '.seller, .vendor, [class*="seller"]',
+    "specifications": '.specifications li, .specs li, .details li'
+}
+
+BACKENDS = ("soup", "lxml")
+
+# Strings inside these tags are not part of BeautifulSoup's get_text() output
+NON_TEXT_TAGS = {"script", "style", "template", "rt", "rp"}
+
+PRODUCT_CLASS_XPATH = etree.XPath(
+    "descendant::*[@class and re:test(@class, 'product|item|listing')]",
+    namespaces={"re": "http://exslt.org/regular-expressions"}
+)
+
+_plans = {}
+# (backend, id(selectors)) -> (selectors, plan); the mapping is held so its id stays unique
+_plans_by_id = {}
+_plans_lock = threading.Lock()
+
+
+def _compile_lxml(css):
+    if HTMLTranslator is None:
+        raise ImportError("The lxml backend needs the 'cssselect' package")
+    # descendant:: (not descendant-or-self::) so matching follows soupsieve's select()
+    return etree.XPath(HTMLTranslator().css_to_xpath(css, prefix="descendant::"))
+
+
+def compile_plan(selectors, backend="soup"):
+    """Return {field: compiled selector} for a site, compiling each distinct plan once.
+
+    soup plans hold soupsieve patterns that Tag.select_one()/select() accept
+    directly; lxml plans hold XPath objects translated from the same CSS.
+    Selector mappings are module constants, so repeat calls are answered by the
+    mapping's identity without looking at its contents.
+    """
+    cached = _plans_by_id.get((backend, id(selectors)))
+    if cached is not None and cached[0] is selectors:
+        return cached[1]
+    key = (backend, tuple(sorted((field, css) for field, css in selectors.items() if css)))
+    plan = _plans.get(key)
+    if plan is None:
+        compile_css = sv.compile if backend == "soup" else _compile_lxml
+        plan = {field: compile_css(css) for field, css in key[1]}
+    with _plans_lock:
+        plan = _plans.setdefault(key, plan)
+        _plans_by_id[(backend, id(selectors))] = (selectors, plan)
+    return plan
+
+
+def lxml_text(element):
+    """Text of an lxml element matching BeautifulSoup's get_text(strip=True)."""
+    parts = []
+    _collect_text(element, parts, element)
+    return "".join(parts)
+
+
+def _collect_text(node, parts, root):
+    if isinstance(node.tag, str) and node.tag not in NON_TEXT_TAGS:
+        if node.text and node.text.strip():
+            parts.append(node.text.strip())
+        for child in node:
+            _collect_text(child, parts, root)
+    if node is not root and node.tail and node.tail.strip():
+        parts.append(node.tail.strip())
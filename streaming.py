@@ -0,0 +1,93 @@
+# streaming.py
+from datetime import datetime
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from http_client import get_client
+from scraper import WebScraper, PRODUCT_CLASS_PATTERN
+
+
+class StreamingScraper:
+    """Incrementally parse a page and emit products and links as their subtrees close.
+
+    The response is read in chunks and fed to an lxml pull parser, so the full
+    body is never held in memory and no whole-page tree is built. Elements outside
+    a product container are discarded as soon as they close, which keeps memory
+    bounded by the largest single product block rather than the page size.
+    """
+
+    def __init__(self, url, chunk_size=64 * 1024, client=None):
+        self.url = url
+        self.chunk_size = chunk_size
+        self.client = client or get_client()
+        # Reuses the generic product helpers; the empty document is never walked
+        self._helper = WebScraper(url, "products", html="")
+
+    def iter_chunks(self):
+        """Yield raw body chunks from the network."""
+        response = self.client.get(self.url, stream=True)
+        try:
+            response.raise_for_status()
+            for chunk in response.iter_content(self.chunk_size):
+                yield chunk
+        finally:
+            response.close()
+
+    def iter_items(self, chunks=None):
+        """Yield ("link", url) and ("product", dict) tuples in document order."""
+        parser = etree.HTMLPullParser(events=("start", "end"))
+        state = {"open_products": []}
+        for chunk in chunks if chunks is not None else self.iter_chunks():
+            parser.feed(chunk)
+            yield from self._drain(parser, state)
+        parser.close()
+        yield from self._drain(parser, state)
+
+    def _drain(self, parser, state):
+        open_products = state["open_products"]
+        for event, elem in parser.read_events():
+            if not isinstance(elem.tag, str):
+                continue
+            is_product = bool(PRODUCT_CLASS_PATTERN.search(elem.get("class", "")))
+            if event == "start":
+                if is_product:
+                    open_products.append(elem)
+                continue
+
+            if elem.tag == "a" and elem.get("href") is not None:
+                yield "link", urljoin(self.url, elem.get("href"))
+
+            if is_product and open_products and open_products[-1] is elem:
+                open_products.pop()
+                if not open_products:
+                    # Outermost product block closed: extract it (and any nested ones)
+                    for product in self._extract_products(elem):
+                        yield "product", product
+            if not open_products:
+                self._release(elem)
+
+    def _extract_products(self, elem):
+        fragment = BeautifulSoup(etree.tostring(elem, encoding="unicode", with_tail=False), "lxml")
+        return self._helper._extract_generic_products(fragment)
+
+    def _release(self, elem):
+        """Free a closed element and the already-processed siblings before it."""
+        elem.clear(keep_tail=False)
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
+
+    def collect(self):
+        """Run the stream to completion and return an extract_product_data-style dict."""
+        result = {
+            "url": self.url,
+            "timestamp": datetime.now().isoformat(),
+            "products": [],
+            "links": []
+        }
+        for kind, item in self.iter_items():
+            result["products" if kind == "product" else "links"].append(item)
+        return result
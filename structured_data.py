@@ -0,0 +1,264 @@
+# structured_data.py
+"""Product fields from JSON-LD, schema.org microdata and OpenGraph meta tags.
+
+The raw HTML is scanned with regular expressions for <script
+type="application/ld+json"> blocks and tags carrying itemprop/property
+attributes, so no DOM is needed. JSON-LD Product (and ItemList) entries come
+first; a single page-level product is then completed from microdata and
+OpenGraph/product:* meta tags. Fields use extract_product_data's names and
+types; a field the page does not declare is left out so the selector path
+can fill it.
+"""
+import html
+import json
+import re
+import threading
+from collections import defaultdict
+
+FIELDS = ("title", "price", "currency", "rating", "reviews_count", "availability", "image_url",
+          "seller", "specifications")
+
+_PATTERNS = {
+    "json_ld": r'<script\b[^>]*\btype\s*=\s*["\']?application/ld\+json[^>]*>(.*?)</script\s*>',
+    # Tags with an itemprop, plus the text that follows up to the next tag
+    "itemprop": r'(<[a-zA-Z][^>]*\bitemprop\s*=[^>]*>)([^<]{0,200})',
+    "meta": r'<meta\b[^>]*>',
+    "attribute": r'([a-zA-Z:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))',
+    "product_scope": r'itemtype\s*=\s*["\']?https?://schema\.org/Product\b',
+}
+# Compiled for both str and bytes input so bytes bodies are not decoded in full
+_COMPILED = {
+    kind: {name: re.compile(pattern.encode() if kind is bytes else pattern, re.IGNORECASE | re.DOTALL)
+           for name, pattern in _PATTERNS.items()}
+    for kind in (str, bytes)
+}
+_CAMEL = re.compile(r"(?<=[a-z])(?=[A-Z])")
+MICRODATA_FIELDS = {
+    "name": "title", "price": "price", "lowprice": "price", "pricecurrency": "currency", "ratingvalue": "rating",
+    "reviewcount": "reviews_count", "ratingcount": "reviews_count", "availability": "availability",
+}
+OPENGRAPH_FIELDS = {
+    "og:title": "title", "og:image": "image_url",
+    "product:price:amount": "price", "og:price:amount": "price",
+    "product:price:currency": "currency", "og:price:currency": "currency",
+    "product:availability": "availability", "og:availability": "availability",
+}
+OPENGRAPH_AVAILABILITY = {"instock": "In Stock", "oos": "Out Of Stock", "outofstock": "Out Of Stock",
+                          "preorder": "Pre Order", "discontinued": "Discontinued"}
+IDENTIFIER_KEYS = {"brand": "Brand", "sku": "SKU", "mpn": "MPN", "gtin": "GTIN", "gtin13": "GTIN",
+                   "gtin12": "GTIN", "gtin8": "GTIN", "model": "Model"}
+
+
+def _decode(value):
+    return value.decode("utf-8", "replace") if isinstance(value, bytes) else value
+
+
+def _text(value):
+    return html.unescape(_decode(value)).strip()
+
+
+def _attributes(tag, patterns):
+    attributes = {}
+    for name, double, single, bare in patterns["attribute"].findall(tag):
+        value = double or single or bare
+        attributes[_text(name).lower()] = _text(value)
+    return attributes
+
+
+def _number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        # schema.org prices use "." for decimals; grouping commas are dropped
+        match = re.search(r"\d[\d,]*(?:\.\d+)?", value)
+        if match:
+            try:
+                return float(match.group().replace(",", ""))
+            except ValueError:
+                return None
+    return None
+
+
+def _availability(value):
+    """"https://schema.org/InStock" -> "In Stock"."""
+    if not isinstance(value, str) or not value:
+        return None
+    return _CAMEL.sub(" ", value.rstrip("/").rsplit("/", 1)[-1])
+
+
+def _first(value):
+    return value[0] if isinstance(value, list) and value else value
+
+
+def _name(value):
+    value = _first(value)
+    if isinstance(value, dict):
+        value = value.get("name")
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def _types(item):
+    types = item.get("@type", ())
+    return {types} if isinstance(types, str) else set(types) if isinstance(types, list) else set()
+
+
+def _iter_products(node):
+    """Product nodes anywhere in a JSON-LD document (@graph, ItemList, nesting)."""
+    if isinstance(node, list):
+        for child in node:
+            yield from _iter_products(child)
+    elif isinstance(node, dict):
+        if _types(node) & {"Product", "ProductGroup", "IndividualProduct"}:
+            yield node
+            return
+        for key in ("@graph", "itemListElement", "item", "mainEntity"):
+            if key in node:
+                yield from _iter_products(node[key])
+
+
+def _from_json_ld(item):
+    product = {}
+    if _name(item):
+        product["title"] = _name(item)
+    offers = item.get("offers")
+    offers = offers if isinstance(offers, list) else [offers] if isinstance(offers, dict) else []
+    for offer in offers:
+        if not isinstance(offer, dict):
+            continue
+        specification = _first(offer.get("priceSpecification"))
+        price = _number(offer.get("price", offer.get("lowPrice")))
+        if price is None and isinstance(specification, dict):
+            price = _number(specification.get("price"))
+        if price is None:
+            continue
+        product["price"] = price
+        currency = offer.get("priceCurrency") or (
+            specification.get("priceCurrency") if isinstance(specification, dict) else None)
+        if currency:
+            product["currency"] = currency
+        if _availability(offer.get("availability")):
+            product["availability"] = _availability(offer.get("availability"))
+        if _name(offer.get("seller")):
+            product["seller"] = _name(offer.get("seller"))
+        break
+    rating = item.get("aggregateRating")
+    if isinstance(rating, dict):
+        if _number(rating.get("ratingValue")) is not None:
+            product["rating"] = _number(rating["ratingValue"])
+        count = _number(rating.get("reviewCount", rating.get("ratingCount")))
+        if count is not None:
+            product["reviews_count"] = int(count)
+    image = _first(item.get("image"))
+    if isinstance(image, dict):
+        image = image.get("url") or image.get("contentUrl")
+    if isinstance(image, str) and image:
+        product["image_url"] = image
+    specifications = {}
+    for key, label in IDENTIFIER_KEYS.items():
+        value = _name(item.get(key)) if key in ("brand", "model") else item.get(key)
+        if isinstance(value, (str, int)) and str(value).strip():
+            specifications.setdefault(label, str(value).strip())
+    if specifications:
+        product["specifications"] = specifications
+    return product
+
+
+def _page_level(source, patterns):
+    """Fields from microdata (inside a schema.org/Product scope) and OpenGraph meta tags.
+
+    The first itemprop of each kind wins, so a product's own name is expected
+    before nested brand/seller names, as pages normally order them.
+    """
+    product = {}
+    if patterns["product_scope"].search(source):
+        for tag, text in patterns["itemprop"].findall(source):
+            attributes = _attributes(tag, patterns)
+            field = MICRODATA_FIELDS.get(attributes.get("itemprop", "").lower())
+            if field is None or field in product:
+                continue
+            value = attributes.get("content") or attributes.get("href") or _text(text)
+            if field in ("price", "rating"):
+                value = _number(value)
+            elif field == "reviews_count":
+                value = int(_number(value)) if _number(value) is not None else None
+            elif field == "availability":
+                value = _availability(value)
+            if value is not None and value != "":
+                product[field] = value
+    for tag in patterns["meta"].findall(source):
+        attributes = _attributes(tag, patterns)
+        field = OPENGRAPH_FIELDS.get((attributes.get("property") or attributes.get("name") or "").lower())
+        value = attributes.get("content")
+        if field is None or field in product or not value:
+            continue
+        if field == "price":
+            value = _number(value)
+        elif field == "availability":
+            value = OPENGRAPH_AVAILABILITY.get(value.lower().replace(" ", ""), value)
+        if value is not None:
+            product[field] = value
+    return product
+
+
+def extract(source):
+    """Partial product dicts declared by the page's structured data, possibly empty.
+
+    ``source`` is the page's HTML as str or bytes.
+    """
+    if not source:
+        return []
+    patterns = _COMPILED[bytes if isinstance(source, bytes) else str]
+    products = []
+    for block in patterns["json_ld"].findall(source):
+        try:
+            document = json.loads(_decode(block), strict=False)
+        except ValueError:
+            continue
+        products.extend(p for p in map(_from_json_ld, _iter_products(document)) if p)
+
+    if len(products) <= 1:
+        page = _page_level(source, patterns)
+        if products:
+            for field, value in page.items():
+                products[0].setdefault(field, value)
+        elif "price" in page:
+            # OpenGraph alone (og:title, og:image) describes any page, not a product
+            products.append(page)
+    return products
+
+
+class Stats:
+    """Per-site counters of how often structured data answered extract_product_data."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sites = defaultdict(lambda: {
+            "pages": 0, "hits": 0, "dom_skipped": 0, "structured_fields": 0, "selector_fields": 0,
+            "hit_seconds": 0.0, "miss_seconds": 0.0,
+        })
+
+    def record(self, site, hit, structured_fields, selector_fields, dom_built, seconds):
+        with self._lock:
+            counters = self.sites[site]
+            counters["pages"] += 1
+            counters["hits"] += int(hit)
+            counters["dom_skipped"] += int(not dom_built)
+            counters["structured_fields"] += structured_fields
+            counters["selector_fields"] += selector_fields
+            counters["hit_seconds" if hit else "miss_seconds"] += seconds
+
+    def snapshot(self):
+        """{site: counters plus hit_rate, average ms for hits/misses and the saving per hit}."""
+        with self._lock:
+            sites = {site: dict(counters) for site, counters in self.sites.items()}
+        for counters in sites.values():
+            hits, misses = counters["hits"], counters["pages"] - counters["hits"]
+            counters["hit_rate"] = round(hits / counters["pages"], 3)
+            counters["avg_hit_ms"] = round(counters.pop("hit_seconds") / hits * 1000, 3) if hits else None
+            counters["avg_miss_ms"] = round(counters.pop("miss_seconds") / misses * 1000, 3) if misses else None
+            if hits and misses:
+                counters["saved_ms_per_hit"] = round(counters["avg_miss_ms"] - counters["avg_hit_ms"], 3)
+        return sites
+
+
+stats = Stats()
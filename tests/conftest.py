@@ -0,0 +1,41 @@
+import os
+import sys
+
+# The shared HttpClient reads these on first use. Clear them so a developer's
+# environment cannot add a response cache, rate limit or robots.txt lookups
+os.environ["SCRAPER_HTTP_CACHE"] = ""
+os.environ["SCRAPER_HOST_RATE"] = ""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from benchmarks.standin import StandinServer
+from database import Database
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+@pytest.fixture
+def db(db_path):
+    database = Database(db_path)
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def standin():
+    with StandinServer(delay=0) as server:
+        yield server
+
+
+@pytest.fixture
+def client(db_path, monkeypatch):
+    """Flask test client whose routes open the test database."""
+    import app
+
+    monkeypatch.setattr(app, "Database", lambda: Database(db_path))
+    return app.app.test_client()
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+from batch import BatchScraper, scrape_batch
+
+
+class SlowClient:
+    """Stands in for HttpClient and records how many fetches overlap, overall and per host."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = Counter()
+        self.peak = Counter()
+
+    def get(self, url, timeout=None):
+        host = urlparse(url).netloc
+        with self.lock:
+            self.in_flight[host] += 1
+            self.in_flight["*"] += 1
+            for key in (host, "*"):
+                self.peak[key] = max(self.peak[key], self.in_flight[key])
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight[host] -= 1
+            self.in_flight["*"] -= 1
+        return SimpleNamespace(text=f"<html><head><title>{url}</title></head></html>",
+                               raise_for_status=lambda: None)
+
+
+def test_results_follow_input_order(standin):
+    urls = [standin.url(f"/item/{n}") for n in (5, 1, 3, 2, 4)]
+    results = scrape_batch(urls, "products", max_concurrency=5)
+
+    assert [result["url"] for result in results] == urls
+    assert all(result["error"] is None for result in results)
+    assert [result["data"]["products"][0]["title"] for result in results] == [
+        f"Item {n}" for n in (5, 1, 3, 2, 4)
+    ]
+
+
+def test_one_failed_url_does_not_fail_the_batch(standin):
+    standin.pages = {"/ok": "<html><body><h1>Fine</h1><p>ok</p></body></html>"}
+    ok, gone = scrape_batch([standin.url("/ok"), standin.url("/gone")])
+
+    assert ok["error"] is None and ok["data"]["headers"]["h1"] == ["Fine"]
+    assert gone["data"] is None and "404" in gone["error"]
+
+
+def test_global_and_per_host_limits():
+    client = SlowClient()
+    urls = [f"http://shop{n % 3}.example.com/item/{n}" for n in range(24)]
+    batch = BatchScraper(max_concurrency=5, per_host_limit=2, client=client)
+    results = asyncio.run(batch.run(urls))
+
+    assert [result["url"] for result in results] == urls
+    assert client.peak["*"] <= 5
+    assert all(client.peak[f"shop{n}.example.com"] <= 2 for n in range(3))
+    # The limits are reached, not just respected: hosts really do overlap
+    assert client.peak["*"] > 2
+
+
+def test_scrape_batch_inside_a_running_loop(standin):
+    urls = [standin.url(f"/item/{n}") for n in (1, 2)]
+
+    async def caller():
+        # e.g. compare_prices called from async code
+        return scrape_batch(urls, "products")
+
+    results = asyncio.run(caller())
+    assert [result["data"]["products"][0]["title"] for result in results] == ["Item 1", "Item 2"]
+
+
+def test_async_callers_await_run(standin):
+    urls = [standin.url(f"/item/{n}") for n in (1, 2)]
+    results = asyncio.run(BatchScraper("products").run(urls))
+    assert [result["error"] for result in results] == [None, None]
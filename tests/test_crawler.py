@@ -0,0 +1,81 @@
+import pytest
+
+from crawler import BloomFilter, Crawler, canonicalize_url, url_priority, PRODUCT_PRIORITY, LISTING_PRIORITY
+
+
+@pytest.mark.parametrize("link, expected", [
+    ("HTTPS://Shop.Example.com:443/a/b/?z=1&a=2#reviews", "https://shop.example.com/a/b?a=2&z=1"),
+    ("http://shop.example.com:8080/", "http://shop.example.com:8080/"),
+    ("https://shop.example.com/x?utm_source=mail&gclid=1&page=2", "https://shop.example.com/x?page=2"),
+    ("https://www.amazon.com/Widget/dp/B0TEST/ref=sr_1_3?qid=1&keywords=w",
+     "https://www.amazon.com/Widget/dp/B0TEST?keywords=w"),
+    ("mailto:sales@example.com", None),
+    ("javascript:void(0)", None),
+    ("https://shop.example.com:99999/", None),
+])
+def test_canonicalize_url(link, expected):
+    assert canonicalize_url(link) == expected
+
+
+def test_relative_links_resolve_against_the_page():
+    assert canonicalize_url("../c/d?b=1", "https://shop.example.com/a/b/") == "https://shop.example.com/a/c/d?b=1"
+    assert canonicalize_url("#top", "https://shop.example.com/a") == "https://shop.example.com/a"
+
+
+def test_priorities():
+    assert url_priority("https://www.daraz.pk/products/x-i1-s2.html") == PRODUCT_PRIORITY
+    assert url_priority("https://shop.example.com/search?q=phone") == LISTING_PRIORITY
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(10000, error_rate=0.01)
+    added = [f"https://shop.example.com/item/{n}" for n in range(10000)]
+    assert all(bloom.add(url) for url in added[:10]) and not bloom.add(added[0])
+    for url in added[10:]:
+        bloom.add(url)
+    assert all(url in bloom for url in added)
+    false_positives = sum(f"https://other.example.com/{n}" in bloom for n in range(10000))
+    assert false_positives < 300
+    assert len(bloom) >= 9900
+
+
+def link_page(*links):
+    return "<html><body>" + "".join(f'<a href="{link}">x</a>' for link in links) + "</body></html>"
+
+
+def test_crawl_stays_on_site_within_depth_and_survives_bad_pages(db_path, standin, monkeypatch):
+    standin.pages = {
+        "/": link_page("/a", "/b?utm_source=x", "/b", "https://elsewhere.example/", "/logo.png"),
+        "/a": link_page("/deep", "/broken"),
+        "/b": link_page("/a#again"),
+        "/broken": link_page("/never"),
+        "/deep": link_page("/deeper"),
+    }
+    visit = Crawler._visit
+
+    def failing_visit(self, url, depth):
+        if url.endswith("/broken"):
+            raise AttributeError("extraction bug")
+        return visit(self, url, depth)
+
+    monkeypatch.setattr(Crawler, "_visit", failing_visit)
+    stats = Crawler([standin.url("/")], max_depth=2, db_name=db_path, workers=2).run()
+
+    assert sorted(path for path, _ in standin.requests) == ["/", "/a", "/b", "/deep"]
+    assert stats["errors"] == 1 and stats["fetched"] == 5
+    assert stats["offsite_links"] == 1 and stats["duplicate_links"] >= 2
+
+
+def test_frontier_is_capped_and_dropped_links_can_be_found_again(db_path, standin):
+    standin.pages = {
+        "/": link_page("/a", "/b", "/c"),
+        "/a": link_page("/c"),
+        "/b": link_page(),
+        "/c": link_page(),
+    }
+    crawler = Crawler([standin.url("/")], db_name=db_path, workers=1, max_frontier=2)
+    stats = crawler.run()
+
+    # /c did not fit after / was crawled, but was queued again from /a
+    assert stats["frontier_full"] == 1
+    assert sorted(path for path, _ in standin.requests) == ["/", "/a", "/b", "/c"]
@@ -0,0 +1,27 @@
+import pytest
+
+from benchmarks.bench_extract import large_page, per_section
+from scraper import WebScraper
+
+EDGE_CASES = """<html><head><title>T</title><meta name="a" content="1"><meta property="og:x">
+<meta charset="utf-8"></head><body>
+<h1> Spaced <b>bold</b> </h1><h3></h3>
+<p>Mail a.b@example.co.uk or +1 555 010 1234 &amp; more</p>
+<!-- hidden@example.com --><script>var s = "x@y.z";</script><style>p {}</style>
+<a href="https://Twitter.com/x">tw</a><a href="/rel">rel</a><a>no href</a>
+<img src="i.png"><img data-src="lazy.png"><![CDATA[cdata text]]>
+</body></html>"""
+
+
+@pytest.mark.parametrize("html", [large_page(0.05), EDGE_CASES, "<html></html>", ""])
+def test_single_pass_matches_per_section(html):
+    scraper = WebScraper("https://example.com/docs/page", html=html)
+    assert scraper.extract_all_data() == per_section(scraper)
+
+
+def test_requested_sections_match_the_full_result():
+    full = WebScraper("https://example.com/docs/page", html=EDGE_CASES).extract_all_data()
+    some = WebScraper("https://example.com/docs/page", html=EDGE_CASES).extract_all_data(
+        ["contact_info", "links"]
+    )
+    assert some == {key: full[key] for key in ("url", "contact_info", "links")}
@@ -0,0 +1,48 @@
+import fingerprint
+import jobs
+from benchmarks.standin import product_page
+
+
+def test_content_hash_ignores_volatile_noise():
+    data = {"url": "https://shop.example.com/1", "timestamp": "2024-01-01T00:00:00",
+            "title": "Blue  widget\n", "links": ["/b", "/a", "/a"]}
+    noisy = dict(data, timestamp="2024-06-01T12:00:00", title="Blue widget", links=["/a", "/b"])
+    assert fingerprint.content_hash(noisy) == fingerprint.content_hash(data)
+    assert fingerprint.content_hash(dict(data, title="Red widget")) != fingerprint.content_hash(data)
+    # Lists of records keep their order; only lists of plain strings are treated as sets
+    products = [{"title": "A"}, {"title": "B"}]
+    assert fingerprint.content_hash({"products": products}) != fingerprint.content_hash(
+        {"products": products[::-1]})
+
+
+def test_body_hash_accepts_text_and_bytes():
+    assert fingerprint.body_hash("é") == fingerprint.body_hash("é".encode("utf-8"))
+
+
+def test_unchanged_pages_skip_extraction_and_writes(db, standin, monkeypatch):
+    url = standin.url("/item/1")
+    standin.pages = {"/item/1": product_page(1)}
+    writes = []
+    upsert = db.upsert_products
+    monkeypatch.setattr(db, "upsert_products", lambda pages: writes.append(pages) or upsert(pages))
+
+    assert jobs.run_scrape(db, url, "products")[3] == "new"
+    assert len(writes) == 1
+
+    # Byte-identical body: not even parsed
+    def no_parse(*args):
+        raise AssertionError("parsed an unchanged body")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(jobs, "WebScraper", no_parse)
+        status, _, data, outcome = jobs.run_scrape(db, url, "products")
+    assert (status, data, outcome) == ("done", None, "same_body")
+
+    # New markup, same data: extracted but not written
+    standin.pages["/item/1"] = product_page(1).replace("<body>", "<body><!-- cache buster 7 -->")
+    assert jobs.run_scrape(db, url, "products")[3] == "same_content"
+    assert len(writes) == 1
+
+    standin.pages["/item/1"] = product_page(1).replace("$1.99", "$2.49")
+    assert jobs.run_scrape(db, url, "products")[3] == "changed"
+    assert len(writes) == 2
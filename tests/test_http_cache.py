@@ -0,0 +1,73 @@
+import os
+
+from benchmarks.standin import StandinServer
+from http_cache import HttpCache
+from http_client import HttpClient
+
+
+def make_client(tmp_path):
+    return HttpClient(max_retries=0, cache=HttpCache(str(tmp_path / "cache")))
+
+
+def test_revalidation_serves_cached_body_on_304(tmp_path):
+    client = make_client(tmp_path)
+    with StandinServer(delay=0, etags=True) as server:
+        first = client.get(server.url("/item/1"))
+        second = client.get(server.url("/item/1"))
+
+    assert not getattr(first, "from_cache", False)
+    assert second.from_cache
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.text == first.text
+    # The second request carried the stored ETag as its validator
+    assert server.requests[0][1] is None
+    assert server.requests[1][1] == first.headers["ETag"]
+    assert client.cache.stats()["hits"] == 1
+
+
+def test_missing_body_on_304_refetches_unconditionally(tmp_path):
+    client = make_client(tmp_path)
+    with StandinServer(delay=0, etags=True) as server:
+        url = server.url("/item/2")
+        first = client.get(url)
+        entry = client.cache.lookup(url)
+        os.remove(client.cache._path(entry["key"]))
+        # The body disappears between lookup() and the 304, e.g. evicted by another thread
+        client.cache.lookup = lambda _: entry
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.content == first.content
+    assert not getattr(response, "from_cache", False)
+    assert [validator for _, validator in server.requests] == [None, first.headers["ETag"], None]
+    # The refetched body was stored again
+    assert os.path.exists(client.cache._path(entry["key"]))
+
+
+def test_responses_without_validators_are_not_cached(tmp_path):
+    client = make_client(tmp_path)
+    with StandinServer(delay=0) as server:
+        client.get(server.url("/item/3"))
+        second = client.get(server.url("/item/3"))
+
+    assert not getattr(second, "from_cache", False)
+    assert client.cache.stats()["entries"] == 0
+
+
+def test_truncated_body_on_304_refetches_and_stores_whole(tmp_path):
+    client = make_client(tmp_path)
+    with StandinServer(delay=0, etags=True) as server:
+        url = server.url("/item/4")
+        first = client.get(url)
+        path = client.cache._path(client.cache.lookup(url)["key"])
+        with open(path, "r+b") as f:
+            f.truncate(10)
+        response = client.get(url)
+
+    assert not getattr(response, "from_cache", False)
+    assert response.content == first.content
+    with open(path, "rb") as f:
+        assert f.read() == first.content
+    # Bodies are renamed into place, so no temporary files are left behind
+    assert not [name for name in os.listdir(client.cache.cache_dir) if name.endswith(".tmp")]
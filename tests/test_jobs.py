@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from database import STALE_JOB_SECONDS
+from jobs import JobQueue, batch_progress
+
+
+def run_batch(queue, db, urls, scrape_type="products"):
+    batch_id, job_ids = queue.submit(urls, scrape_type)
+    queue.pending.join()
+    return db.fetch_batch_jobs(batch_id)
+
+
+def test_job_lifecycle(db, db_path, standin):
+    queue = JobQueue(workers=2, db_name=db_path)
+    urls = [standin.url(f"/item/{n}") for n in range(1, 4)]
+
+    jobs = run_batch(queue, db, urls)
+    assert [job["status"] for job in jobs] == ["done"] * 3
+    assert all(job["outcome"] == "new" and job["started_at"] and job["finished_at"] for job in jobs)
+    assert db.count_products() == 3
+
+    again = run_batch(queue, db, urls)
+    assert [job["outcome"] for job in again] == ["same_body"] * 3
+    progress = batch_progress(again)
+    assert progress["percent_complete"] == 100.0 and progress["unchanged"] == 3
+
+
+def test_failed_scrape_finishes_with_error(db, db_path, standin):
+    standin.pages = {}
+    queue = JobQueue(workers=1, db_name=db_path)
+    [job] = run_batch(queue, db, [standin.url("/gone")])
+    assert job["status"] == "error"
+    assert "404" in job["message"]
+
+
+def test_a_job_is_claimed_once(db):
+    [job_id] = db.create_jobs("batch", ["https://shop.example.com/1"], "products")
+    assert db.start_job(job_id)
+    assert not db.start_job(job_id)
+    assert db.fetch_job(job_id)["status"] == "running"
+
+
+def test_recovery_skips_jobs_running_elsewhere(db):
+    queued, fresh, stale = db.create_jobs("batch", [f"https://shop.example.com/{n}" for n in range(3)], "general")
+    db.start_job(fresh)
+    db.start_job(stale)
+    long_ago = (datetime.now() - timedelta(seconds=STALE_JOB_SECONDS + 60)).isoformat()
+    db.conn.execute("UPDATE scrape_jobs SET started_at = ? WHERE id = ?", (long_ago, stale))
+    db.conn.commit()
+
+    assert [job["id"] for job in db.fetch_unfinished_jobs()] == [queued, stale]
+    assert db.fetch_job(fresh)["status"] == "running"
+    assert db.fetch_job(stale)["status"] == "queued"
+
+
+def test_startup_resumes_unfinished_jobs_without_a_submission(db, db_path, standin, monkeypatch):
+    import app
+    import jobs
+
+    [job_id] = db.create_jobs("batch", [standin.url("/item/7")], "products")
+    monkeypatch.setattr(jobs, "_job_queue", None)
+    monkeypatch.setattr(jobs, "JobQueue", lambda: JobQueue(workers=1, db_name=db_path))
+    monkeypatch.setattr(app, "get_scheduler", lambda: None)
+
+    app.start_background_workers()
+    jobs._job_queue.pending.join()
+    assert db.fetch_job(job_id)["status"] == "done"
+    assert db.count_products() == 1
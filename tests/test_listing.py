@@ -0,0 +1,54 @@
+import pytest
+
+from database import InvalidCursor
+
+
+def product_page(url, title="Item"):
+    return {"url": url, "products": [{"title": title, "price": 9.99, "currency": "USD"}]}
+
+
+@pytest.fixture
+def products(db):
+    db.upsert_products(product_page(f"https://shop.example.com/{n}", f"Item {n}") for n in range(25))
+    return db
+
+
+def test_cursor_pages_cover_every_row_once_newest_first(products):
+    seen, cursor = [], None
+    while True:
+        page = products.list_products(limit=10, cursor=cursor)
+        seen += page["rows"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 25
+    assert len({row["id"] for row in seen}) == 25
+    keys = [(row["last_updated"], row["id"]) for row in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_last_page_has_no_cursor(products):
+    assert products.list_products(limit=25)["next_cursor"] is None
+    assert products.list_products(limit=24)["next_cursor"] is not None
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "x|1", "2024-01-01T00:00:00|abc", "|"])
+def test_malformed_cursor_is_rejected(products, cursor):
+    with pytest.raises(InvalidCursor):
+        products.list_products(cursor=cursor)
+
+
+def test_api_returns_400_for_malformed_cursor(client):
+    for path in ("/api/products", "/api/pages"):
+        response = client.get(f"{path}?cursor=garbage")
+        assert response.status_code == 400
+        assert "cursor" in response.get_json()["error"]
+
+
+def test_api_follows_next_cursor(client, db):
+    db.upsert_products(product_page(f"https://shop.example.com/{n}") for n in range(5))
+    first = client.get("/api/products?limit=3").get_json()
+    second = client.get(f"/api/products?limit=3&cursor={first['next_cursor']}").get_json()
+    assert len(first["rows"]) == 3 and len(second["rows"]) == 2
+    assert second["next_cursor"] is None
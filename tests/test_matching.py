@@ -0,0 +1,72 @@
+from matching import ProductRecord, image_key, match_products, normalize_title, site_of
+
+
+def record(product_id, url, title, specifications=None, image_url=None):
+    return ProductRecord(product_id, url, title, specifications or {}, image_url)
+
+
+def groups(rows):
+    members = {}
+    for product_id, group_id, _, _ in rows:
+        members.setdefault(group_id, set()).add(product_id)
+    return sorted(sorted(group) for group in members.values())
+
+
+def test_title_normalization():
+    assert normalize_title("Samsung Galaxy A54 5G (8 GB, 128GB) - Awesome Black") == [
+        "samsung", "galaxy", "a54", "5g", "8gb", "128gb", "awesome", "black"
+    ]
+    assert normalize_title("SM-A546E 1 Year Official Warranty") == ["sma546e"]
+    assert image_key("https://m.media-amazon.com/images/I/71abcDEF12L._AC_SX679_.jpg") == "71abcdef12l"
+    # eBay's file name is a size; the listing's image id is the directory above it
+    assert image_key("https://i.ebayimg.com/images/g/Ab3AAOSwx1Zk/s-l1600.jpg") == "ab3aaoswx1zk"
+    assert image_key(None) is None
+    assert site_of("https://www.daraz.pk/products/x") == "daraz"
+
+
+def test_listings_of_one_product_are_grouped_across_sites():
+    records = [
+        record(1, "https://www.amazon.com/dp/1", "Samsung Galaxy A54 5G 128GB Awesome Black"),
+        record(2, "https://www.daraz.pk/products/2", "Galaxy A54 5G 128GB Black - Samsung"),
+        record(3, "https://www.ebay.com/itm/3", "Samsung Galaxy A54 5G 256GB Awesome Black"),
+        record(4, "https://www.ebay.com/itm/4", "Samsung Galaxy A34 5G 128GB Awesome Black"),
+    ]
+    rows = match_products(records)
+    assert groups(rows) == [[1, 2], [3], [4]]
+    assert rows[1] == (2, 1, "daraz", rows[1][3]) and rows[1][3] >= 0.75
+    assert rows[0][3] == 1.0
+
+
+def test_shared_model_number_or_image_is_enough():
+    records = [
+        record(1, "https://www.amazon.com/dp/1", "Anker PowerCore slim portable charger",
+               {"Model": "A1229"}),
+        record(2, "https://www.ebay.com/itm/2", "Anker 10000mAh slim power bank USB-C",
+               {"Model Number": "A-1229"}),
+        record(3, "https://www.daraz.pk/products/3", "Baseus compact power bank",
+               image_url="https://img.example.com/p/abcdef123456_720x720q80.jpg"),
+        record(4, "https://www.amazon.com/dp/4", "Baseus 20W fast power bank 10000mAh",
+               image_url="https://cdn.example.com/abcdef123456.jpg"),
+    ]
+    assert groups(match_products(records)) == [[1, 2], [3, 4]]
+
+
+def test_conflicting_brands_never_match():
+    records = [
+        record(1, "https://www.amazon.com/dp/1", "Wireless earbuds bluetooth 5.3", {"Brand": "Anker"}),
+        record(2, "https://www.ebay.com/itm/2", "Wireless earbuds bluetooth 5.3", {"Brand": "Baseus"}),
+    ]
+    assert groups(match_products(records)) == [[1], [2]]
+
+
+def test_merges_do_not_chain_across_conflicts():
+    # B matches A and C on its own, but A and C name different brands / model numbers
+    for key, first, second in (("Brand", "Anker", "Baseus"), ("Model", "X100", "X200")):
+        records = [
+            record(1, "https://www.amazon.com/dp/1", "Slim power bank 10000mAh", {key: first}),
+            record(2, "https://www.daraz.pk/products/2", "Slim power bank 10000mAh"),
+            record(3, "https://www.ebay.com/itm/3", "Slim power bank 10000mAh", {key: second}),
+        ]
+        rows = match_products(records)
+        assert groups(rows) == [[1, 2], [3]]
+        assert rows[2][3] == 1.0
@@ -0,0 +1,89 @@
+import json
+import os
+import sqlite3
+
+from database import MIGRATIONS, Database
+
+
+def user_version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_fresh_database_gets_every_migration(db, db_path):
+    assert user_version(db_path) == len(MIGRATIONS)
+
+
+def test_baseline_database_is_migrated_in_place(db_path):
+    # The schema and data the app wrote before versioned migrations existed
+    conn = sqlite3.connect(db_path)
+    for statement in MIGRATIONS[0]:
+        conn.execute(statement)
+    conn.execute('''
+        INSERT INTO scraped_data (url, headers, main_content, links, scrape_date, last_updated)
+        VALUES ('https://docs.example.com/a', ?, ?, ?, '2024-01-01T00:00:00', '2024-01-01T00:00:00')
+    ''', (json.dumps({"h1": ["Widgets"]}), json.dumps("all about blue widgets"), json.dumps(["/b"])))
+    conn.execute('''
+        INSERT INTO product_data (url, title, price, currency, specifications, scrape_date, last_updated)
+        VALUES ('https://shop.example.com/1', 'Blue widget', 12.5, '$', '{}',
+                '2024-01-01T00:00:00', '2024-01-01T00:00:00')
+    ''')
+    conn.commit()
+    conn.close()
+
+    db = Database(db_path)
+    try:
+        assert user_version(db_path) == len(MIGRATIONS)
+        page = db.fetch_data("https://docs.example.com/a")
+        assert page["main_content"] == "all about blue widgets"
+        assert page["links"] == ["/b"]
+        assert [r["url"] for r in db.search_pages("widgets")["results"]] == ["https://docs.example.com/a"]
+        assert [r["title"] for r in db.search_products("widget")["results"]] == ["Blue widget"]
+        minor, currency = db.conn.execute(
+            "SELECT price_minor, currency FROM product_data WHERE url = 'https://shop.example.com/1'"
+        ).fetchone()
+        assert (minor, currency) == (1250, "USD")
+    finally:
+        db.close()
+
+
+def test_price_history_is_rescaled_to_normalize_minor_units(db_path):
+    db = Database(db_path)
+    # Put the database back at version 11 with rows the old triggers wrote
+    db.conn.executescript('''
+        DROP TRIGGER trg_product_price_insert;
+        DROP TRIGGER trg_product_price_update;
+        ALTER TABLE product_data DROP COLUMN price_minor;
+        INSERT INTO product_data (id, url, price, currency) VALUES (1, 'https://shop.example.kr/1', 15000, '₩');
+        INSERT INTO product_data (id, url, price, currency) VALUES (2, 'https://shop.example.jp/2', 1200, 'JPY');
+        INSERT INTO price_history VALUES (1, 1700000000, 1500000, '₩');
+        INSERT INTO price_history VALUES (2, 1700000000, 1200, 'JPY');
+        PRAGMA user_version = 11;
+    ''')
+    db.close()
+
+    db = Database(db_path)
+    try:
+        assert db.fetch_price_history(1) == [
+            {"observed_at": "2023-11-14T22:13:20+00:00", "price_minor": 15000, "price": 15000.0, "currency": "KRW"}
+        ]
+        assert db.fetch_price_history(2)[0]["price_minor"] == 1200
+    finally:
+        db.close()
+
+
+def test_recreated_database_file_is_migrated_again(db_path):
+    Database(db_path).close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    db = Database(db_path)
+    try:
+        assert db.count_products() == 0
+        assert user_version(db_path) == len(MIGRATIONS)
+    finally:
+        db.close()
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from normalize import (
+    iso_currency, locale_for, parse_count, parse_price, parse_prices, parse_rating, to_major, to_minor
+)
+
+
+@pytest.mark.parametrize("text, locale, expected", [
+    ("$1,299.00", "en-US", (129900, "USD")),
+    ("Rs. 12,499", "en-PK", (1249900, "PKR")),
+    ("1.299,00 €", "de-DE", (129900, "EUR")),
+    ("1 299,50 €", "fr-FR", (129950, "EUR")),
+    ("₹1,00,000", "en-IN", (10000000, "INR")),
+    ("¥1,200", "ja-JP", (1200, "JPY")),
+    ("₩15,000", "en", (15000, "KRW")),
+    ("£3.999", "en-GB", (400, "GBP")),
+    ("US$ 5", "de-DE", (500, "USD")),
+    ("Price on request", "en-US", (None, "USD")),
+    ("", "en-US", (None, None)),
+])
+def test_parse_price(text, locale, expected):
+    assert parse_price(text, locale) == expected
+
+
+def test_dollar_follows_the_locale():
+    assert parse_price("$10", "en-CA") == (1000, "CAD")
+    assert parse_price("$10", "de-DE") == (1000, "USD")
+
+
+def test_locale_for_url():
+    assert locale_for("https://www.daraz.pk/products/x") == "en-PK"
+    assert locale_for("https://www.amazon.de/dp/1") == "de-DE"
+    assert locale_for("https://www.amazon.com/dp/1") == "en-US"
+    assert locale_for("https://example.org/") == "en"
+
+
+def test_ratings_and_counts():
+    assert parse_rating("4.3 out of 5 stars", "en-US") == 4.3
+    assert parse_rating("4,5 von 5", "de-DE") == 4.5
+    assert parse_count("21,482 ratings", "en-US") == 21482
+    assert parse_count("1.2K reviews", "en-US") == 1200
+    assert parse_count("no reviews yet", "en-US") is None
+
+
+def test_minor_units_round_trip():
+    assert iso_currency("$") == "USD"
+    assert iso_currency("€") == "EUR"
+    assert iso_currency("KRW") == "KRW"
+    assert iso_currency(None) is None
+    assert to_minor(12.5, "USD") == 1250
+    assert to_minor(15000.0, "KRW") == 15000
+    assert to_major(to_minor(19.99, "EUR"), "EUR") == 19.99
+    assert to_major(1200, "JPY") == 1200
+
+
+def test_batch_matches_single_parses():
+    texts = ["$1.50", "n/a", "$1.50", "€2,00"]
+    minor, currency, valid = parse_prices(texts, "en-US")
+    assert minor.tolist() == [150, 0, 150, 200]
+    assert currency.tolist() == ["USD", "USD", "USD", "EUR"]
+    assert valid.tolist() == [True, False, True, True]
+    assert minor.dtype == np.int64
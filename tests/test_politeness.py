@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import http_client
+import politeness as politeness_module
+from http_client import HttpClient
+from politeness import HostState, Politeness, RobotsDisallowed
+
+ROBOTS = """User-agent: *
+Disallow: /private
+Crawl-delay: 2
+"""
+
+
+def robots_answer(status=200, text=""):
+    return lambda url: SimpleNamespace(status_code=status, text=text)
+
+
+def test_robots_rules_and_crawl_delay():
+    politeness = Politeness(rate=5, fetch=robots_answer(text=ROBOTS))
+    with pytest.raises(RobotsDisallowed):
+        politeness.acquire("https://shop.example.com/private/orders")
+    assert politeness.acquire("https://shop.example.com/item/1") == 0.0
+    state = politeness.hosts["shop.example.com"]
+    assert state.rate == 0.5 and state.burst == 1
+    assert politeness.stats()["robots_fetches"] == 1 and politeness.stats()["disallowed"] == 1
+
+
+def test_missing_robots_allows_all_and_unreachable_robots_allows_nothing():
+    assert Politeness(fetch=robots_answer(404)).robots("https://a.example.com/").can_fetch("*", "https://a.example.com/x")
+    assert not Politeness(fetch=robots_answer(503)).robots("https://a.example.com/").can_fetch(
+        "*", "https://a.example.com/x")
+
+    def unreachable(url):
+        raise requests.exceptions.ConnectionError("down")
+
+    politeness = Politeness(fetch=unreachable)
+    with pytest.raises(RobotsDisallowed):
+        politeness.acquire("https://a.example.com/x")
+    assert politeness.stats()["robots_errors"] == 1
+
+
+def test_token_bucket_spaces_requests_after_the_burst():
+    state = HostState(rate=2.0, burst=2, now=100.0)
+    assert [state.reserve(100.0) for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    # Tokens refill at the rate; the bucket never holds more than the burst
+    assert state.reserve(110.0) == 0.0
+    assert state.tokens == 1.0
+
+
+def test_throttling_slows_a_host_and_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(politeness_module.time, "sleep", lambda seconds: None)
+    politeness = Politeness(rate=10, fetch=robots_answer(404))
+    url = "https://shop.example.com/item/1"
+    politeness.acquire(url)
+    politeness.record(url, 429, retry_after=30)
+    politeness.record(url, 503)
+    state = politeness.hosts["shop.example.com"]
+    assert state.slowdown == 4.0
+    assert state.effective_rate < 10 / 4 + 1e-9
+    assert politeness.acquire(url) > 29
+
+    for _ in range(50):
+        politeness.record(url, 200)
+    assert state.slowdown == 1.0 and state.error_rate < 0.01
+
+
+def test_client_waits_out_retry_after_and_reports_to_the_limiter(monkeypatch):
+    answers = iter([(429, {"Retry-After": "3"}), (200, {})])
+
+    def fake_get(url, timeout=None, **kwargs):
+        status, headers = next(answers)
+        response = requests.Response()
+        response.status_code, response._content, response.url = status, b"ok", url
+        response.headers.update(headers)
+        response.elapsed = SimpleNamespace(total_seconds=lambda: 0.0)
+        return response
+
+    # time is one module object, so this records the limiter's waits as well as the client's
+    sleeps = []
+    monkeypatch.setattr(http_client.time, "sleep", sleeps.append)
+    politeness = Politeness(rate=100, fetch=robots_answer(404))
+    client = HttpClient(politeness=politeness)
+    monkeypatch.setattr(client.session, "get", fake_get)
+
+    assert client.get("https://shop.example.com/item/1").status_code == 200
+    assert 3.0 in sleeps
+    # The retry itself also waited for the host's Retry-After block in the limiter
+    assert sleeps[-1] == pytest.approx(3.0, abs=0.1)
+    assert politeness.hosts["shop.example.com"].slowdown == pytest.approx(2 * 0.9)
+    assert client.stats()["retries"] == 1
+
+
+def test_shared_client_is_unthrottled_and_uncached_unless_configured(monkeypatch, tmp_path):
+    monkeypatch.delenv("SCRAPER_HOST_RATE")
+    monkeypatch.delenv("SCRAPER_HTTP_CACHE")
+    monkeypatch.setattr(http_client, "_client", None)
+    client = http_client.get_client()
+    assert client.cache is None and client.politeness is None
+
+    monkeypatch.setenv("SCRAPER_HOST_RATE", "2")
+    monkeypatch.setenv("SCRAPER_HTTP_CACHE", str(tmp_path / "cache"))
+    monkeypatch.setattr(http_client, "_client", None)
+    client = http_client.get_client()
+    assert client.politeness.rate == 2.0 and client.cache is not None
+    client.close()
+
+    assert http_client.polite_client().politeness.rate == 1.0
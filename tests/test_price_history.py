@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+
+
+def product_page(url, price, currency="USD"):
+    return {"url": url, "products": [{"title": "Item", "price": price, "currency": currency}]}
+
+
+def test_price_changes_within_one_second_keep_the_last(db):
+    url = "https://shop.example.com/1"
+    prices = [10.0 + n for n in range(20)]
+    for price in prices:
+        db.upsert_products([product_page(url, price)])
+
+    history = db.fetch_price_history(db.product_id(url))
+    # Twenty writes cannot all land in different seconds, so some shared a key
+    assert len(history) < len(prices)
+    assert history[-1]["price"] == prices[-1]
+
+
+def test_naive_bounds_and_results_are_utc(db):
+    db.upsert_products([product_page("https://shop.example.com/1", 1.0)])
+    product_id = db.product_id("https://shop.example.com/1")
+    noon = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+    db.record_price_observations([(product_id, noon, 999, "USD")])
+
+    [observation] = db.fetch_price_history(product_id, start="2024-03-01T11:59:59", end="2024-03-01T12:00:00")
+    assert observation == {"observed_at": "2024-03-01T12:00:00+00:00", "price_minor": 999,
+                           "price": 9.99, "currency": "USD"}
+    assert db.fetch_price_history(product_id, start="2024-03-01T12:00:01", end="2024-03-02") == []
+
+
+def test_daily_prices_and_compaction(db):
+    db.upsert_products([product_page("https://shop.example.com/1", 1.0)])
+    product_id = db.product_id("https://shop.example.com/1")
+    day = int(datetime(2024, 3, 1, tzinfo=timezone.utc).timestamp())
+    db.record_price_observations([
+        (product_id, day + 3600, 500, "USD"),
+        (product_id, day + 7200, 300, "USD"),
+        (product_id, day + 10800, 400, "USD"),
+    ])
+
+    [daily] = db.fetch_daily_prices(product_id, start="2024-03-01", end="2024-03-02")
+    assert daily == {"date": "2024-03-01", "min": 3.0, "max": 5.0, "last": 4.0,
+                     "currency": "USD", "observations": 3}
+
+    assert db.compact_price_history(older_than_days=30) == 2
+    assert [row["price_minor"] for row in db.fetch_price_history(product_id, end="2024-03-02")] == [400]
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+import scheduler
+from scheduler import RescrapeScheduler, next_interval
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_next_interval_adapts_within_bounds():
+    assert next_interval(100, True, 60, 1000) == 60
+    assert next_interval(100, False, 60, 1000) == 150
+    assert next_interval(900, False, 60, 1000) == 1000
+
+
+def test_track_rejects_bad_input(db_path):
+    tracker = RescrapeScheduler(db_path)
+    with pytest.raises(ValueError):
+        tracker.track("https://shop.example.com/1", scrape_type="everything")
+    with pytest.raises(ValueError):
+        tracker.track("https://shop.example.com/1", interval=float("nan"))
+
+
+def test_startup_checks_due_urls_without_a_request(db, db_path, standin, monkeypatch):
+    import app
+
+    url = standin.url("/item/3")
+    db.track_url(url, "products", 3600, 300, 86400, time.time() - 1)
+    monkeypatch.setattr(scheduler, "_scheduler", None)
+    monkeypatch.setattr(scheduler, "RescrapeScheduler", lambda: RescrapeScheduler(db_path, host_delay=0.02))
+    monkeypatch.setattr(app, "get_job_queue", lambda: None)
+
+    app.start_background_workers()
+    try:
+        assert wait_for(lambda: db.fetch_tracked_url(url)["checks"] == 1)
+    finally:
+        scheduler._scheduler.stop()
+    row = db.fetch_tracked_url(url)
+    assert row["next_due"] > time.time() + 3000
+    assert [path for path, _ in standin.requests] == ["/item/3"]
+    assert db.count_products() == 1
+
+
+def test_schedulers_sharing_a_database_check_each_url_once(db, db_path, standin):
+    urls = [standin.url(f"/item/{n}") for n in range(4)]
+    for url in urls:
+        db.track_url(url, "products", 3600, 300, 86400, time.time() - 1)
+    schedulers = [RescrapeScheduler(db_path, host_delay=0.02) for _ in range(2)]
+    for tracker in schedulers:
+        tracker.start()
+    try:
+        assert wait_for(lambda: all(db.fetch_tracked_url(url)["checks"] == 1 for url in urls))
+        time.sleep(0.1)
+    finally:
+        for tracker in schedulers:
+            tracker.stop()
+    assert sorted(path for path, _ in standin.requests) == [f"/item/{n}" for n in range(4)]
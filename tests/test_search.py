@@ -0,0 +1,80 @@
+import pytest
+
+
+def product_page(n, title, specifications=None):
+    return {"url": f"https://shop.example.com/{n}", "products": [
+        {"title": title, "price": 10.0, "currency": "USD", "specifications": specifications or {}}
+    ]}
+
+
+@pytest.fixture
+def catalog(db):
+    db.upsert_products([
+        product_page(1, "Anker charger", {"Cable": "braided usb-c"}),
+        product_page(2, "Anker usb-c cable 2m"),
+        product_page(3, "Baseus power bank", {"Port": "usb-c"}),
+        product_page(4, "Lenovo laptop"),
+    ])
+    db.upsert_pages([
+        {"url": "https://docs.example.com/a", "headers": {"h1": ["Cable guide"]},
+         "main_content": "How to choose a usb-c cable for charging"},
+        {"url": "https://docs.example.com/b", "headers": {"h1": ["Laptops"]},
+         "main_content": "Laptops charge over a usb-c cable these days"},
+    ])
+    return db
+
+
+def test_title_matches_outrank_specification_matches(catalog):
+    results = catalog.search_products("usb-c")["results"]
+    assert [row["url"] for row in results][0] == "https://shop.example.com/2"
+    assert {row["url"] for row in results} == {f"https://shop.example.com/{n}" for n in (1, 2, 3)}
+    assert [row["score"] for row in results] == sorted(row["score"] for row in results)
+
+
+def test_every_word_must_match_and_operators_are_literal(catalog):
+    assert [row["url"] for row in catalog.search_products("anker cable")["results"]] == [
+        "https://shop.example.com/2", "https://shop.example.com/1"
+    ]
+    assert catalog.search_products("anker OR lenovo")["results"] == []
+    assert catalog.search_products("  ")["results"] == []
+
+
+def test_pages_rank_headers_first_with_snippets(catalog):
+    [first, second] = catalog.search_pages("cable")["results"]
+    assert first["url"] == "https://docs.example.com/a" and first["title"] == "Cable guide"
+    assert "<b>cable</b>" in second["snippet"]
+
+
+def test_offsets_page_through_every_match_once(db):
+    db.upsert_products(product_page(n, f"Widget {n}") for n in range(25))
+    seen, offset = [], 0
+    while offset is not None:
+        page = db.search_products("widget", limit=10, offset=offset)
+        seen += [row["id"] for row in page["results"]]
+        offset = page["next_offset"]
+    assert len(seen) == len(set(seen)) == 25
+
+
+def test_search_endpoint(client, catalog):
+    body = client.get("/search?q=usb-c&type=pages&limit=1").get_json()
+    assert body["type"] == "pages" and len(body["results"]) == 1 and body["next_offset"] == 1
+    assert client.get("/search").status_code == 400
+    assert client.get("/search?q=x&type=users").status_code == 400
+
+
+def test_broad_queries_rank_only_the_newest_matches_and_say_so(db, client, monkeypatch):
+    import database
+
+    monkeypatch.setattr(database, "RANK_CANDIDATES", 5)
+    db.upsert_products(product_page(n, f"Widget {n}") for n in range(5))
+    exact = db.search_products("widget", limit=10)
+    assert len(exact["results"]) == 5 and not exact["truncated"]
+
+    db.upsert_products(product_page(n, f"Widget {n}") for n in range(5, 8))
+    broad = db.search_products("widget", limit=10)
+    assert broad["truncated"]
+    assert sorted(row["url"] for row in broad["results"]) == [
+        f"https://shop.example.com/{n}" for n in range(3, 8)
+    ]
+    assert client.get("/search?q=widget").get_json()["truncated"] is True
+    assert client.get("/search?q=widget%203").get_json()["truncated"] is False
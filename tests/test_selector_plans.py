@@ -0,0 +1,50 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.bench_selectors import SITE_PAGES
+from benchmarks.bench_stream import listing_page
+from scraper import WebScraper
+from selector_plans import compile_plan
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+
+
+def fixture_pages():
+    with open(os.path.join(FIXTURES, "index.json")) as f:
+        index = json.load(f)
+    for entry in index.values():
+        with open(os.path.join(FIXTURES, entry["file"]), encoding="utf-8") as f:
+            yield entry["url"], f.read()
+
+
+PAGES = list(SITE_PAGES.items()) + list(fixture_pages())
+
+
+def without_timestamp(data):
+    return {key: value for key, value in data.items() if key != "timestamp"}
+
+
+@pytest.mark.parametrize("url, html", PAGES)
+@pytest.mark.parametrize("scrape_type", ["products", "general"])
+@pytest.mark.parametrize("structured", [True, False])
+def test_lxml_backend_matches_soup(url, html, scrape_type, structured):
+    soup = WebScraper(url, scrape_type, html=html, structured=structured).extract_all_data()
+    lxml = WebScraper(url, scrape_type, html=html, backend="lxml", structured=structured).extract_all_data()
+    assert without_timestamp(lxml) == without_timestamp(soup)
+
+
+def test_listing_pages_match():
+    html = listing_page(20)
+    soup = WebScraper("https://shop.example.com/category", "products", html=html).extract_listing_data()
+    lxml = WebScraper("https://shop.example.com/category", "products", html=html,
+                      backend="lxml").extract_listing_data()
+    assert without_timestamp(lxml) == without_timestamp(soup)
+    assert len(soup["products"]) == 20
+
+
+def test_plans_are_compiled_once_per_mapping():
+    selectors = {"title": "h1", "price": ".price"}
+    assert compile_plan(selectors, "lxml") is compile_plan(selectors, "lxml")
+    assert compile_plan(selectors, "soup") is not compile_plan(selectors, "lxml")
@@ -0,0 +1,100 @@
+import json
+
+import structured_data
+
+
+def json_ld(document):
+    return f'<script type="application/ld+json">{json.dumps(document)}</script>'
+
+
+def test_json_ld_product_in_a_graph():
+    page = json_ld({"@context": "https://schema.org", "@graph": [
+        {"@type": "WebPage", "name": "Shop"},
+        {"@type": "Product", "name": "Phone X", "image": [{"url": "https://cdn.example.com/x.jpg"}],
+         "brand": {"@type": "Brand", "name": "Acme"}, "sku": "PX-1", "gtin13": "0123456789012",
+         "aggregateRating": {"ratingValue": "4.5", "reviewCount": "1,204"},
+         "offers": {"@type": "Offer", "priceSpecification": {"price": "1,299.00", "priceCurrency": "USD"},
+                    "availability": "https://schema.org/InStock", "seller": {"name": "Acme Store"}}},
+    ]})
+
+    assert structured_data.extract(page) == [{
+        "title": "Phone X", "price": 1299.0, "currency": "USD", "availability": "In Stock",
+        "seller": "Acme Store", "rating": 4.5, "reviews_count": 1204,
+        "image_url": "https://cdn.example.com/x.jpg",
+        "specifications": {"Brand": "Acme", "SKU": "PX-1", "GTIN": "0123456789012"},
+    }]
+
+
+def test_item_list_yields_every_product_without_page_fields():
+    page = json_ld({"@type": "ItemList", "itemListElement": [
+        {"@type": "ListItem", "item": {"@type": "Product", "name": f"Item {n}",
+                                       "offers": {"price": n, "priceCurrency": "EUR"}}}
+        for n in (1, 2)
+    ]}) + '<meta property="og:image" content="https://cdn.example.com/list.jpg">'
+
+    assert structured_data.extract(page) == [
+        {"title": "Item 1", "price": 1.0, "currency": "EUR"},
+        {"title": "Item 2", "price": 2.0, "currency": "EUR"},
+    ]
+
+
+def test_microdata_inside_a_product_scope():
+    page = """
+    <div itemscope itemtype="https://schema.org/Product">
+      <h1 itemprop="name">Kettle</h1>
+      <div itemprop="offers" itemscope itemtype="https://schema.org/Offer">
+        <span itemprop="price" content="24.99">$24.99</span>
+        <meta itemprop="priceCurrency" content="USD">
+        <link itemprop="availability" href="https://schema.org/OutOfStock">
+      </div>
+      <span itemprop="ratingValue">4.1</span> from <span itemprop="reviewCount">37</span>
+    </div>"""
+
+    assert structured_data.extract(page) == [{
+        "title": "Kettle", "price": 24.99, "currency": "USD", "availability": "Out Of Stock",
+        "rating": 4.1, "reviews_count": 37,
+    }]
+
+
+def test_microdata_outside_a_product_scope_is_ignored():
+    page = '<div itemscope itemtype="https://schema.org/Event"><span itemprop="price">10</span></div>'
+    assert structured_data.extract(page) == []
+
+
+def test_opengraph_product_price_and_availability():
+    page = """
+    <meta property="og:title" content="Lamp &amp; Shade">
+    <meta property="product:price:amount" content="49.50">
+    <meta property="product:price:currency" content="GBP">
+    <meta property="product:availability" content="oos">"""
+
+    assert structured_data.extract(page) == [{
+        "title": "Lamp & Shade", "price": 49.5, "currency": "GBP", "availability": "Out Of Stock",
+    }]
+
+
+def test_opengraph_without_a_price_is_not_a_product():
+    page = ('<meta property="og:title" content="About us">'
+            '<meta property="og:image" content="https://cdn.example.com/team.jpg">')
+    assert structured_data.extract(page) == []
+
+
+def test_single_json_ld_product_is_completed_from_the_page():
+    page = (json_ld({"@type": "Product", "name": "Desk", "offers": {"price": "120"}})
+            + '<meta property="og:price:currency" content="USD">'
+            + '<meta property="og:title" content="Desk | Shop">'
+            + '<meta property="og:image" content="https://cdn.example.com/desk.jpg">')
+
+    assert structured_data.extract(page) == [{
+        "title": "Desk", "price": 120.0, "currency": "USD", "image_url": "https://cdn.example.com/desk.jpg",
+    }]
+
+
+def test_invalid_json_ld_is_skipped_and_bytes_match_str():
+    page = ('<script type="application/ld+json">{"@type": "Product", </script>'
+            + json_ld({"@type": "Product", "name": "Café chair", "offers": {"price": 80, "priceCurrency": "EUR"}}))
+
+    expected = [{"title": "Café chair", "price": 80.0, "currency": "EUR"}]
+    assert structured_data.extract(page) == expected
+    assert structured_data.extract(page.encode("utf-8")) == expected
+    assert structured_data.extract(b"") == []